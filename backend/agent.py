@@ -1,7 +1,12 @@
-from livekit.agents import Agent
+from livekit.agents import Agent, ChatContext, ChatMessage
 
 class MCPAssistant(Agent):
-    def __init__(self, mcp_tools, chat_ctx=None):
+    def __init__(self, mcp_tools, chat_ctx=None, memory_retriever=None, tool_router=None, speculator=None, camera=None):
+        self.memory_retriever = memory_retriever
+        self.camera = camera
+        self._frame_message_id = None
+        self.tool_router = tool_router
+        self.speculator = speculator
         instructions = (
             "You are an intelligent AI voice assistant with vision, real-time web search, email, and calendar tools. "
             "You can see, hear, search, and manage tasks to provide accurate, proactive, and conversational help. "
@@ -57,4 +62,46 @@ class MCPAssistant(Agent):
             "✅ Memory: Use past context to personalize and maintain continuity. "
             "👉 Goal: Be proactive, resourceful, and conversational — not just answering, but helping users discover and manage their world."
         )
-        super().__init__(instructions=instructions, tools=mcp_tools, chat_ctx=chat_ctx)
\ No newline at end of file
+        super().__init__(instructions=instructions, tools=mcp_tools, chat_ctx=chat_ctx)
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """Attach a camera frame if needed, pick this turn's tools and add relevant memories to the LLM context."""
+        user_text = new_message.text_content or ""
+        if self.camera is not None:
+            image = self.camera.image_content(user_text)
+            if image is not None:
+                await self._show_frame(turn_ctx, image, new_message)
+
+        if self.tool_router is not None:
+            routed_tools = self.tool_router.route(user_text)
+            if routed_tools is not None:
+                await self.update_tools(routed_tools)
+
+        if self.speculator is not None:
+            prefetched = await self.speculator.claim(user_text)
+            if prefetched:
+                # Shown as a lookup already made for this turn, so the LLM answers from it
+                turn_ctx.items.extend(prefetched)
+
+        if self.memory_retriever is None:
+            return
+        context = await self.memory_retriever.retrieve(user_text)
+        if context:
+            # Ahead of the user's message (it is inserted by creation time), so the request still ends with the user
+            turn_ctx.add_message(role="system", content=context, created_at=new_message.created_at)
+
+    async def _show_frame(self, turn_ctx: ChatContext, image, new_message: ChatMessage) -> None:
+        """Put the frame in the history ahead of the user's message, replacing the previous one.
+
+        Follow-ups ("how much is it?") still see the last frame sent, while the
+        history never holds more than one image to re-send with every request.
+        """
+        chat_ctx = self.chat_ctx.copy()
+        frame_message = chat_ctx.add_message(role="user", content=[image], created_at=new_message.created_at)
+        for ctx in (chat_ctx, turn_ctx):
+            previous = ctx.index_by_id(self._frame_message_id) if self._frame_message_id else None
+            if previous is not None:
+                ctx.items.pop(previous)
+        turn_ctx.insert(frame_message)
+        await self.update_chat_ctx(chat_ctx)
+        self._frame_message_id = frame_message.id
@@ -9,15 +9,16 @@ logging.basicConfig(level=logging.INFO)
 
 # Environment variable validation
 REQUIRED_KEYS = [ 
-    "DEEPGRAM_API_KEY",  
     "COMPOSIO_MCP_URL",
     "MEM0_API_KEY",
     "OPENROUTER_API_KEY"
 ]
+STT_API_KEYS = {"deepgram": "DEEPGRAM_API_KEY", "groq": "GROQ_API_KEY"}
 
 def validate_environment():
     """Validate required environment variables"""
-    missing = [k for k in REQUIRED_KEYS if not os.getenv(k)]
+    stt_key = STT_API_KEYS.get(Config.STT_PROVIDER)
+    missing = [k for k in REQUIRED_KEYS + ([stt_key] if stt_key else []) if not os.getenv(k)]
     if missing:
         raise ValueError(f"Missing required environment variables: {missing}")
     
@@ -30,7 +31,51 @@ def validate_environment():
 class Config:
     # MCP Configuration
     COMPOSIO_MCP_URL = os.getenv("COMPOSIO_MCP_URL", "")
-    
+    MCP_POOL_MAX_SESSIONS = 4           # open sessions per MCP server, also the cap on concurrent calls to it
+    MCP_HEALTH_CHECK_INTERVAL = 30.0    # ping idle sessions older than this (seconds) before reuse
+    MCP_PING_TIMEOUT = 5.0
+    MCP_CATALOG_TTL = 300.0             # seconds before the cached tool catalog is refreshed in the background
+    # On-disk copy of the catalog; job processes exit after one job, so this is what the next job starts from. Empty disables it.
+    MCP_CATALOG_CACHE_PATH = os.getenv("MCP_CATALOG_CACHE_PATH", ".mcp_catalog.json")
+
+    # Tool Result Configuration (characters of tool output sent back to the LLM)
+    TOOL_RESULT_MAX_CHARS = 4000
+    TOOL_RESULT_BUDGETS = {             # per-tool overrides, matched by tool name prefix
+        "GMAIL_FETCH": 6000,
+        "COMPOSIO_SEARCH": 3000,
+    }
+    TOOL_RESULT_MAX_FIELD_CHARS = 1000  # any single string field is cut to this length
+    TOOL_RESULT_LOG_CHARS = 300
+
+    # Tool Result Cache Configuration (read-only tools only)
+    TOOL_CACHE_TTLS = {                 # tool name prefix -> seconds; tools not listed are never cached
+        "COMPOSIO_SEARCH": 300.0,
+        "TAVILY": 300.0,
+        "FIRECRAWL": 900.0,
+        "GMAIL_FETCH": 60.0,
+        "GMAIL_GET": 60.0,
+        "GMAIL_LIST": 60.0,
+        "GOOGLECALENDAR_FIND": 60.0,
+        "GOOGLECALENDAR_LIST": 60.0,
+    }
+    TOOL_CACHE_MAX_ENTRIES = 256
+    TOOL_CACHE_MAX_ENTRIES_PER_USER = 64
+    TOOL_CACHE_SHARED_PREFIXES = (      # results that are not user-specific, cached even before the user is identified
+        "COMPOSIO_SEARCH",
+        "TAVILY",
+        "FIRECRAWL",
+    )
+
+    # Tool Router Configuration (which tool schemas are sent with each LLM request)
+    TOOL_ROUTER_MIN_CATALOG = 20        # smaller catalogs are always attached in full
+    TOOL_ROUTER_CORE_TOOLS = (          # tool name prefixes that are always attached
+        "COMPOSIO_SEARCH",
+        "GMAIL_SEND_EMAIL",
+        "GMAIL_FETCH_EMAILS",
+        "GOOGLECALENDAR_CREATE_EVENT",
+    )
+    TOOL_ROUTER_TOP_K = 5               # tools added per user turn
+    TOOL_ROUTER_MAX_DYNAMIC = 10        # routed tools kept attached across turns
     
     # API Keys
     
@@ -42,10 +87,88 @@ class Config:
     OPENROUTER_API_KEY=""   # if using openrouter key, pass it here explicity, else you any livekii compatible llms, likce groq or openai without create a openai client
     OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
     OPENROUTER_MODEL = "google/gemini-2.5-pro"
+    PROMPT_CACHE_CONTROL_MODELS = ("anthropic/", "google/gemini")  # models that take explicit cache_control breakpoints
     
     # Agent Configuration
-    DEFAULT_USER = "default_user"
+    DEFAULT_USER = "default_user"       # user of load_memories() called without one; sessions never fall back to it
+
+    # User Identity Configuration (Mem0 user and cache partition of each session)
+    USER_ID_METADATA_KEY = "user_id"    # looked up in participant metadata JSON, then attributes, then identity
+    USER_ID_MAX_LENGTH = 128
+    USER_ID_HASH_CHARS = 12             # hex chars of the raw value's hash on ids that had to be sanitized
+    USER_IDENTITY_TIMEOUT = 30.0        # seconds to wait for the user; sessions not identified by then run without memory
+
+    # Speculative Prefetch Configuration (opt-in: read-only lookups started from interim transcripts)
+    SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "false").lower() == "true"
+    SPECULATION_TOOL = "COMPOSIO_SEARCH_TAVILY_SEARCH"  # must be a read-only tool listed in TOOL_CACHE_TTLS
+    SPECULATION_TRIGGERS = frozenset({  # topics only: question words ("how", "who"...) start small talk too
+        "weather", "temperature", "forecast", "price", "prices", "stock", "stocks", "news", "headlines",
+        "score", "scores", "latest",
+    })
+    SPECULATION_STABLE_INTERIMS = 2     # identical interim transcripts in a row before speculating
+    SPECULATION_CLAIM_TIMEOUT = 1.5     # max seconds the turn waits for a matching prefetch
+
+    # Vision Configuration (which camera frames are sent to the LLM)
+    VISION_ENABLED = os.getenv("VISION_ENABLED", "true").lower() == "true"
+    VISION_SAMPLE_FPS = 1.0             # camera frames hashed per second; the rest are dropped
+    VISION_MAX_SIZE = 768               # longer side, in pixels, of frames sent to the LLM
+    VISION_DETAIL = "low"               # provider image detail: "low", "high" or "auto"
+    VISION_HASH_THRESHOLD = 6           # differing bits (of 64) before a frame counts as a new scene
+    VISION_TRIGGER_WORDS = frozenset({  # only clearly visual words: "this", "look", "show"... are in most turns
+        "camera", "holding", "wearing", "showing", "picture", "photo", "screen", "color", "colour", "visible",
+    })
+
+    # Chat Context Compaction Configuration (long sessions)
+    CONTEXT_KEEP_TURNS = 8              # most recent user turns kept verbatim
+    CONTEXT_SUMMARIZE_BATCH = 10        # older turns accumulated before they are summarized
+    CONTEXT_TOOL_OUTPUT_STUB_CHARS = 500  # older tool outputs longer than this are replaced by a stub
+    CONTEXT_SUMMARY_TIMEOUT = 20.0
+    CONTEXT_SUMMARY_BACKOFF = 30.0      # seconds before retrying a failed summary, doubled on each failure
+    CONTEXT_SUMMARY_MAX_BACKOFF = 300.0
+
+    # Memory Retrieval Configuration
+    MEMORY_RETRIEVAL_MODE = os.getenv("MEMORY_RETRIEVAL_MODE", "budgeted")  # "budgeted" or "all"
+    MEMORY_TOKEN_BUDGET = 800           # tokens of memories in the initial context
+    MEMORY_TURN_TOKEN_BUDGET = 300      # tokens of extra memories pulled in per user turn
+    MEMORY_QUERY_TURNS = 3              # recent user turns used as the search query
+    MEMORY_SEARCH_LIMIT = 20
+    MEMORY_SEARCH_TIMEOUT = 3.0         # seconds; bound on a search, which starts from the final transcript
+    MEMORY_SEARCH_WAIT = 0.2            # max seconds the end of a turn waits for a search still running
+    MEMORY_RECENCY_HALF_LIFE_DAYS = 30.0
+
+    # Memory Cache Configuration (local SQLite, shared by all worker processes on the host)
+    MEMORY_CACHE_PATH = os.getenv("MEMORY_CACHE_PATH", ".memory_cache.sqlite3")  # empty disables the cache
+    MEMORY_CACHE_TTL = 60.0             # seconds before a cached entry is revalidated in the background
+    MEMORY_CACHE_MAX_STALENESS = 86400.0  # older entries are fetched from Mem0 before use
+    MEMORY_CACHE_MAX_USERS = 500        # LRU bound on cached users
+
+    # Memory Persistence Configuration (incremental writes during the session)
+    MEMORY_WRITE_BATCH_SIZE = 6
+    MEMORY_WRITE_FLUSH_INTERVAL = 10.0  # max seconds a message waits for its batch to fill
+    MEMORY_WRITE_QUEUE_SIZE = 200
+    MEMORY_WRITE_RETRIES = 3
+    MEMORY_WRITE_BACKOFF = 0.5          # seconds, doubled on each retry
+    MEMORY_FLUSH_TIMEOUT = 5.0          # bound on the final flush at shutdown
     
+    # Spoken Output Configuration
+    FILLER_ENABLED = os.getenv("FILLER_ENABLED", "true").lower() == "true"
+    FILLER_DELAY = 0.3                  # seconds a tool may run before an acknowledgement is spoken
+    FILLER_PHRASES = {                  # tool name prefix -> acknowledgements, used in rotation
+        "COMPOSIO_SEARCH": ("Let me look that up.", "One sec, checking that for you.", "Searching now."),
+        "GMAIL_SEND": ("Sending that now.",),
+        "GMAIL": ("Checking your inbox.", "Let me pull up your email."),
+        "GOOGLECALENDAR": ("Checking your calendar.", "One moment, updating your calendar."),
+    }
+    FILLER_DEFAULT_PHRASES = ("One moment.", "Give me a second.")
+
+    # Provider Configuration (only the selected LiveKit plugins are imported; "" disables optional ones)
+    LLM_PROVIDER = "openai"             # OpenAI-compatible client, pointed at OpenRouter
+    VAD_PROVIDER = os.getenv("VAD_PROVIDER", "silero")
+    STT_PROVIDER = os.getenv("STT_PROVIDER", "deepgram")    # "deepgram" or "groq"
+    TTS_PROVIDER = os.getenv("TTS_PROVIDER", "cartesia")    # "cartesia" or "elevenlabs"
+    NOISE_CANCELLATION_PROVIDER = os.getenv("NOISE_CANCELLATION_PROVIDER", "bvc")
+    AVATAR_PROVIDER = os.getenv("AVATAR_PROVIDER", "tavus")
+
     # Tavus Avatar Configuration
     AVATAR_REPLICA_ID = ""  # get from tavus.ai
     AVATAR_PERSONA_ID = ""  # get from tavus.ai
@@ -57,3 +180,17 @@ class Config:
     # Model Configuration
     LLM_TEMPERATURE = 0.7
     LLM_TIMEOUT = 45.0
+    TOOL_CALL_TIMEOUT = LLM_TIMEOUT     # deadline for a single MCP tool call, including waiting for a pooled session
+
+    # Metrics Configuration (Prometheus-style histograms per job process)
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))   # the worker's /metrics endpoint; 0 disables it
+    METRICS_DIR = os.getenv("METRICS_DIR", "")  # job processes' histogram snapshots; a temp dir unless set
+    METRICS_FLUSH_INTERVAL = 1.0        # min seconds between a job process's snapshots (and one at shutdown)
+    METRICS_TRACE_PATH = os.getenv("METRICS_TRACE_PATH", "")  # optional JSONL file of every observation
+    METRICS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+    # Startup Configuration (per-stage timeouts, seconds)
+    MCP_LOAD_TIMEOUT = 15.0
+    MCP_PREWARM_TIMEOUT = 5.0           # catalog fetch in prewarm; LiveKit allows 10s for the whole prewarm
+    MEMORY_LOAD_TIMEOUT = 10.0
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from livekit.agents import ChatContext
+
+from .config import Config
+
+SUMMARY_ID = "context_summary"
+SUMMARY_INSTRUCTIONS = (
+    "Summarize this earlier part of a voice conversation between a user and their AI concierge. "
+    "Keep facts, names, dates, decisions, open requests and results of tool calls the user may refer back to. "
+    "Write plain prose, no more than 150 words."
+)
+
+
+def _item_text(item) -> str:
+    if item.type == "message":
+        return item.text_content or ""
+    if item.type == "function_call":
+        return f"{item.name}({item.arguments})"
+    if item.type == "function_call_output":
+        return item.output or ""
+    return ""
+
+
+def _transcript(items, previous_summary: str) -> str:
+    lines = [f"Summary so far: {previous_summary}"] if previous_summary else []
+    for item in items:
+        text = _item_text(item)
+        if not text:
+            continue
+        if item.type == "message":
+            lines.append(f"{item.role.title()}: {text}")
+        elif item.type == "function_call":
+            lines.append(f"Tool call: {text}")
+        else:
+            lines.append(f"Tool result: {text[:Config.CONTEXT_TOOL_OUTPUT_STUB_CHARS]}")
+    return "\n".join(lines)
+
+
+async def summarize_with_llm(llm, transcript: str) -> str:
+    """Summarize `transcript` with `llm`, an instance kept apart from the session's so its metrics are not reported."""
+    chat_ctx = ChatContext()
+    chat_ctx.add_message(role="system", content=SUMMARY_INSTRUCTIONS)
+    chat_ctx.add_message(role="user", content=transcript)
+    parts = []
+    async with llm.chat(chat_ctx=chat_ctx) as stream:
+        async for chunk in stream:
+            if chunk.delta and chunk.delta.content:
+                parts.append(chunk.delta.content)
+    return "".join(parts).strip()
+
+
+class ChatCompactor:
+    """Keeps an agent's chat context bounded over long sessions.
+
+    The last CONTEXT_KEEP_TURNS user turns stay verbatim. Before that, large
+    tool outputs are replaced with a stub straight away, and once
+    CONTEXT_SUMMARIZE_BATCH old turns have built up they are folded, in the
+    background, into a single summary message after the static prompt prefix.
+    Messages are handed to the memory writer before they are summarized away,
+    so what is persisted does not depend on when compaction ran.
+    """
+
+    def __init__(self, agent, summarize: Callable[[str], Awaitable[str]], memory_writer=None):
+        self.agent = agent
+        self.summarize = summarize
+        self.memory_writer = memory_writer
+        self._task: Optional[asyncio.Task] = None
+        self._summary_backoff = Config.CONTEXT_SUMMARY_BACKOFF
+        self._summary_retry_at = 0.0
+
+    def maybe_compact(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._compact())
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def _split(self, items):
+        """Return (index after the static prefix, index of the first verbatim turn), or None."""
+        static_end = 0
+        while static_end < len(items) and items[static_end].type == "message" and items[static_end].role == "system":
+            static_end += 1
+        user_turns = [
+            i for i in range(static_end, len(items))
+            if items[i].type == "message" and items[i].role == "user"
+        ]
+        if len(user_turns) <= Config.CONTEXT_KEEP_TURNS:
+            return None
+        return static_end, user_turns[-Config.CONTEXT_KEEP_TURNS], len(user_turns) - Config.CONTEXT_KEEP_TURNS
+
+    async def _compact(self):
+        try:
+            split = self._split(self.agent.chat_ctx.items)
+            if split is None:
+                return
+            static_end, boundary, old_turns = split
+            old_items = self.agent.chat_ctx.items[static_end:boundary]
+
+            loop = asyncio.get_running_loop()
+            if old_turns >= Config.CONTEXT_SUMMARIZE_BATCH and loop.time() >= self._summary_retry_at:
+                summary = await self._summarize(old_items)
+                if summary:
+                    self._summary_backoff = Config.CONTEXT_SUMMARY_BACKOFF
+                    await self._apply_summary(summary, old_items)
+                    return
+                # Retry later, not after every turn, while the summarizer is slow or failing
+                self._summary_retry_at = loop.time() + self._summary_backoff
+                self._summary_backoff = min(self._summary_backoff * 2, Config.CONTEXT_SUMMARY_MAX_BACKOFF)
+
+            await self._stub_tool_outputs()
+        except Exception as e:
+            logging.warning(f"⚠️ Chat context compaction skipped: {e}")
+
+    @staticmethod
+    def _stub_tool_output(item):
+        if item.type == "function_call_output" and len(item.output or "") > Config.CONTEXT_TOOL_OUTPUT_STUB_CHARS:
+            return item.model_copy(update={"output": f"[{len(item.output)} chars of earlier {item.name} output omitted]"})
+        return item
+
+    async def _stub_tool_outputs(self):
+        # Read after any await, so turns added in the meantime are kept
+        chat_ctx = self.agent.chat_ctx.copy()
+        split = self._split(chat_ctx.items)
+        if split is None:
+            return
+        static_end, boundary, _ = split
+        old_items = chat_ctx.items[static_end:boundary]
+        stubbed = [self._stub_tool_output(item) for item in old_items]
+        if any(new is not old for new, old in zip(stubbed, old_items)):
+            chat_ctx.items[static_end:boundary] = stubbed
+            await self.agent.update_chat_ctx(chat_ctx)
+
+    async def _summarize(self, old_items) -> str:
+        """Summary of `old_items` and any previous summary, or '' if the summarizer failed."""
+        previous = self.agent.chat_ctx.get_by_id(SUMMARY_ID)
+        previous_text = previous.text_content if previous is not None else ""
+        if self.memory_writer is not None:
+            for item in old_items:
+                self.memory_writer.add_message(item)
+
+        try:
+            return await asyncio.wait_for(
+                self.summarize(_transcript(old_items, previous_text)), timeout=Config.CONTEXT_SUMMARY_TIMEOUT
+            )
+        except Exception as e:
+            logging.warning(f"⚠️ Chat summary failed, retrying in {self._summary_backoff:.0f}s: {e!r}")
+            return ''
+
+    async def _apply_summary(self, summary: str, old_items):
+        # Apply to the live context: turns added while we were summarizing are kept as they are
+        live = self.agent.chat_ctx.copy()
+        removed = {item.id for item in old_items} | {SUMMARY_ID}
+        kept = [item for item in live.items if item.id not in removed]
+
+        summary_ctx = ChatContext()
+        summary_ctx.add_message(role="system", content=f"Summary of the earlier conversation: {summary}", id=SUMMARY_ID)
+        insert_at = 0
+        while insert_at < len(kept) and kept[insert_at].type == "message" and kept[insert_at].role == "system":
+            insert_at += 1
+        kept[insert_at:insert_at] = summary_ctx.items
+
+        live.items[:] = kept
+        await self.agent.update_chat_ctx(live)
+        logging.info(f"🗜️ Summarized {len(old_items)} earlier chat items into {len(summary)} chars")
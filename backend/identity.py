@@ -0,0 +1,82 @@
+import re
+import json
+import hashlib
+import logging
+from contextvars import ContextVar
+from typing import Optional
+
+from .config import Config
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.@:-]+")
+
+
+class UserScope:
+    """The user a session belongs to. `user_id` stays None until the participant is identified."""
+
+    __slots__ = ("user_id",)
+
+    def __init__(self, user_id: Optional[str] = None):
+        self.user_id = user_id
+
+
+_current_scope: ContextVar[UserScope] = ContextVar("user_scope", default=UserScope())
+
+
+def bind_user_scope() -> UserScope:
+    """Start a session's user scope. Call before the session spawns its tasks so they all share it."""
+    scope = UserScope()
+    _current_scope.set(scope)
+    return scope
+
+
+def current_user_id() -> Optional[str]:
+    return _current_scope.get().user_id
+
+
+def _clean(value) -> Optional[str]:
+    """Safe user id for a raw value; distinct raw values never share one.
+
+    Values that are already safe and short enough are used as they are. Others
+    become a sanitized prefix plus a hash of the raw value after "~", which a
+    value used as-is cannot contain.
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    safe = _UNSAFE_CHARS.sub("_", value)
+    if safe == value and len(value) <= Config.USER_ID_MAX_LENGTH:
+        return value
+    digest = hashlib.sha256(value.encode()).hexdigest()[:Config.USER_ID_HASH_CHARS]
+    return f"{safe[:Config.USER_ID_MAX_LENGTH - len(digest) - 1]}~{digest}"
+
+
+def resolve_user_id(participant) -> Optional[str]:
+    """Mem0 user id for a participant: metadata JSON, then attributes, then the participant identity."""
+    key = Config.USER_ID_METADATA_KEY
+    try:
+        metadata = json.loads(participant.metadata) if participant.metadata else {}
+    except (TypeError, ValueError):
+        metadata = {}
+    candidates = (
+        metadata.get(key) if isinstance(metadata, dict) else None,
+        (participant.attributes or {}).get(key),
+        participant.identity,
+    )
+    for candidate in candidates:
+        user_id = _clean(candidate)
+        if user_id:
+            return user_id
+    logging.warning("⚠️ Participant has no usable identity")
+    return None
+
+
+async def identify_user(ctx) -> Optional[str]:
+    """Wait for the room's user to join and resolve their user id (None if they have no usable identity)."""
+    await ctx.connect()
+    participant = await ctx.wait_for_participant()
+    user_id = resolve_user_id(participant)
+    if user_id is not None:
+        logging.info(f"👤 Session user: {user_id} (participant {participant.identity})")
+    return user_id
@@ -1,99 +1,337 @@
+import sys
 import json
+import time
 import logging
 import asyncio
-from openai import AsyncOpenAI
 import os
-# LiveKit imports
-from livekit.agents import AgentSession, cli, WorkerOptions, RoomInputOptions, JobContext , Agent, JobContext, ChatContext, llm
-from livekit.plugins import deepgram, silero, groq, elevenlabs, noise_cancellation, cartesia, openai, tavus
+# LiveKit imports (provider plugins are imported per Config by .providers, on first use)
+from livekit.agents import AgentSession, cli, WorkerOptions, RoomInputOptions, JobContext , Agent, JobContext, JobProcess, ChatContext, llm
+from livekit import rtc
 
 # Local imports
 from .config import Config, validate_environment
-from .mcp_handler import load_and_convert_mcp_tools
-from .memory_handler import load_memories, shutdown_hook
+from . import providers
+from .mcp_handler import (
+    load_and_convert_mcp_tools, close_mcp_session_pools, prewarm_mcp_tool_catalog, log_tool_cache_stats,
+    current_tool_search_index,
+)
+from .tool_router import ToolRouter
+from .prompt_cache import PromptCacheTransport, PromptCacheStats
+from .context_compaction import ChatCompactor, summarize_with_llm
+from .speculation import SpeculativePrefetcher
+from .vision import CameraSampler, FrameSelector
+from .identity import bind_user_scope, identify_user
+from .telemetry import observe, record_pipeline_metrics, start_metrics_server, flush_job_metrics
+from .memory_handler import load_memories, shutdown_hook, get_memory_client, MemoryRetriever, MemoryWriter
 from .agent import MCPAssistant
-from mem0 import AsyncMemoryClient
 import asyncio
 from dotenv import load_dotenv
 load_dotenv()
 
-async def entrypoint(ctx: JobContext):
-    logging.info("🚀 Starting MCP + LiveKit + Mem0 Voice Agent")
 
-    # --- IMMEDIATE, FAST SETUP ---
-    # Create the LiveKit session objects first. This is all local and very fast.
+def _create_llm_client():
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    return AsyncOpenAI(
+        api_key=Config.OPENROUTER_API_KEY,
+        base_url=Config.OPENROUTER_BASE_URL,
+        default_headers={
+            "HTTP-Referer": "livekit-agent",
+            "X-Title": "LiveKit Agent",
+        },
+        # Keeps the instructions/tools/memory prefix stable and marked for provider-side caching
+        http_client=DefaultAsyncHttpxClient(transport=PromptCacheTransport()),
+    )
+
+
+# Everything a job needs that does not depend on the room, built once per worker process
+PREWARM_FACTORIES = {
+    "vad": lambda: providers.create("vad"),
+    "llm_client": _create_llm_client,
+    "stt": lambda: providers.create("stt"),
+    "tts": lambda: providers.create("tts"),
+    "noise_cancellation": lambda: providers.create("noise_cancellation"),
+}
+
+
+def prewarm(proc: JobProcess):
+    """Load models, clients and the tool catalog before any job is assigned to this process."""
+    start = time.perf_counter()
+    for key, factory in PREWARM_FACTORIES.items():
+        proc.userdata[key] = factory()
+    # Plugins used per job are imported now, on the process's main thread as LiveKit requires
+    providers.import_plugin("llm")
+    providers.import_plugin("avatar")
+    prewarm_mcp_tool_catalog()
+    logging.info(f"🔥 Worker process prewarmed in {time.perf_counter() - start:.2f}s")
+
+
+def _prewarmed(ctx: JobContext, key: str):
+    """Return the object prewarmed for this process, building it now if prewarm did not run."""
+    userdata = ctx.proc.userdata
+    if key not in userdata:
+        logging.warning(f"⚠️ '{key}' was not prewarmed, creating it inside the job")
+        userdata[key] = PREWARM_FACTORIES[key]()
+    return userdata[key]
+
+
+class StartupTimings:
+    """Durations of the startup stages of one job, for the critical-path breakdown."""
+
+    def __init__(self):
+        self.job_start = time.perf_counter()
+        self.stages = {}
+
+    def record(self, stage: str, started: float):
+        self.stages[stage] = time.perf_counter() - started
+        observe("startup_stage_seconds", self.stages[stage], stage=stage)
+
+    def log(self, label: str):
+        breakdown = ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in self.stages.items())
+        logging.info(f"⏱️ {label}: {breakdown}")
+
+
+def _report_time_to_first_greeting(session: AgentSession, timings: StartupTimings):
+    """Log how long the job took to start speaking for the first time."""
+    def on_agent_state_changed(ev):
+        if ev.new_state == "speaking":
+            session.off("agent_state_changed", on_agent_state_changed)
+            timings.record("first_greeting", timings.job_start)
+            timings.log("Time to first greeting")
+
+    session.on("agent_state_changed", on_agent_state_changed)
+
+
+async def _run_stage(stage: str, coro, timeout: float, timings: StartupTimings):
+    """Await a startup stage with its own timeout. Returns None if it failed or timed out."""
+    started = time.perf_counter()
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        logging.warning(f"⚠️ Startup stage '{stage}' timed out after {timeout:.0f}s, continuing without it")
+    except Exception as e:
+        logging.error(f"❌ Startup stage '{stage}' failed: {e}", exc_info=True)
+    finally:
+        timings.record(stage, started)
+    return None
+
+
+async def _attach_memories(assistant: MCPAssistant, memory_ctx: ChatContext):
+    """Insert the memory context ahead of the conversation, after any system instructions."""
+    chat_ctx = assistant.chat_ctx.copy()
+    insert_at = 0
+    while insert_at < len(chat_ctx.items) and getattr(chat_ctx.items[insert_at], "role", None) == "system":
+        insert_at += 1
+    chat_ctx.items[insert_at:insert_at] = memory_ctx.items
+    await assistant.update_chat_ctx(chat_ctx)
+
+
+GREETING_INSTRUCTIONS = "Hi! I'm A.R.I.A - Lightning-Fast AI Concierge"
+
+
+def setup_session(ctx: JobContext, timings: StartupTimings):
+    """Build a job's session and assistant, start loading tools and memories, and register the session's shutdown callbacks.
+
+    Shared by `entrypoint` and benchmarks/bench_sessions.py. Returns (session, assistant, load_tasks).
+    """
+    # Bound before the session spawns its tasks, so tool calls see the user once identified
+    user_scope = bind_user_scope()
+
+    # Models and clients come prewarmed from the worker process
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3", language="en"),
-        llm=openai.LLM(
+        stt=_prewarmed(ctx, "stt"),
+        llm=providers.create(
+            "llm",
             model=Config.OPENROUTER_MODEL,
-            client=AsyncOpenAI(
-                api_key=Config.OPENROUTER_API_KEY,
-                base_url=Config.OPENROUTER_BASE_URL,
-                default_headers={
-                    "HTTP-Referer": "livekit-agent",
-                    "X-Title": "LiveKit Agent",
-                }
-            ),
+            client=_prewarmed(ctx, "llm_client"),
             temperature=Config.LLM_TEMPERATURE,
             timeout=Config.LLM_TIMEOUT,
+            parallel_tool_calls=True,
         ),
-        tts=cartesia.TTS(voice=Config.CARTESIA_VOICE_ID, model=Config.CARTESIA_MODEL),
-        vad=silero.VAD.load(),
+        tts=_prewarmed(ctx, "tts"),
+        vad=_prewarmed(ctx, "vad"),
     )
+    _report_time_to_first_greeting(session, timings)
 
-    avatar = tavus.AvatarSession(
-        replica_id=Config.AVATAR_REPLICA_ID,
-        persona_id=Config.AVATAR_PERSONA_ID
+    prompt_cache_stats = PromptCacheStats()
+    session.on("metrics_collected", lambda ev: prompt_cache_stats.record(ev.metrics))
+    # STT, end-of-turn, LLM and TTS latencies into the /metrics histograms
+    session.on("metrics_collected", lambda ev: record_pipeline_metrics(ev.metrics))
+
+    # Turns are streamed to Mem0 as they happen; the writer buffers until the memory client is ready
+    memory_writer = MemoryWriter()
+    session.on("conversation_item_added", lambda ev: memory_writer.add_message(ev.item))
+
+    # The agent starts without tools or memories; both are attached as their loads finish
+    assistant = MCPAssistant([], chat_ctx=ChatContext())
+
+    # Summaries get an LLM instance of their own: the session only reports its own LLM's
+    # metrics, so summary requests stay out of the turn latency and prompt cache figures
+    summary_llm = providers.create(
+        "llm",
+        model=Config.OPENROUTER_MODEL,
+        client=_prewarmed(ctx, "llm_client"),
+        temperature=Config.LLM_TEMPERATURE,
+        timeout=Config.LLM_TIMEOUT,
     )
 
-    # --- 1. CONNECT IMMEDIATELY ---
-    # Connect the avatar to the room right away. This satisfies the 10-second timer.
-    logging.info("Connecting avatar to the room...")
-    await avatar.start(session, room=ctx.room)
-    logging.info("✅ Avatar connected.")
+    # Long sessions: older turns are stubbed/summarized in the background after each assistant reply
+    compactor = ChatCompactor(
+        assistant,
+        summarize=lambda transcript: summarize_with_llm(summary_llm, transcript),
+        memory_writer=memory_writer,
+    )
 
-    # --- 2. NOW, PERFORM SLOW INITIALIZATIONS ---
-    # Now that we are connected, we can safely load tools and memories.
-    logging.info("Loading MCP tools and memories...")
-    try:
-        validate_environment()
-        logging.info("🔄 Loading MCP tools...")
-        mcp_tools = await load_and_convert_mcp_tools()
+    def on_conversation_item_added(ev):
+        if getattr(ev.item, "role", None) == "assistant":
+            compactor.maybe_compact()
+
+    session.on("conversation_item_added", on_conversation_item_added)
+
+    def on_user_input_transcribed(ev):
+        # The retriever is attached once memories load; until then turns go without the extra memories
+        if assistant.memory_retriever is not None:
+            assistant.memory_retriever.on_transcript(ev.transcript, ev.is_final)
+
+    session.on("user_input_transcribed", on_user_input_transcribed)
+
+    if Config.SPECULATION_ENABLED:
+        assistant.speculator = SpeculativePrefetcher()
+        session.on(
+            "user_input_transcribed",
+            lambda ev: assistant.speculator.on_transcript(ev.transcript, ev.is_final),
+        )
+
+    if Config.VISION_ENABLED:
+        # Sampled, deduplicated camera frames are attached to user turns by the assistant
+        assistant.camera = CameraSampler(FrameSelector())
+
+        def on_track_subscribed(track, publication, participant):
+            if (
+                publication.source == rtc.TrackSource.SOURCE_CAMERA
+                and participant.kind != rtc.ParticipantKind.PARTICIPANT_KIND_AGENT
+            ):
+                assistant.camera.watch(track)
+
+        ctx.room.on("track_subscribed", on_track_subscribed)
+
+    memory_state = {"mem0": None, "memory_str": '', "user_name": None}
+
+    async def load_tools_stage():
+        mcp_tools = await _run_stage("tools", load_and_convert_mcp_tools(), Config.MCP_LOAD_TIMEOUT, timings)
         if not mcp_tools:
             logging.warning("⚠️ No MCP tools loaded, agent will run without external tools")
-        
-        logging.info("🔄 Loading memories...")
-        mem0, initial_ctx, memory_str, user_name = await load_memories()
-        
-        tool_count = len(mcp_tools)
+            return
+        search_index = current_tool_search_index()
+        if search_index is not None and len(mcp_tools) > Config.TOOL_ROUTER_MIN_CATALOG:
+            # Large catalogs: attach the core set now and route the rest per user turn
+            assistant.tool_router = ToolRouter(search_index)
+            mcp_tools = assistant.tool_router.current_tools()
+        await assistant.update_tools(mcp_tools)
+        logging.info(f"✅ Attached {len(mcp_tools)} tools.")
+
+    async def load_memory_stage():
+        # Each room reads and writes only its own user's memories
+        user_id = await _run_stage("identity", identify_user(ctx), Config.USER_IDENTITY_TIMEOUT, timings)
+        if user_id is None:
+            # A shared fallback bucket would mix every unidentified user's memories
+            logging.warning("⚠️ User not identified, this session runs without memories")
+            return
+        user_scope.user_id = user_id
+        memory_state["user_name"] = user_id
+        loaded = await _run_stage("memory", load_memories(user_scope.user_id), Config.MEMORY_LOAD_TIMEOUT, timings)
+        if loaded is None:
+            return
+        mem0, initial_ctx, memory_str, user_name = loaded
+        memory_state.update(mem0=mem0, memory_str=memory_str, user_name=user_name)
+        memory_writer.start(mem0, user_name, memory_str)
+        if initial_ctx.items:
+            await _attach_memories(assistant, initial_ctx)
+        if Config.MEMORY_RETRIEVAL_MODE != "all" and Config.MEM0_API_KEY:
+            assistant.memory_retriever = MemoryRetriever(mem0, user_name, memory_str)
         memory_count = len(json.loads(memory_str)) if memory_str else 0
-        logging.info(f"✅ Loaded {tool_count} tools and {memory_count} memories.")
+        logging.info(f"✅ Attached {memory_count} memories.")
 
+    # Tools and memories load concurrently; a slow Composio or Mem0 endpoint only delays its own feature.
+    load_tasks = []
+    try:
+        validate_environment()
+        logging.info("🔄 Loading MCP tools and memories in the background...")
+        load_tasks = [asyncio.create_task(load_tools_stage()), asyncio.create_task(load_memory_stage())]
     except Exception as e:
         logging.error(f"❌ Failed during initialization: {e}", exc_info=True)
-        mcp_tools = []
-        mem0 = AsyncMemoryClient()
-        initial_ctx = ChatContext()
-        memory_str = ''
-        user_name = Config.DEFAULT_USER
 
-    # --- 3. START THE MAIN AGENT LOGIC ---
-    # Initialize the agent with the loaded data
-    assistant = MCPAssistant(mcp_tools, chat_ctx=initial_ctx)
+    async def cancel_pending_loads():
+        for task in load_tasks:
+            task.cancel()
+        await compactor.aclose()
+        if assistant.memory_retriever is not None:
+            await assistant.memory_retriever.aclose()
+        if assistant.speculator is not None:
+            await assistant.speculator.aclose()
+            logging.info(f"🔮 Speculative prefetch: {assistant.speculator.summary()}")
+        if assistant.camera is not None:
+            await assistant.camera.aclose()
+            logging.info(f"📷 Vision frames: {assistant.camera.selector.summary()}")
 
-    # Register the shutdown hook before starting the main loop
-    ctx.add_shutdown_callback(
-        lambda: shutdown_hook(assistant.chat_ctx, mem0, memory_str, user_name)
-    )
+    ctx.add_shutdown_callback(cancel_pending_loads)
+
+    async def save_memories():
+        if memory_state["user_name"] is None:
+            logging.warning("⚠️ Session ended before the user was identified, nothing saved to memory")
+            return
+        await shutdown_hook(
+            assistant.chat_ctx,
+            memory_state["mem0"] or get_memory_client(),
+            memory_state["memory_str"],
+            memory_state["user_name"],
+            memory_writer,
+        )
+
+    ctx.add_shutdown_callback(save_memories)
+
+    async def log_prompt_cache_stats():
+        logging.info(f"📦 Prompt cache: {prompt_cache_stats.summary()}")
 
+    ctx.add_shutdown_callback(log_prompt_cache_stats)
+    return session, assistant, load_tasks
+
+
+async def entrypoint(ctx: JobContext):
+    timings = StartupTimings()
+    logging.info("🚀 Starting MCP + LiveKit + Mem0 Voice Agent")
+
+    # --- 1. IMMEDIATE, FAST SETUP ---
+    # The session objects are created first; tools and memories start loading in the background.
+    session, assistant, load_tasks = setup_session(ctx, timings)
+
+    # Resources of this job process (LiveKit runs one job per process), not of the session
+    ctx.add_shutdown_callback(close_mcp_session_pools)
+    ctx.add_shutdown_callback(log_tool_cache_stats)
+    # Last, so the save and close timings above are in the snapshot the worker keeps after this process exits
+    ctx.add_shutdown_callback(flush_job_metrics)
+
+    avatar = providers.create("avatar")
+
+    # --- 2. CONNECT IMMEDIATELY ---
+    # Connect the avatar to the room right away. This satisfies the 10-second timer.
+    if avatar is not None:
+        logging.info("Connecting avatar to the room...")
+        stage_start = time.perf_counter()
+        await avatar.start(session, room=ctx.room)
+        timings.record("avatar", stage_start)
+        logging.info("✅ Avatar connected.")
+
+    # --- 3. START THE MAIN AGENT LOGIC ---
     # Start the main agent session loop in a background task
     session_task = asyncio.create_task(session.start(
         agent=assistant,
         room=ctx.room,
         room_input_options=RoomInputOptions(
-            video_enabled=True,
+            # With vision on, the camera sampler reads the track itself; RoomIO would decode every frame again
+            video_enabled=not Config.VISION_ENABLED,
             audio_enabled=True,
-            noise_cancellation=noise_cancellation.BVC()
+            noise_cancellation=_prewarmed(ctx, "noise_cancellation")
         )
     ))
 
@@ -101,8 +339,11 @@ async def entrypoint(ctx: JobContext):
     await asyncio.sleep(0)
 
     # Generate an initial greeting now that the session is running
-    greeting_instructions = "Hi! I'm A.R.I.A - Lightning-Fast AI Concierge"
-    await session.generate_reply(instructions=greeting_instructions)
+    await session.generate_reply(instructions=GREETING_INSTRUCTIONS)
+
+    if load_tasks:
+        await asyncio.gather(*load_tasks, return_exceptions=True)
+        timings.log("Startup stages")
 
     # Wait for the session task to complete (it won't, but this keeps the entrypoint alive)
     await session_task
@@ -110,5 +351,10 @@ async def entrypoint(ctx: JobContext):
 
 if __name__ == "__main__":
     print("🎙️ MCP Voice Agent with Mem0 Memory Starting…")
-    opts = WorkerOptions(entrypoint_fnc=entrypoint)
+    if "download-files" in sys.argv:
+        # Workers import plugins lazily; this command needs them registered up front to fetch their models
+        providers.import_configured_plugins()
+    # In the worker's main process, before it spawns the job processes whose histograms it merges
+    start_metrics_server()
+    opts = WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm)
     cli.run_app(opts)
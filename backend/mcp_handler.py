@@ -1,41 +1,228 @@
 import os
 import re 
 import json
+import time
+import hashlib
+import asyncio
 import logging
 import inspect  
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
 from typing import Optional, Any, Dict, Union
-from datetime import datetime, timezone
 
 # LiveKit imports
+from livekit.agents import RunContext
 from livekit.agents.llm import function_tool
 
-# MCP imports
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_mcp_adapters.tools import load_mcp_tools
-
 from .config import Config
+from .identity import current_user_id
+from .speech import schedule_filler
+from .telemetry import timed
+from .tool_dispatch import compile_tool_plan
+from .tool_results import format_tool_result, log_preview
+from .tool_router import ToolSearchIndex
 
 # Global MCP client to persist across tool calls
 mcp_client = None
-mcp_tools_cache = None
+_mcp_client_url = None
+# Tool catalog of this job process, seeded from MCP_CATALOG_CACHE_PATH: server URL -> catalog entry
+mcp_tools_cache: Dict[str, Dict[str, Any]] = {}
+_catalog_refreshes: Dict[str, asyncio.Task] = {}
+mcp_session_pools: Dict[str, "MCPSessionPool"] = {}
+mcp_tool_index: Dict[str, Dict[str, Any]] = {}   # server name -> {tool name -> MCP tool}
+
+
+class _PooledSession:
+    """One open MCP session, owned by a dedicated task.
+
+    The streamable-HTTP transport runs inside anyio task groups, so the session
+    context must be entered and exited by the same task. The owner task keeps it
+    open until `close()` is called.
+    """
+
+    def __init__(self, client, server_name: str):
+        self.client = client
+        self.server_name = server_name
+        self.session = None
+        self.last_used = time.monotonic()
+        self._closing = asyncio.Event()
+        self._task = None
+
+    async def start(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        try:
+            self.session = await ready
+        except BaseException:
+            self._task.cancel()
+            raise
+        return self
+
+    async def _run(self, ready):
+        try:
+            async with self.client.session(self.server_name) as session:
+                ready.set_result(session)
+                await self._closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logging.warning(f"⚠️ MCP session to '{self.server_name}' closed with error: {e}")
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def ping(self) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=Config.MCP_PING_TIMEOUT)
+            return True
+        except Exception as e:
+            logging.warning(f"⚠️ MCP session health check failed for '{self.server_name}': {e}")
+            return False
+
+    async def close(self):
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=Config.MCP_PING_TIMEOUT)
+            except BaseException:
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """Bounded pool of persistent sessions to a single MCP server.
+
+    Sessions are opened lazily, reused across tool calls for the life of the job,
+    health-checked with a ping when they have been idle for a while, and replaced
+    when they fail.
+    """
+
+    def __init__(self, client, server_name: str, max_sessions: int = None, health_check_interval: float = None):
+        self.client = client
+        self.server_name = server_name
+        self.max_sessions = max_sessions or Config.MCP_POOL_MAX_SESSIONS
+        self.health_check_interval = (
+            Config.MCP_HEALTH_CHECK_INTERVAL if health_check_interval is None else health_check_interval
+        )
+        self._semaphore = asyncio.Semaphore(self.max_sessions)
+        self._idle = []
+        self._sessions = set()
+        self._closed = False
+
+    async def _open(self) -> _PooledSession:
+        pooled = await _PooledSession(self.client, self.server_name).start()
+        self._sessions.add(pooled)
+        logging.info(f"🔗 Opened pooled MCP session to '{self.server_name}' ({len(self._sessions)}/{self.max_sessions})")
+        return pooled
+
+    async def _discard(self, pooled: _PooledSession):
+        self._sessions.discard(pooled)
+        await pooled.close()
+
+    async def _checkout(self) -> _PooledSession:
+        while self._idle:
+            pooled = self._idle.pop()
+            idle_for = time.monotonic() - pooled.last_used
+            if not pooled.alive or (idle_for > self.health_check_interval and not await pooled.ping()):
+                logging.info(f"♻️ Reconnecting stale MCP session to '{self.server_name}'")
+                await self._discard(pooled)
+                continue
+            return pooled
+        return await self._open()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Check out an open `ClientSession`, returning it to the pool afterwards."""
+        if self._closed:
+            raise RuntimeError(f"MCP session pool for '{self.server_name}' is closed")
+
+        async with self._semaphore:
+            pooled = await self._checkout()
+            try:
+                yield pooled.session
+            except BaseException:
+                # The session may be in an unknown state; drop it so the next call reconnects.
+                await self._discard(pooled)
+                raise
+            pooled.last_used = time.monotonic()
+            if self._closed:
+                await self._discard(pooled)
+            else:
+                self._idle.append(pooled)
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]):
+        async with self.acquire() as session:
+            result = await session.call_tool(tool_name, arguments)
+        return _convert_call_tool_result(result)
+
+    async def close(self):
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._discard(pooled)
+
+
+def _convert_call_tool_result(result):
+    """Convert an MCP `CallToolResult` into the same shape LangChain's MCP tools return."""
+    parts = []
+    for content in result.content:
+        if getattr(content, "type", None) == "text":
+            parts.append(content.text)
+        else:
+            parts.append(content.model_dump_json())
+
+    if result.isError:
+        raise RuntimeError("\n".join(parts) or "MCP tool returned an error")
+
+    if len(parts) == 1:
+        return parts[0]
+    return parts
+
+
+async def close_mcp_session_pools():
+    """Close every pooled MCP session. Registered as a job shutdown callback."""
+    pools = list(mcp_session_pools.values())
+    mcp_session_pools.clear()
+    for pool in pools:
+        await pool.close()
+    if pools:
+        logging.info(f"🔌 Closed {len(pools)} MCP session pool(s)")
+
+
+async def _ensure_mcp_client():
+    """Create the MCP client and session pools if this process does not have them yet."""
+    global mcp_client, _mcp_client_url
+
+    if mcp_client is None or _mcp_client_url != Config.COMPOSIO_MCP_URL:
+        logging.info(f"🔗 Connecting to MCP servers: {Config.COMPOSIO_MCP_URL}")
+        await close_mcp_session_pools()
+        # Imported on first use: the catalog is usually served from cache and the worker supervisor never connects
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+        mcp_client = MultiServerMCPClient({
+            "composio": {"url": Config.COMPOSIO_MCP_URL, "transport": "streamable_http"},
+           # "n8n-self-hosted": {"url": Config.N8N_MCP_SERVER_URL, "transport": "streamable_http"},
+        })
+        _mcp_client_url = Config.COMPOSIO_MCP_URL
+
+    if "composio" not in mcp_session_pools:
+        mcp_session_pools["composio"] = MCPSessionPool(mcp_client, "composio")
+
 
 async def initialize_mcp_client():
     """Initialize the MCP client globally and return tools with server names."""
-    global mcp_client
-    
-    
-    
-    logging.info(f"🔗 Connecting to MCP servers: {Config.COMPOSIO_MCP_URL}")
-    
-    mcp_client = MultiServerMCPClient({
-        "composio": {"url": Config.COMPOSIO_MCP_URL, "transport": "streamable_http"},
-       # "n8n-self-hosted": {"url": Config.N8N_MCP_SERVER_URL, "transport": "streamable_http"},
-    })
+    from langchain_mcp_adapters.tools import load_mcp_tools
+
+    await _ensure_mcp_client()
     
     all_tools_with_servers = []
     
     try:
-        async with mcp_client.session("composio") as session:
+        # List tools over a pooled session so the first tool call reuses the warm connection
+        async with mcp_session_pools["composio"].acquire() as session:
             composio_tools = await load_mcp_tools(session)
             for tool in composio_tools:
                 all_tools_with_servers.append((tool, "composio"))
@@ -55,8 +242,220 @@ async def initialize_mcp_client():
         raise
 
 
+# Name fragments of tools that change state; these are never cached, whatever TOOL_CACHE_TTLS says
+_SIDE_EFFECT_WORDS = (
+    "SEND", "REPLY", "CREATE", "UPDATE", "DELETE", "REMOVE", "INSERT", "PATCH", "MOVE",
+    "MODIFY", "TRASH", "DRAFT", "ADD", "SET",
+)
+# Argument keys whose values are free text, compared case-insensitively
+_QUERY_KEYS = frozenset({"query", "q", "search_query", "keyword", "keywords"})
+
+
+def tool_cache_ttl(tool_name: str) -> float:
+    """Seconds a tool's results may be cached; 0 for tools that are not known to be read-only."""
+    upper = tool_name.upper()
+    if any(word in upper.split("_") for word in _SIDE_EFFECT_WORDS):
+        return 0.0
+    for prefix, ttl in Config.TOOL_CACHE_TTLS.items():
+        if upper.startswith(prefix):
+            return ttl
+    return 0.0
+
+
+def _normalize_arg(key: str, value):
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.lower() if key in _QUERY_KEYS else value
+    if isinstance(value, dict):
+        return {k: _normalize_arg(k, v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        return [_normalize_arg(key, v) for v in value]
+    return value
+
+
+def tool_cache_scope(tool_name: str) -> Optional[str]:
+    """Cache partition for a tool's results: shared for public lookups, else the session's user.
+
+    None means the user is not identified yet, and user-specific results must not be cached.
+    """
+    if tool_name.upper().startswith(Config.TOOL_CACHE_SHARED_PREFIXES):
+        return ""
+    return current_user_id()
+
+
+class ToolResultCache:
+    """LRU cache of read-only tool results with per-tool TTLs, partitioned by user.
+
+    It lives in the job process, and LiveKit runs one job per process, so it saves
+    repeated calls within a session, not across sessions. Identical calls that
+    arrive while one is already in flight share its result instead of hitting the
+    server again. Errors are never cached. A user's entries for a toolkit are
+    dropped whenever one of its uncacheable (possibly writing) tools runs.
+    """
+
+    def __init__(self, max_entries: int = None, max_entries_per_user: int = None):
+        self.max_entries = max_entries or Config.TOOL_CACHE_MAX_ENTRIES
+        self.max_entries_per_user = max_entries_per_user or Config.TOOL_CACHE_MAX_ENTRIES_PER_USER
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (expires_at, output, fetch_seconds)
+        self._user_counts: Counter = Counter()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "saved_seconds": 0.0}
+
+    @staticmethod
+    def make_key(scope: str, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+        normalized = {k: _normalize_arg(k, v) for k, v in arguments.items()}
+        return f"{scope}|{server_name}:{tool_name}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+    async def get_or_call(self, key: str, ttl: float, fetch):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, output, fetch_seconds = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["saved_seconds"] += fetch_seconds
+                return output
+            self._remove(key)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        self.stats["misses"] += 1
+        task = asyncio.create_task(self._fetch(key, ttl, fetch))
+        self._in_flight[key] = task
+        # Shielded so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, ttl: float, fetch):
+        started = time.monotonic()
+        task = asyncio.current_task()
+        try:
+            output = await fetch()
+        finally:
+            invalidated = self._in_flight.get(key) is not task
+            if not invalidated:
+                del self._in_flight[key]
+        if invalidated:
+            # A write to the toolkit landed while this read was running: hand it back, don't keep it
+            return output
+        fetch_seconds = time.monotonic() - started
+        scope = key.partition("|")[0]
+        if key not in self._entries:
+            self._user_counts[scope] += 1
+        self._entries[key] = (time.monotonic() + ttl, output, fetch_seconds)
+        self._entries.move_to_end(key)
+        if scope and self._user_counts[scope] > self.max_entries_per_user:
+            self._remove(next(k for k in self._entries if k.startswith(scope + "|")))
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        return output
+
+    def invalidate(self, scope: str, tool_name: str):
+        """Drop a user's cached and in-flight results from the same toolkit as `tool_name`.
+
+        The toolkit is the first word of the name, so GMAIL_SEND_EMAIL clears
+        GMAIL_FETCH_EMAILS and GOOGLECALENDAR_CREATE_EVENT clears GOOGLECALENDAR_LIST_EVENTS.
+        """
+        prefix = f"{scope}|"
+        toolkit = tool_name.upper().split("_")[0] + "_"
+
+        def matches(key: str) -> bool:
+            return key.startswith(prefix) and key[len(prefix):].split(":", 2)[1].upper().startswith(toolkit)
+
+        stale = [key for key in self._entries if matches(key)]
+        for key in stale:
+            self._remove(key)
+        for key in [key for key in self._in_flight if matches(key)]:
+            del self._in_flight[key]
+        if stale:
+            logging.info(f"📦 {tool_name} ran; dropped {len(stale)} cached {toolkit.rstrip('_')} results")
+
+    def _remove(self, key: str):
+        del self._entries[key]
+        scope = key.partition("|")[0]
+        self._user_counts[scope] -= 1
+        if self._user_counts[scope] <= 0:
+            del self._user_counts[scope]
+
+    def summary(self) -> str:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        hit_rate = (self.stats["hits"] + self.stats["coalesced"]) / lookups if lookups else 0.0
+        return (
+            f"{lookups} lookups in this session, {hit_rate:.0%} served without a server call "
+            f"({self.stats['hits']} hits, {self.stats['coalesced']} coalesced), "
+            f"~{self.stats['saved_seconds']:.1f}s of tool latency saved"
+        )
+
+
+tool_result_cache = ToolResultCache()
+
+
+async def log_tool_cache_stats():
+    """Log the result cache hit rate. Registered as a job shutdown callback."""
+    logging.info(f"📦 Tool result cache: {tool_result_cache.summary()}")
+
+
+async def _unless_interrupted(context: Optional[RunContext], coro):
+    """Await a tool call, abandoning it if the user barges in. Returns None when interrupted.
+
+    Tool calls emitted in the same LLM turn run as concurrent tasks, each bounded
+    by its server's session pool, so a turn takes as long as its slowest call.
+    """
+    speech_handle = getattr(context, "speech_handle", None)
+    if speech_handle is None:
+        return await coro
+
+    call_task = asyncio.ensure_future(coro)
+    try:
+        await speech_handle.wait_if_not_interrupted([call_task])
+    except BaseException:
+        call_task.cancel()
+        raise
+    if not call_task.done():
+        call_task.cancel()
+        return None
+    return call_task.result()
+
+
+async def _call_tool(pool: "MCPSessionPool", tool_name: str, arguments: Dict[str, Any]) -> str:
+    result = await asyncio.wait_for(pool.call_tool(tool_name, arguments), timeout=Config.TOOL_CALL_TIMEOUT)
+    return format_tool_result(tool_name, result)
+
+
+async def prefetch_tool_result(original_tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Run a read-only tool through the result cache before the LLM asks for it.
+
+    `arguments` are the MCP call arguments, so an identical call from the LLM is
+    served from the cache. Unlike the LLM-facing wrappers, which return errors as
+    text for the LLM to read, every failure here raises.
+    """
+    server_name = next((server for server, tools in mcp_tool_index.items() if original_tool_name in tools), None)
+    if server_name is None:
+        raise LookupError(f"Tool '{original_tool_name}' is not loaded")
+    pool = mcp_session_pools.get(server_name)
+    if pool is None:
+        raise RuntimeError("MCP client not initialized")
+    ttl = tool_cache_ttl(original_tool_name)
+    scope = tool_cache_scope(original_tool_name)
+    if ttl <= 0 or scope is None:
+        raise ValueError(f"Results of '{original_tool_name}' cannot be cached for this session")
+    cache_key = ToolResultCache.make_key(scope, server_name, original_tool_name, arguments)
+    return await tool_result_cache.get_or_call(cache_key, ttl, lambda: _call_tool(pool, original_tool_name, arguments))
+
+
+def _json_schema(args_schema) -> Optional[Dict[str, Any]]:
+    """MCP adapters give a JSON schema dict; pydantic models are converted to one."""
+    if args_schema is None or isinstance(args_schema, dict):
+        return args_schema
+    if hasattr(args_schema, 'model_json_schema'):
+        return args_schema.model_json_schema()
+    return args_schema.schema()
+
+
 def create_mcp_tool_wrapper(mcp_tool, tool_index: int, server_name: str):
-    """Create a robust, LiveKit-ready wrapper for an MCP tool with parameter remapping."""
+    """Create a robust, LiveKit-ready wrapper for an MCP tool with a precompiled argument plan."""
 
     safe_name = (
         mcp_tool.name.replace("-", "_")
@@ -69,122 +468,100 @@ def create_mcp_tool_wrapper(mcp_tool, tool_index: int, server_name: str):
     description = mcp_tool.description or f"Execute {mcp_tool.name}"
     original_tool_name = mcp_tool.name
 
-    # 1. Discover parameters for the function signature
-    parameters = []
-    tool_schema = getattr(mcp_tool, 'args_schema', None)
-    
-    if tool_schema and hasattr(tool_schema, '__fields__'):
-        for field_name, field_info in tool_schema.__fields__.items():
-            param_type = str
-            if hasattr(field_info, 'annotation'):
-                if field_info.annotation == int: param_type = int
-                elif field_info.annotation == bool: param_type = bool
-                elif field_info.annotation == float: param_type = float
-            parameters.append((field_name, param_type))
-    else:
-        # Smarter fallback based on tool name
-        tool_name_lower = original_tool_name.lower()
-        if 'search' in tool_name_lower or 'crawl' in tool_name_lower:
-            parameters = [("query", str)]
-        elif 'send' in tool_name_lower and ('gmail' in tool_name_lower or 'email' in tool_name_lower):
-            parameters = [("to", str), ("subject", str), ("body", str)]
-        elif 'create_event' in tool_name_lower and 'calendar' in tool_name_lower:
-             parameters = [("summary", str), ("start_time", str), ("end_time", str)]
-        elif 'update_event' in tool_name_lower and 'calendar' in tool_name_lower:
-             parameters = [("id", str), ("summary", str), ("start_time", str), ("end_time", str)]
-        elif 'delete_event' in tool_name_lower and 'calendar' in tool_name_lower:
-             parameters = [("id", str)]
-        else:
-            parameters = [("input", str)]
+    # 1. Compile the argument plan once from the tool's schema
+    plan = compile_tool_plan(tool_name, _json_schema(getattr(mcp_tool, 'args_schema', None)))
+    cache_ttl = tool_cache_ttl(original_tool_name)
+    # LiveKit finds the RunContext parameter by its annotation, so its name only has to avoid the schema's fields
+    context_param = "run_context"
+    while any(name == context_param for name, _, _ in plan.parameters):
+        context_param = f"{context_param}_"
 
     # 2. Define the core logic of the function
     async def wrapper(**kwargs) -> str:
-        global mcp_client
-        logging.info(f"[{tool_name}] called on server: {server_name} with args: {kwargs}")
-
-        if not mcp_client: return "Error: MCP client not initialized"
-
-        try:
-            filtered_args = {k: v for k, v in kwargs.items() if v is not None}
-            
-            # Pre-convert datetimes to UTC
-            tool_name_lower_check = original_tool_name.lower()
-            if 'calendar' in tool_name_lower_check:
-                for key in ['start_time', 'end_time']:
-                    if key in filtered_args and isinstance(filtered_args[key], str):
-                        try:
-                            dt_obj = datetime.fromisoformat(filtered_args[key])
-                            utc_dt_str = dt_obj.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-                            filtered_args[key] = utc_dt_str
-                            logging.info(f"[{tool_name}] Converted '{key}' to UTC: {utc_dt_str}")
-                        except ValueError:
-                            logging.warning(f"[{tool_name}] Could not parse datetime string for '{key}': {filtered_args[key]}")
-
-            # Argument Remapping Logic
-            remapped_args = filtered_args.copy()
-            if ('search' in tool_name_lower_check or 'crawl' in tool_name_lower_check) and 'input' in remapped_args and 'query' not in remapped_args:
-                remapped_args['query'] = remapped_args.pop('input')
-                logging.info(f"[{tool_name}] Remapped 'input' -> 'query'")
-
-            if 'calendar' in tool_name_lower_check:
-                if 'start_time' in remapped_args and 'start_datetime' not in remapped_args:
-                    remapped_args['start_datetime'] = remapped_args.pop('start_time')
-                    logging.info(f"[{tool_name}] Remapped 'start_time' -> 'start_datetime'")
-                if 'end_time' in remapped_args and 'end_datetime' not in remapped_args:
-                    remapped_args['end_datetime'] = remapped_args.pop('end_time')
-                    logging.info(f"[{tool_name}] Remapped 'end_time' -> 'end_datetime'")
-                if ('update_event' in tool_name_lower_check or 'delete_event' in tool_name_lower_check) and 'id' in remapped_args and 'event_id' not in remapped_args:
-                    remapped_args['event_id'] = remapped_args.pop('id')
-                    logging.info(f"[{tool_name}] Remapped 'id' -> 'event_id'")
-            
-            if 'send' in tool_name_lower_check and 'gmail' in tool_name_lower_check and 'to' in remapped_args and 'recipient_email' not in remapped_args:
-                remapped_args['recipient_email'] = remapped_args.pop('to')
-                logging.info(f"[{tool_name}] Remapped 'to' -> 'recipient_email'")
+        context: Optional[RunContext] = kwargs.pop(context_param, None)
+        logging.info(f"[{tool_name}] called on server: {server_name} with args: {log_preview(kwargs)}")
+        with timed("tool_call_seconds", tool=original_tool_name, server=server_name) as labels:
+            pool = mcp_session_pools.get(server_name)
+            if not pool:
+                labels["outcome"] = "error"
+                return "Error: MCP client not initialized"
 
-
-            final_args = remapped_args
-   #         if server_name == "n8n-self-hosted":
-     #           if not (len(final_args) == 1 and "input" in final_args):
-      #              final_args = {"input": json.dumps(final_args)}
-       #             logging.info(f"[{tool_name}] Repackaged args for n8n: {final_args}")
+            try:
+                final_args = plan.apply(kwargs)
+       #         if server_name == "n8n-self-hosted":
+         #           if not (len(final_args) == 1 and "input" in final_args):
+          #              final_args = {"input": json.dumps(final_args)}
+           #             logging.info(f"[{tool_name}] Repackaged args for n8n: {final_args}")
             
-            async with mcp_client.session(server_name) as session:
-                session_tools = await load_mcp_tools(session)
-                current_tool = next((t for t in session_tools if t.name == original_tool_name), None)
-                
-                if not current_tool:
+                if original_tool_name not in mcp_tool_index.get(server_name, {}):
                     error_msg = f"Error: Tool '{original_tool_name}' not found on server '{server_name}'"
                     logging.error(f"[{tool_name}] {error_msg}")
+                    labels["outcome"] = "error"
                     return error_msg
-                
-                result = await current_tool.ainvoke(final_args)
-                logging.info(f"[{tool_name}] Raw result: {result}")
 
-                if isinstance(result, (dict, list, tuple)):
-                    return json.dumps(result, indent=2)
-                return str(result)
+                call = lambda: _call_tool(pool, original_tool_name, final_args)
 
-        except Exception as e:
-            error_msg = f"MCP tool error: {str(e)}"
-            logging.error(f"[{tool_name}] {error_msg}", exc_info=True)
-            return error_msg
+                # A short spoken acknowledgement covers the silence if the call is slow
+                filler = schedule_filler(context, original_tool_name)
+                try:
+                    scope = tool_cache_scope(original_tool_name) if cache_ttl > 0 else None
+                    if scope is not None:
+                        cache_key = ToolResultCache.make_key(scope, server_name, original_tool_name, final_args)
+                        # Read-only calls are abandoned on barge-in; the shared fetch still completes and is cached
+                        output = await _unless_interrupted(context, tool_result_cache.get_or_call(cache_key, cache_ttl, call))
+                    else:
+                        # Possibly side-effecting (or not yet attributable to a user): always run to completion
+                        try:
+                            output = await call()
+                        finally:
+                            # Even a failed write may have landed, so cached reads of the same toolkit go
+                            user_id = current_user_id()
+                            if cache_ttl <= 0 and user_id is not None:
+                                tool_result_cache.invalidate(user_id, original_tool_name)
+                finally:
+                    if filler is not None:
+                        filler.cancel()
+                if output is None:
+                    logging.info(f"[{tool_name}] Cancelled: the user interrupted")
+                    labels["outcome"] = "cancelled"
+                    return "Tool call cancelled because the user interrupted."
+                logging.info(f"[{tool_name}] Result ({len(output)} chars): {log_preview(output)}")
+                return output
+
+            except asyncio.TimeoutError:
+                error_msg = f"MCP tool error: '{original_tool_name}' did not respond within {Config.TOOL_CALL_TIMEOUT:.0f}s"
+                logging.error(f"[{tool_name}] {error_msg}")
+                labels["outcome"] = "timeout"
+                return error_msg
+            except Exception as e:
+                error_msg = f"MCP tool error: {str(e)}"
+                logging.error(f"[{tool_name}] {error_msg}", exc_info=True)
+                labels["outcome"] = "error"
+                return error_msg
 
     # 3. Build the function signature and type hints for LiveKit
-    sig_params = []
-    annotations_dict = {}
-    for param_name, param_type in parameters:
-        optional_type = Optional[param_type]
-        annotations_dict[param_name] = optional_type
+    # LiveKit injects the RunContext and leaves it out of the schema sent to the LLM
+    sig_params = [
+        inspect.Parameter(context_param, inspect.Parameter.KEYWORD_ONLY, default=None, annotation=RunContext)
+    ]
+    annotations_dict = {context_param: RunContext}
+    for param_name, param_type, required in plan.parameters:
+        annotation = param_type if required else Optional[param_type]
+        annotations_dict[param_name] = annotation
         sig_params.append(
             inspect.Parameter(
                 param_name,
                 inspect.Parameter.KEYWORD_ONLY,
-                default=None,
-                annotation=optional_type
+                default=inspect.Parameter.empty if required else None,
+                annotation=annotation
             )
         )
     annotations_dict['return'] = str
 
+    # Object fields are plain strings in the schema; tell the LLM what goes in them
+    if plan.json_fields:
+        description += "\n\nArgs:\n" + "".join(f"    {name}: a JSON-encoded value\n" for name in plan.json_fields)
+
     # 4. Attach the metadata to the wrapper function
     wrapper.__name__ = tool_name
     wrapper.__doc__ = description
@@ -194,26 +571,194 @@ def create_mcp_tool_wrapper(mcp_tool, tool_index: int, server_name: str):
     return function_tool(wrapper)
 
 
+def _tool_spec(mcp_tool) -> Dict[str, Any]:
+    """Reduce an MCP tool to the JSON-serializable parts the wrapper is built from."""
+    schema = _json_schema(getattr(mcp_tool, 'args_schema', None))
+    return {"name": mcp_tool.name, "description": mcp_tool.description, "args_schema": schema}
+
+
+def _schema_hash(specs) -> str:
+    payload = json.dumps(sorted(specs, key=lambda spec: spec["name"]), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _build_catalog_entry(specs_with_servers, schema_hash: str, fetched_at: float) -> Dict[str, Any]:
+    """Convert tool specs into LiveKit function tools and the per-server name index."""
+    livekit_tools = []
+    by_name: Dict[str, Any] = {}
+    index: Dict[str, Dict[str, Any]] = {}
+
+    for i, (spec, server_name) in enumerate(specs_with_servers):
+        mcp_tool = SimpleNamespace(**spec)
+        try:
+            wrapper = create_mcp_tool_wrapper(mcp_tool, i, server_name)
+            livekit_tools.append(wrapper)
+            by_name.setdefault(mcp_tool.name, wrapper)
+            index.setdefault(server_name, {})[mcp_tool.name] = mcp_tool
+            logging.debug(f"✅ Created wrapper for tool {i}: {mcp_tool.name} (from {server_name})")
+        except Exception as tool_error:
+            logging.error(f"❌ Failed to create wrapper for tool {mcp_tool.name}: {tool_error}", exc_info=True)
+
+    return {
+        "livekit_tools": livekit_tools,
+        "search_index": ToolSearchIndex(livekit_tools),
+        "by_name": by_name,
+        "index": index,
+        "specs": specs_with_servers,
+        "schema_hash": schema_hash,
+        "fetched_at": fetched_at,
+    }
+
+
+def _disk_cache_key(url: str) -> str:
+    # The Composio URL embeds account identifiers, so never write it to disk in the clear
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def _load_catalog_from_disk(url: str) -> Optional[Dict[str, Any]]:
+    path = Config.MCP_CATALOG_CACHE_PATH
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            stored = json.load(f).get(_disk_cache_key(url))
+        if not stored:
+            return None
+        specs_with_servers = [(spec, server_name) for spec, server_name in stored["specs"]]
+        logging.info(f"💽 Loaded {len(specs_with_servers)} MCP tool specs from {path}")
+        return _build_catalog_entry(specs_with_servers, stored["schema_hash"], stored["fetched_at"])
+    except Exception as e:
+        logging.warning(f"⚠️ Ignoring unreadable MCP catalog cache {path}: {e}")
+        return None
+
+
+def _save_catalog_to_disk(url: str, entry: Dict[str, Any]):
+    path = Config.MCP_CATALOG_CACHE_PATH
+    if not path:
+        return
+    try:
+        stored = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                stored = json.load(f)
+        stored[_disk_cache_key(url)] = {
+            "specs": entry["specs"],
+            "schema_hash": entry["schema_hash"],
+            "fetched_at": entry["fetched_at"],
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stored, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logging.warning(f"⚠️ Could not write MCP catalog cache {path}: {e}")
+
+
+async def _refresh_catalog(url: str) -> Dict[str, Any]:
+    """Re-list tools from the server, rebuilding wrappers only if the schemas changed."""
+    all_mcp_tools_with_servers = await initialize_mcp_client()
+    specs_with_servers = [(_tool_spec(tool), server_name) for tool, server_name in all_mcp_tools_with_servers]
+    schema_hash = _schema_hash([spec for spec, _ in specs_with_servers])
+
+    entry = mcp_tools_cache.get(url)
+    if entry and entry["schema_hash"] == schema_hash:
+        entry["fetched_at"] = time.time()
+        logging.info("🔄 MCP tool catalog unchanged, keeping cached wrappers")
+    else:
+        entry = _build_catalog_entry(specs_with_servers, schema_hash, time.time())
+        mcp_tools_cache[url] = entry
+        logging.info(f"🔄 MCP tool catalog rebuilt ({len(entry['livekit_tools'])} tools)")
+
+    mcp_tool_index.update(entry["index"])
+    _save_catalog_to_disk(url, entry)
+    return entry
+
+
+async def _background_refresh(url: str):
+    try:
+        await _refresh_catalog(url)
+    except Exception as e:
+        logging.warning(f"⚠️ Background MCP catalog refresh failed, serving cached tools: {e}")
+    finally:
+        _catalog_refreshes.pop(url, None)
+
+
+def _schedule_catalog_refresh(url: str):
+    if url not in _catalog_refreshes:
+        _catalog_refreshes[url] = asyncio.create_task(_background_refresh(url))
+
+
+def current_tool_search_index() -> Optional[ToolSearchIndex]:
+    """Keyword index over the tools last returned by `load_and_convert_mcp_tools`."""
+    entry = mcp_tools_cache.get(Config.COMPOSIO_MCP_URL)
+    return entry["search_index"] if entry else None
+
+
+def get_livekit_tool(original_tool_name: str):
+    """The LiveKit wrapper for an MCP tool by its server-side name, or None if it is not loaded."""
+    entry = mcp_tools_cache.get(Config.COMPOSIO_MCP_URL)
+    return entry["by_name"].get(original_tool_name) if entry else None
+
+
+async def _fetch_catalog_for_prewarm(url: str):
+    try:
+        await _ensure_mcp_client()
+        await asyncio.wait_for(_refresh_catalog(url), timeout=Config.MCP_PREWARM_TIMEOUT)
+    finally:
+        # The pools belong to this short-lived loop; the job opens its own
+        await close_mcp_session_pools()
+
+
+def prewarm_mcp_tool_catalog():
+    """Populate the catalog before jobs arrive: from the on-disk copy, else fetched from the server.
+
+    Called from the synchronous prewarm hook, so a fetch runs in its own short event loop
+    and is saved to disk for the next process.
+    """
+    url = Config.COMPOSIO_MCP_URL
+    if not url or url in mcp_tools_cache:
+        return
+    entry = _load_catalog_from_disk(url)
+    if entry is not None:
+        mcp_tools_cache[url] = entry
+        return
+    started = time.perf_counter()
+    try:
+        asyncio.run(_fetch_catalog_for_prewarm(url))
+        logging.info(f"🔥 Fetched the MCP tool catalog in {time.perf_counter() - started:.2f}s during prewarm")
+    except Exception as e:
+        logging.warning(f"⚠️ Could not fetch the MCP tool catalog during prewarm, the job will load it: {e!r}")
+
+
 async def load_and_convert_mcp_tools():
-    """Load MCP tools and convert them to LiveKit function tools."""
-    global mcp_client, mcp_tools_cache
-    
+    """Load MCP tools and convert them to LiveKit function tools.
+
+    Served from this process's catalog or its on-disk copy when available; a
+    stale catalog is returned immediately and refreshed in the background.
+    """
     logging.info("🔄 Loading MCP tools from all servers...")
+    url = Config.COMPOSIO_MCP_URL
     
     try:
-        all_mcp_tools_with_servers = await initialize_mcp_client()
-        livekit_tools = []
-        mcp_tools_cache = []
-        
-        for i, (mcp_tool, server_name) in enumerate(all_mcp_tools_with_servers):
-            try:
-                wrapper = create_mcp_tool_wrapper(mcp_tool, i, server_name)
-                livekit_tools.append(wrapper)
-                mcp_tools_cache.append(mcp_tool)
-                logging.info(f"✅ Created wrapper for tool {i}: {mcp_tool.name} (from {server_name})")
-            except Exception as tool_error:
-                logging.error(f"❌ Failed to create wrapper for tool {mcp_tool.name}: {tool_error}", exc_info=True)
-        
+        await _ensure_mcp_client()
+
+        entry = mcp_tools_cache.get(url)
+        if entry is None:
+            entry = _load_catalog_from_disk(url)
+            if entry is not None:
+                mcp_tools_cache[url] = entry
+
+        if entry is None:
+            entry = await _refresh_catalog(url)
+        else:
+            mcp_tool_index.update(entry["index"])
+            if time.time() - entry["fetched_at"] > Config.MCP_CATALOG_TTL:
+                logging.info("⏳ MCP tool catalog is stale, refreshing in the background")
+                _schedule_catalog_refresh(url)
+            else:
+                logging.info("⚡ Serving MCP tools from the catalog cache")
+
+        livekit_tools = list(entry["livekit_tools"])
         logging.info(f"🎯 Successfully loaded {len(livekit_tools)} MCP tools")
         return livekit_tools
         
@@ -0,0 +1,177 @@
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import Config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    user_id      TEXT PRIMARY KEY,
+    payload      TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    version      INTEGER NOT NULL,
+    fetched_at   REAL NOT NULL,
+    last_access  REAL NOT NULL
+)
+"""
+
+
+def _content_hash(results: List[Dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(results, sort_keys=True).encode()).hexdigest()
+
+
+class MemoryCache:
+    """Per-user Mem0 memory cache in a local SQLite file, shared by every job on the host.
+
+    Reads are served from the cache and revalidated against Mem0 in the background
+    once older than MEMORY_CACHE_TTL; entries past MEMORY_CACHE_MAX_STALENESS are
+    fetched synchronously. Every content change bumps the entry's version, and the
+    least recently used users are evicted beyond MEMORY_CACHE_MAX_USERS.
+    """
+
+    def __init__(self, path: str, ttl: float = None, max_staleness: float = None, max_users: int = None):
+        self.path = path
+        self.ttl = Config.MEMORY_CACHE_TTL if ttl is None else ttl
+        self.max_staleness = Config.MEMORY_CACHE_MAX_STALENESS if max_staleness is None else max_staleness
+        self.max_users = max_users or Config.MEMORY_CACHE_MAX_USERS
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._refreshes: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+
+    # --- synchronous SQLite access, run in a worker thread ---
+
+    def _read(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, content_hash, version, fetched_at FROM memories WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE memories SET last_access = ? WHERE user_id = ?", (time.time(), user_id))
+            self._conn.commit()
+        payload, content_hash, version, fetched_at = row
+        return {"results": json.loads(payload), "content_hash": content_hash, "version": version, "fetched_at": fetched_at}
+
+    def _write(self, user_id: str, results: List[Dict[str, Any]], fetched_at: float) -> int:
+        """Store results, bumping the version only if the content changed. Returns the version."""
+        content_hash = _content_hash(results)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, version FROM memories WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row and row[0] == content_hash:
+                version = row[1]
+                self._conn.execute(
+                    "UPDATE memories SET fetched_at = ?, last_access = ? WHERE user_id = ?",
+                    (fetched_at, now, user_id),
+                )
+            else:
+                version = (row[1] + 1) if row else 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO memories VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, json.dumps(results), content_hash, version, fetched_at, now),
+                )
+            self._conn.execute(
+                "DELETE FROM memories WHERE user_id NOT IN "
+                "(SELECT user_id FROM memories ORDER BY last_access DESC LIMIT ?)",
+                (self.max_users,),
+            )
+            self._conn.commit()
+        return version
+
+    def _mark_stale(self, user_id: str):
+        # Past `ttl` but within `max_staleness`: the next read is served at once and revalidates
+        fetched_at = time.time() - self.ttl - 1
+        with self._lock:
+            self._conn.execute(
+                "UPDATE memories SET fetched_at = MIN(fetched_at, ?) WHERE user_id = ?", (fetched_at, user_id)
+            )
+            self._conn.commit()
+
+    # --- async API ---
+
+    async def get_all(self, user_id: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Read-through `get_all`: `fetch` is only awaited on a miss or a too-stale entry."""
+        entry = await asyncio.to_thread(self._read, user_id)
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if age <= self.max_staleness:
+                if age > self.ttl:
+                    self.stats["stale_hits"] += 1
+                    self._schedule_refresh(user_id, fetch)
+                else:
+                    self.stats["hits"] += 1
+                logging.info(f"⚡ Serving {len(entry['results'])} memories from cache (v{entry['version']}, {age:.0f}s old)")
+                return {"results": entry["results"]}
+
+        self.stats["misses"] += 1
+        results = await fetch()
+        await asyncio.to_thread(self._write, user_id, (results or {}).get('results', []), time.time())
+        return results
+
+    def _schedule_refresh(self, user_id: str, fetch):
+        if user_id not in self._refreshes:
+            self._refreshes[user_id] = asyncio.create_task(self._refresh(user_id, fetch))
+
+    async def _refresh(self, user_id: str, fetch):
+        try:
+            results = await fetch()
+            version = await asyncio.to_thread(self._write, user_id, (results or {}).get('results', []), time.time())
+            self.stats["refreshes"] += 1
+            logging.info(f"🔄 Memory cache for '{user_id}' revalidated (v{version})")
+        except Exception as e:
+            logging.warning(f"⚠️ Background memory refresh failed for '{user_id}': {e}")
+        finally:
+            self._refreshes.pop(user_id, None)
+
+    async def apply_add_result(self, user_id: str, add_result: Any):
+        """Write through the events returned by `mem0.add`.
+
+        If the response carries no usable events (e.g. Mem0 is processing the add
+        asynchronously), the entry is marked stale: the next read is still served
+        from the cache and refreshes it in the background.
+        """
+        events = add_result.get('results') if isinstance(add_result, dict) else add_result
+        usable = [e for e in (events or []) if isinstance(e, dict) and e.get("id") and e.get("event")]
+        entry = await asyncio.to_thread(self._read, user_id)
+        if entry is None:
+            return
+        if not usable:
+            await asyncio.to_thread(self._mark_stale, user_id)
+            return
+
+        by_id = {m.get("id"): m for m in entry["results"]}
+        now = datetime.now(timezone.utc).isoformat()
+        for event in usable:
+            if event["event"] == "DELETE":
+                by_id.pop(event["id"], None)
+            elif event["event"] in ("ADD", "UPDATE") and event.get("memory"):
+                by_id[event["id"]] = {**by_id.get(event["id"], {}), "id": event["id"], "memory": event["memory"], "updated_at": now}
+        await asyncio.to_thread(self._write, user_id, list(by_id.values()), entry["fetched_at"])
+
+
+_memory_cache: Optional[MemoryCache] = None
+
+
+def get_memory_cache() -> Optional[MemoryCache]:
+    """Process-wide cache instance, or None when MEMORY_CACHE_PATH is empty."""
+    global _memory_cache
+    if _memory_cache is None and Config.MEMORY_CACHE_PATH:
+        try:
+            _memory_cache = MemoryCache(Config.MEMORY_CACHE_PATH)
+        except sqlite3.Error as e:
+            logging.warning(f"⚠️ Memory cache disabled, could not open {Config.MEMORY_CACHE_PATH}: {e}")
+            Config.MEMORY_CACHE_PATH = ""
+    return _memory_cache
@@ -1,39 +1,209 @@
 import os
 import json
+import math
+import hashlib
+import asyncio
 import logging
-from mem0 import AsyncMemoryClient
+from collections import deque
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
 from livekit.agents import ChatContext
 
 from .config import Config
+from .memory_cache import get_memory_cache
+from .telemetry import timed
 
-async def load_memories():
-    """1st Database Fetch - Load existing memories at conversation start"""
+if TYPE_CHECKING:
+    from mem0 import AsyncMemoryClient
+
+# One Mem0 client per job process, shared by the session and the fallback paths
+_memory_client = None
+
+
+def get_memory_client() -> "AsyncMemoryClient":
+    global _memory_client
+    if _memory_client is None:
+        # mem0 pulls in a large dependency tree, so it is imported by the first job that needs it
+        from mem0 import AsyncMemoryClient
+        _memory_client = AsyncMemoryClient()
+    return _memory_client
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+def message_hash(role: str, content: str) -> str:
+    """Identity of a message for dedup: role plus whitespace-normalized content."""
+    normalized = " ".join(content.split())
+    return hashlib.blake2b(f"{role}:{normalized}".encode(), digest_size=16).hexdigest()
+
+
+def memory_context_message(user_name: str, memory_str: str) -> str:
+    return f"The user's name is {user_name}, and this is relevant context: {memory_str}."
+
+
+def persisted_message_hashes(user_name: str, memory_str: str) -> set:
+    """Hashes of content Mem0 already holds: the injected context message and each loaded memory."""
+    hashes = set()
+    if not memory_str:
+        return hashes
+    hashes.add(message_hash("assistant", memory_context_message(user_name, memory_str)))
+    for memory in json.loads(memory_str):
+        for role in ("user", "assistant"):
+            hashes.add(message_hash(role, memory["memory"]))
+    return hashes
+
+
+def _recency_weight(updated_at, now: datetime) -> float:
+    """Exponential decay by age, halving every MEMORY_RECENCY_HALF_LIFE_DAYS."""
+    try:
+        updated = datetime.fromisoformat(str(updated_at).replace("Z", "+00:00"))
+        if updated.tzinfo is None:
+            updated = updated.replace(tzinfo=timezone.utc)
+        age_days = max((now - updated).total_seconds() / 86400, 0.0)
+    except (TypeError, ValueError):
+        return 0.5
+    return math.pow(0.5, age_days / Config.MEMORY_RECENCY_HALF_LIFE_DAYS)
+
+
+def select_memories(results, token_budget: int, exclude=()):
+    """Rank memories by relevance x recency and keep as many as fit in the token budget.
+
+    Results without a relevance `score` (e.g. from `get_all`) are ranked by recency alone.
+    """
+    now = datetime.now(timezone.utc)
+    ranked = sorted(
+        (r for r in results if r.get("memory") and r["memory"] not in exclude),
+        key=lambda r: r.get("score", 1.0) * _recency_weight(r.get("updated_at"), now),
+        reverse=True,
+    )
+
+    selected = []
+    used = 0
+    for result in ranked:
+        memory = {"memory": result["memory"], "updated_at": result.get("updated_at")}
+        cost = estimate_tokens(json.dumps(memory))
+        if used + cost > token_budget:
+            continue
+        selected.append(memory)
+        used += cost
+    return selected
+
+
+class MemoryRetriever:
+    """Pulls memories relevant to the latest user turns into the prompt, within a token budget.
+
+    The search starts from the final STT transcripts, while LiveKit is still waiting
+    for the end of the turn, so the turn itself waits at most MEMORY_SEARCH_WAIT for
+    it. Memories already in the initial snapshot are skipped; memories added to a
+    turn are not kept in the history, so they may be added again on a later turn.
+    """
+
+    def __init__(self, mem0: "AsyncMemoryClient", user_name: str, memory_str: str = ''):
+        self.mem0 = mem0
+        self.user_name = user_name
+        self.recent_turns = deque(maxlen=Config.MEMORY_QUERY_TURNS)
+        self.in_snapshot = {m["memory"] for m in json.loads(memory_str)} if memory_str else set()
+        self._turn_text = []
+        self._query = ""
+        self._search: Optional[asyncio.Task] = None
+
+    def on_transcript(self, transcript: str, is_final: bool):
+        """Feed every `user_input_transcribed` event here; each final segment restarts the search."""
+        if not is_final or not transcript.strip():
+            return
+        self._turn_text.append(transcript.strip())
+        self._start_search(" ".join([*self.recent_turns, *self._turn_text]))
+
+    def _start_search(self, query: str):
+        if query == self._query and self._search is not None:
+            return
+        self._cancel_search()
+        self._query = query
+        self._search = asyncio.create_task(self._run_search(query))
+
+    def _cancel_search(self):
+        if self._search is not None and not self._search.done():
+            self._search.cancel()
+        self._search, self._query = None, ""
+
+    async def _run_search(self, query: str):
+        with timed("memory_operation_seconds", op="search"):
+            results = await asyncio.wait_for(
+                self.mem0.search(
+                    query,
+                    user_id=self.user_name,
+                    top_k=Config.MEMORY_SEARCH_LIMIT,
+                    output_format='v1.1',
+                ),
+                timeout=Config.MEMORY_SEARCH_TIMEOUT,
+            )
+        return results.get('results', []) if isinstance(results, dict) else results
+
+    async def retrieve(self, user_text: str) -> str:
+        """Return a context message with relevant memories for this turn, or '' if there are none."""
+        self._turn_text = []
+        if not user_text.strip():
+            return ''
+        self.recent_turns.append(user_text.strip())
+        # Normally already running since the transcript arrived; started now if the text differs
+        self._start_search(" ".join(self.recent_turns))
+        search = self._search
+        try:
+            results = await asyncio.wait_for(asyncio.shield(search), timeout=Config.MEMORY_SEARCH_WAIT)
+        except Exception as e:
+            logging.warning(f"⚠️ Memory search skipped for this turn: {e!r}")
+            return ''
+        finally:
+            self._cancel_search()
+
+        memories = select_memories(results or [], Config.MEMORY_TURN_TOKEN_BUDGET, exclude=self.in_snapshot)
+        if not memories:
+            return ''
+        logging.info(f"🧠 Retrieved {len(memories)} relevant memories for this turn")
+        return f"Relevant context from earlier conversations with {self.user_name}: {json.dumps(memories)}."
+
+    async def aclose(self):
+        self._cancel_search()
+
+
+async def load_memories(user_name: str = Config.DEFAULT_USER):
+    """1st Database Fetch - Load the user's existing memories at conversation start"""
     if not Config.MEM0_API_KEY:
         logging.warning("⚠️ MEM0_API_KEY not found. Memory functionality will be limited.")
-        return AsyncMemoryClient(), ChatContext(), '', Config.DEFAULT_USER
+        return get_memory_client(), ChatContext(), '', user_name
     
     try:
-        mem0 = AsyncMemoryClient()
-        user_name = Config.DEFAULT_USER
+        mem0 = get_memory_client()
         
         # Use v1.1 format for consistency
-        results = await mem0.get_all(user_id=user_name, output_format='v1.1')
+        fetch = lambda: mem0.get_all(user_id=user_name, output_format='v1.1')
+        cache = get_memory_cache()
+        with timed("memory_operation_seconds", op="load"):
+            results = await (cache.get_all(user_name, fetch) if cache else fetch())
         initial_ctx = ChatContext()
         memory_str = ''
         
         if results and results.get('results', []):
-            memories = [
-                {
-                    "memory": result["memory"],
-                    "updated_at": result["updated_at"]
-                }
-                for result in results.get('results', [])
-            ]
+            if Config.MEMORY_RETRIEVAL_MODE == "all":
+                memories = [
+                    {
+                        "memory": result["memory"],
+                        "updated_at": result["updated_at"]
+                    }
+                    for result in results.get('results', [])
+                ]
+            else:
+                # Most recent memories that fit the budget; relevant older ones are pulled in per turn
+                memories = select_memories(results['results'], Config.MEMORY_TOKEN_BUDGET)
             memory_str = json.dumps(memories)
-            logging.info(f"🧠 Loaded memories: {memory_str}")
+            logging.info(f"🧠 Loaded {len(memories)} of {len(results['results'])} memories into the prompt")
+            # A system message, so the snapshot joins the instructions in the cacheable prompt prefix
             initial_ctx.add_message(
-                role="assistant",
-                content=f"The user's name is {user_name}, and this is relevant context: {memory_str}."
+                role="system",
+                content=memory_context_message(user_name, memory_str)
             )
         else:
             logging.info("🧠 No existing memories found for user")
@@ -42,13 +212,166 @@ async def load_memories():
     
     except Exception as e:
         logging.error(f"❌ Error initializing Mem0 client: {e}")
-        return AsyncMemoryClient(), ChatContext(), '', Config.DEFAULT_USER
+        return get_memory_client(), ChatContext(), '', user_name
+
+
+def _message_text(item) -> str:
+    """Extract a chat item's text content with multiple fallbacks."""
+    for attr in ['content', 'text', 'message', 'text_content']:
+        if hasattr(item, attr):
+            content = getattr(item, attr)
+            if content is not None:
+                if isinstance(content, list):
+                    # Skip non-text parts such as attached camera frames
+                    return ''.join(c for c in content if isinstance(c, str))
+                return str(content)
+    return ""
+
+
+class MemoryWriter:
+    """Streams conversation turns to Mem0 in small batches while the session runs.
+
+    Messages are buffered in a bounded queue until `start()` is given a client,
+    sent with retries and exponential backoff, and anything still unsent is
+    flushed once by `close()` at shutdown. Messages whose hash is already known
+    (persisted in an earlier session, or queued earlier in this one) are skipped.
+    """
+
+    def __init__(self):
+        self.mem0 = None
+        self.user_name = None
+        self.persisted_hashes = set()
+        self._queue = asyncio.Queue(maxsize=Config.MEMORY_WRITE_QUEUE_SIZE)
+        self._unsent = []
+        self._in_flight = []
+        self._carry = []
+        self._batch = []
+        self._task = None
+        self.saved_count = 0
+        self.skipped_count = 0
+
+    def add_message(self, item):
+        """Queue a chat item for persistence; non user/assistant or empty items are ignored."""
+        role = getattr(item, 'role', None)
+        if role not in ['user', 'assistant']:
+            return
+        content_str = _message_text(item).strip()
+        if not content_str:
+            return
+
+        identity = message_hash(role, content_str)
+        if identity in self.persisted_hashes:
+            self.skipped_count += 1
+            return
+        self.persisted_hashes.add(identity)
+
+        if self._queue.full():
+            dropped = self._queue.get_nowait()
+            logging.warning(f"⚠️ Memory write queue full, dropping oldest {dropped['role']} message")
+        self._queue.put_nowait({"role": role, "content": content_str})
+
+    def start(self, mem0: "AsyncMemoryClient", user_name: str, memory_str: str = ''):
+        self.mem0 = mem0
+        self.user_name = user_name
+        known = persisted_message_hashes(user_name, memory_str)
+        self.persisted_hashes |= known
+        # Drop anything buffered before the memories loaded that turns out to be persisted already
+        buffered = [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+        for message in buffered:
+            if message_hash(message["role"], message["content"]) in known:
+                self.skipped_count += 1
+            else:
+                self._queue.put_nowait(message)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
 
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Collected on the instance, so close() can still flush a batch that is waiting to fill up
+            self._batch.append(await self._queue.get())
+            deadline = loop.time() + Config.MEMORY_WRITE_FLUSH_INTERVAL
+            while len(self._batch) < Config.MEMORY_WRITE_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
 
-async def shutdown_hook(chat_ctx: ChatContext, mem0: AsyncMemoryClient, memory_str: str, user_name: str):
+            # Mem0 extracts facts about the user, so an assistant-only batch waits for the next user turn
+            batch, self._batch = self._carry + self._batch, []
+            if not any(m["role"] == "user" for m in batch):
+                self._carry = batch[-Config.MEMORY_WRITE_BATCH_SIZE:]
+                continue
+            self._carry = []
+
+            self._in_flight = batch
+            if not await self._send(batch, retries=Config.MEMORY_WRITE_RETRIES):
+                self._unsent.extend(batch)
+                del self._unsent[:-Config.MEMORY_WRITE_QUEUE_SIZE]
+            self._in_flight = []
+
+    async def _send(self, batch, retries: int) -> bool:
+        for attempt in range(retries + 1):
+            try:
+                with timed("memory_operation_seconds", op="save"):
+                    result = await self.mem0.add(batch, user_id=self.user_name, output_format='v1.1')
+                self.saved_count += len(batch)
+                logging.info(f"💾 Saved {len(batch)} messages to memory")
+                cache = get_memory_cache()
+                if cache:
+                    await cache.apply_add_result(self.user_name, result)
+                return True
+            except Exception as e:
+                if attempt == retries:
+                    logging.error(f"❌ Failed to save {len(batch)} messages to memory: {e}")
+                    return False
+                delay = Config.MEMORY_WRITE_BACKOFF * (2 ** attempt)
+                logging.warning(f"⚠️ Memory save failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        return False
+
+    async def close(self, mem0: "AsyncMemoryClient" = None, user_name: str = None):
+        """Stop the background writer and send only what has not been saved yet."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.mem0 is None:
+            self.mem0, self.user_name = mem0, user_name
+
+        pending = self._unsent + self._in_flight + self._carry + self._batch
+        self._unsent, self._in_flight, self._carry, self._batch = [], [], [], []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+
+        if not any(m["role"] == "user" for m in pending):
+            logging.info(
+                f"ℹ️ Nothing left to save ({self.saved_count} messages saved during the session, "
+                f"{self.skipped_count} duplicates skipped)"
+            )
+            return
+        if self.mem0 is None:
+            logging.warning(f"⚠️ No memory client, discarding {len(pending)} unsaved messages")
+            return
+        try:
+            await asyncio.wait_for(self._send(pending, retries=0), timeout=Config.MEMORY_FLUSH_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.error(f"❌ Final memory flush timed out, {len(pending)} messages not saved")
+
+
+async def shutdown_hook(chat_ctx: ChatContext, mem0: "AsyncMemoryClient", memory_str: str, user_name: str, memory_writer: MemoryWriter = None):
     """2nd Database Save - Save memories at conversation end"""
+    if memory_writer is not None:
+        logging.info("🧠 Shutting down, flushing unsaved messages to memory...")
+        await memory_writer.close(mem0, user_name)
+        return
+
     logging.info("🧠 Shutting down, saving chat context to memory...")
     messages_formatted = []
+    seen = persisted_message_hashes(user_name, memory_str)
     
     logging.info(f"Chat context messages: {len(chat_ctx.items)} items")
     
@@ -59,20 +382,15 @@ async def shutdown_hook(chat_ctx: ChatContext, mem0: AsyncMemoryClient, memory_s
             if role not in ['user', 'assistant']:
                 continue
             
-            # Extract content with multiple fallbacks
-            content_str = ""
-            for attr in ['content', 'text', 'message', 'text_content']:
-                if hasattr(item, attr):
-                    content = getattr(item, attr)
-                    if content is not None:
-                        if isinstance(content, list):
-                            content_str = ''.join(str(c) for c in content)
-                        else:
-                            content_str = str(content)
-                        break
+            content_str = _message_text(item)
             
-            if not content_str.strip() or (memory_str and memory_str in content_str):
+            if not content_str.strip():
                 continue
+
+            identity = message_hash(role, content_str.strip())
+            if identity in seen:
+                continue
+            seen.add(identity)
             
             messages_formatted.append({
                 "role": role,
@@ -87,12 +405,16 @@ async def shutdown_hook(chat_ctx: ChatContext, mem0: AsyncMemoryClient, memory_s
         logging.info(f"💾 Attempting to save {len(messages_formatted)} messages to memory")
         try:
             # Use the newer v1.1 API format - explicitly specify output_format
-            result = await mem0.add(
-                messages_formatted, 
-                user_id=user_name,
-                output_format='v1.1'  # Add this line to fix the warning
-            )
+            with timed("memory_operation_seconds", op="save"):
+                result = await mem0.add(
+                    messages_formatted, 
+                    user_id=user_name,
+                    output_format='v1.1'  # Add this line to fix the warning
+                )
             logging.info(f"✅ Chat context saved to memory successfully: {result}")
+            cache = get_memory_cache()
+            if cache:
+                await cache.apply_add_result(user_name, result)
         except Exception as e:
             logging.error(f"❌ Failed to save memories: {e}")
     else:
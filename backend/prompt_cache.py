@@ -0,0 +1,93 @@
+import json
+import logging
+from typing import Any, Dict
+
+import httpx
+
+from .config import Config
+
+
+def _supports_cache_control(model: str) -> bool:
+    return model.startswith(Config.PROMPT_CACHE_CONTROL_MODELS)
+
+
+def prepare_chat_request(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Make the static prefix of a chat completion request byte-stable and cacheable.
+
+    The prefix is, in order: tool schemas (sorted by name, since LiveKit does not
+    keep tool order stable), the instructions and the memory snapshot (the leading
+    system messages). For models that take explicit breakpoints, the last static
+    message gets a `cache_control` hint so everything before it is cached.
+    """
+    tools = body.get("tools")
+    if tools:
+        body["tools"] = sorted(tools, key=lambda tool: tool.get("function", {}).get("name", ""))
+
+    if not _supports_cache_control(body.get("model", "")):
+        return body
+
+    messages = body.get("messages") or []
+    last_static = None
+    for i, message in enumerate(messages):
+        if message.get("role") != "system":
+            break
+        last_static = i
+    if last_static is None:
+        return body
+
+    message = messages[last_static]
+    content = message.get("content")
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if isinstance(content, list) and content:
+        content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+        message["content"] = content
+    return body
+
+
+class PromptCacheTransport(httpx.AsyncBaseTransport):
+    """httpx transport that rewrites chat completion requests with `prepare_chat_request`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST" and request.url.path.endswith("/chat/completions"):
+            try:
+                body = json.loads(await request.aread())
+                content = json.dumps(prepare_chat_request(body), separators=(",", ":"), ensure_ascii=False).encode()
+                headers = httpx.Headers(request.headers)
+                headers["content-length"] = str(len(content))
+                request = httpx.Request(
+                    request.method, request.url, headers=headers, content=content, extensions=request.extensions
+                )
+            except ValueError as e:
+                logging.warning(f"⚠️ Could not apply prompt cache layout: {e}")
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class PromptCacheStats:
+    """Prompt tokens served from the provider's cache, from LiveKit LLM metrics."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def record(self, metrics):
+        prompt_tokens = getattr(metrics, "prompt_tokens", None)
+        if prompt_tokens is None:
+            return
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += getattr(metrics, "prompt_cached_tokens", 0) or 0
+
+    def summary(self) -> str:
+        rate = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        return (
+            f"{self.requests} requests, {self.cached_tokens}/{self.prompt_tokens} prompt tokens "
+            f"served from cache ({rate:.0%})"
+        )
@@ -0,0 +1,69 @@
+import time
+import logging
+import importlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import Config
+
+# kind -> provider name -> (LiveKit plugin module, factory taking the imported module)
+PROVIDERS: Dict[str, Dict[str, Tuple[str, Callable[..., Any]]]] = {
+    "llm": {
+        # OpenAI-compatible endpoint (OpenRouter); options come from the session setup
+        "openai": ("livekit.plugins.openai", lambda plugin, **options: plugin.LLM(**options)),
+    },
+    "vad": {
+        "silero": ("livekit.plugins.silero", lambda plugin: plugin.VAD.load()),
+    },
+    "stt": {
+        "deepgram": ("livekit.plugins.deepgram", lambda plugin: plugin.STT(model="nova-3", language="en")),
+        "groq": ("livekit.plugins.groq", lambda plugin: plugin.STT(model="whisper-large-v3-turbo", language="en")),
+    },
+    "tts": {
+        "cartesia": ("livekit.plugins.cartesia", lambda plugin: plugin.TTS(voice=Config.CARTESIA_VOICE_ID, model=Config.CARTESIA_MODEL)),
+        "elevenlabs": ("livekit.plugins.elevenlabs", lambda plugin: plugin.TTS()),
+    },
+    "noise_cancellation": {
+        "bvc": ("livekit.plugins.noise_cancellation", lambda plugin: plugin.BVC()),
+    },
+    "avatar": {
+        "tavus": (
+            "livekit.plugins.tavus",
+            lambda plugin: plugin.AvatarSession(replica_id=Config.AVATAR_REPLICA_ID, persona_id=Config.AVATAR_PERSONA_ID),
+        ),
+    },
+}
+
+
+def configured_provider(kind: str) -> Optional[str]:
+    """The provider chosen for `kind` in Config, or None if that component is disabled."""
+    return getattr(Config, f"{kind.upper()}_PROVIDER") or None
+
+
+def import_plugin(kind: str):
+    """Import the configured plugin for `kind`. LiveKit plugins must be imported on the main thread."""
+    provider = configured_provider(kind)
+    if provider is None:
+        return None
+    try:
+        module_name, _ = PROVIDERS[kind][provider]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} provider '{provider}', expected one of {sorted(PROVIDERS[kind])}")
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    logging.debug(f"📦 Imported {module_name} in {time.perf_counter() - started:.2f}s")
+    return module
+
+
+def import_configured_plugins():
+    """Import every configured plugin, e.g. so `download-files` can fetch their model files."""
+    for kind in PROVIDERS:
+        import_plugin(kind)
+
+
+def create(kind: str, **options):
+    """Build the configured component for `kind`, importing its plugin on first use. None if disabled."""
+    module = import_plugin(kind)
+    if module is None:
+        return None
+    _, factory = PROVIDERS[kind][configured_provider(kind)]
+    return factory(module, **options)
@@ -0,0 +1,136 @@
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import List, Optional
+
+from livekit.agents import utils
+from livekit.agents.llm import FunctionCall, FunctionCallOutput
+from livekit.agents.llm.tool_context import get_function_info
+
+from .config import Config
+from .mcp_handler import get_livekit_tool, prefetch_tool_result, tool_cache_ttl
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+class SpeculativePrefetcher:
+    """Starts a read-only lookup while the user is still talking, from interim STT transcripts.
+
+    When an interim transcript has stayed the same for SPECULATION_STABLE_INTERIMS
+    events (or a final segment arrives) and looks like a lookup, SPECULATION_TOOL is
+    called with the transcript as the query. At end of turn the result is reused
+    if the final transcript matches what was speculated on, and cancelled
+    otherwise. Only tools classified as read-only are ever run this way, and
+    through the result cache, so the LLM repeating the call costs nothing.
+    """
+
+    def __init__(self):
+        self._last_interim = ""
+        self._stable_count = 0
+        self._text = ""
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = 0.0
+        self.stats = {"started": 0, "reused": 0, "wasted": 0, "wasted_seconds": 0.0}
+
+    @staticmethod
+    def _is_lookup(text: str) -> bool:
+        words = set(text.split())
+        return len(words) >= 3 and bool(words & Config.SPECULATION_TRIGGERS)
+
+    def on_transcript(self, transcript: str, is_final: bool):
+        """Feed every `user_input_transcribed` event here."""
+        text = _normalize(transcript)
+        if not text:
+            return
+        if is_final:
+            self._maybe_start(text)
+            return
+        if text == self._last_interim:
+            self._stable_count += 1
+        else:
+            self._last_interim, self._stable_count = text, 1
+        if self._stable_count >= Config.SPECULATION_STABLE_INTERIMS:
+            self._maybe_start(text)
+
+    def _maybe_start(self, text: str):
+        if text == self._text or not self._is_lookup(text):
+            return
+        tool = get_livekit_tool(Config.SPECULATION_TOOL)
+        if tool is None or tool_cache_ttl(Config.SPECULATION_TOOL) <= 0:
+            return
+
+        self._discard()
+        self._text = text
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(prefetch_tool_result(Config.SPECULATION_TOOL, {"query": text}))
+        self.stats["started"] += 1
+        logging.info(f"🔮 Speculatively running {Config.SPECULATION_TOOL} for: {text}")
+
+    def _discard(self):
+        if self._task is None:
+            return
+        self._waste(self._task)
+        self._task, self._text = None, ""
+
+    def _waste(self, task: asyncio.Task):
+        """Count a lookup that will not be used.
+
+        The result cache shields the fetch, so cancelling would not stop it: it is
+        left to finish (and be cached), and all of its time counts as wasted.
+        """
+        started_at = self._started_at
+        self.stats["wasted"] += 1
+
+        def on_done(task: asyncio.Task):
+            if not task.cancelled():
+                task.exception()   # retrieved, so a failed lookup is not reported as unhandled
+            self.stats["wasted_seconds"] += time.monotonic() - started_at
+
+        task.add_done_callback(on_done)
+
+    async def claim(self, final_transcript: str) -> Optional[List]:
+        """At end of turn: the speculative lookup as a tool call and its output, if it matches the final transcript."""
+        self._last_interim, self._stable_count = "", 0
+        if self._task is None:
+            return None
+        if _normalize(final_transcript) != self._text:
+            self._discard()
+            return None
+
+        task, query, self._task, self._text = self._task, self._text, None, ""
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout=Config.SPECULATION_CLAIM_TIMEOUT)
+            tool = get_livekit_tool(Config.SPECULATION_TOOL)
+            if tool is None:
+                raise LookupError(f"{Config.SPECULATION_TOOL} is no longer loaded")
+        except Exception as e:
+            # Too slow or failed: let the LLM decide what to call instead
+            logging.info(f"🔮 Speculative {Config.SPECULATION_TOOL} not used: {e!r}")
+            self._waste(task)
+            return None
+        self.stats["reused"] += 1
+
+        name = get_function_info(tool).name
+        call_id = utils.shortuuid("call_")
+        return [
+            FunctionCall(call_id=call_id, name=name, arguments=json.dumps({"query": query})),
+            FunctionCallOutput(call_id=call_id, name=name, output=result, is_error=False),
+        ]
+
+    def summary(self) -> str:
+        started = self.stats["started"]
+        hit_rate = self.stats["reused"] / started if started else 0.0
+        return (
+            f"{started} started, {self.stats['reused']} reused ({hit_rate:.0%}), "
+            f"{self.stats['wasted']} wasted (~{self.stats['wasted_seconds']:.1f}s of tool time)"
+        )
+
+    async def aclose(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
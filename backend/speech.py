@@ -0,0 +1,42 @@
+import asyncio
+import itertools
+from collections import deque
+from typing import Optional
+
+from .config import Config
+
+_filler_counter = itertools.count()
+_filled_speeches = deque(maxlen=64)   # speech ids that already got a filler
+
+
+def filler_phrase(tool_name: str) -> str:
+    upper = tool_name.upper()
+    phrases = next(
+        (phrases for prefix, phrases in Config.FILLER_PHRASES.items() if upper.startswith(prefix)),
+        Config.FILLER_DEFAULT_PHRASES,
+    )
+    return phrases[next(_filler_counter) % len(phrases)]
+
+
+async def _speak_filler(session, speech_handle, phrase: str):
+    await asyncio.sleep(Config.FILLER_DELAY)
+    if speech_handle.interrupted:
+        return
+    # Spoken, not added to the chat history, and cut off like any other speech if the user barges in
+    session.say(phrase, allow_interruptions=True, add_to_chat_ctx=False)
+
+
+def schedule_filler(context, tool_name: str) -> Optional[asyncio.Task]:
+    """Speak a short acknowledgement if the tool is still running after FILLER_DELAY.
+
+    At most one filler per reply, however many tools it calls. Cancel the returned
+    task when the tool finishes; a filler already speaking is left to finish.
+    """
+    if not Config.FILLER_ENABLED or context is None:
+        return None
+    session = getattr(context, "session", None)
+    speech_handle = getattr(context, "speech_handle", None)
+    if session is None or speech_handle is None or speech_handle.id in _filled_speeches:
+        return None
+    _filled_speeches.append(speech_handle.id)
+    return asyncio.create_task(_speak_filler(session, speech_handle, filler_phrase(tool_name)))
@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import glob
+import bisect
+import tempfile
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from .config import Config
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label set."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = None):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets or Config.METRICS_BUCKETS))
+        self._series: Dict[tuple, list] = {}   # label items -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Dict[str, str]):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(key), list(series)] for key, series in self._series.items()]
+
+    def merge(self, snapshot: list):
+        """Add another process's `snapshot()` to this histogram."""
+        with self._lock:
+            for key, series in snapshot:
+                key = tuple(tuple(item) for item in key)
+                mine = self._series.get(key)
+                if mine is None:
+                    self._series[key] = list(series)
+                else:
+                    self._series[key] = [a + b for a, b in zip(mine, series)]
+
+    def copy(self) -> "Histogram":
+        clone = Histogram(self.name, self.help_text, self.buckets)
+        clone.merge(self.snapshot())
+        return clone
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in series_items:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in key)
+            prefix = labels + "," if labels else ""
+            suffix = f"{{{labels}}}" if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{suffix} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return "\n".join(lines)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+HISTOGRAMS: Dict[str, Histogram] = {
+    h.name: h for h in (
+        Histogram("stt_final_latency_seconds", "End of user speech to final transcript."),
+        Histogram("end_of_turn_delay_seconds", "End of user speech to the turn being committed."),
+        Histogram("llm_ttft_seconds", "LLM request to first token."),
+        Histogram("llm_duration_seconds", "LLM request to last token."),
+        Histogram("tts_first_audio_seconds", "TTS request to first audio byte."),
+        Histogram("tool_call_seconds", "MCP tool call duration, by tool, server and outcome."),
+        Histogram("memory_operation_seconds", "Mem0 load, search and save duration."),
+        Histogram("startup_stage_seconds", "Duration of each job startup stage."),
+    )
+}
+
+_trace_lock = threading.Lock()
+_trace_file = None
+
+
+def _trace(name: str, value: float, labels: Dict[str, str]):
+    global _trace_file
+    with _trace_lock:
+        if _trace_file is None:
+            _trace_file = open(Config.METRICS_TRACE_PATH, "a", buffering=1)
+        _trace_file.write(json.dumps({"ts": time.time(), "pid": os.getpid(), "metric": name, "value": value, **labels}) + "\n")
+
+
+_last_flush = 0.0
+
+
+def flush_metrics():
+    """Write this process's histograms to METRICS_DIR for the worker's /metrics server to merge."""
+    global _last_flush
+    _last_flush = time.monotonic()
+    if not Config.METRICS_DIR:
+        return
+    path = os.path.join(Config.METRICS_DIR, f"{os.getpid()}.json")
+    try:
+        with tempfile.NamedTemporaryFile("w", dir=Config.METRICS_DIR, suffix=".tmp", delete=False) as f:
+            json.dump({name: h.snapshot() for name, h in HISTOGRAMS.items()}, f)
+        # Atomic, so the server never reads a half-written snapshot
+        os.replace(f.name, path)
+    except OSError as e:
+        logging.warning(f"⚠️ Could not write metrics snapshot: {e}")
+
+
+async def flush_job_metrics():
+    """Final snapshot of the job's histograms. Registered as the last job shutdown callback."""
+    flush_metrics()
+
+
+def observe(name: str, seconds: float, **labels):
+    """Record one duration. Unknown metric names are ignored."""
+    histogram = HISTOGRAMS.get(name)
+    if histogram is None or seconds is None or seconds < 0:
+        return
+    histogram.observe(seconds, labels)
+    if Config.METRICS_DIR and time.monotonic() - _last_flush >= Config.METRICS_FLUSH_INTERVAL:
+        flush_metrics()
+    if Config.METRICS_TRACE_PATH:
+        try:
+            _trace(name, seconds, labels)
+        except OSError as e:
+            logging.warning(f"⚠️ Could not write metrics trace: {e}")
+
+
+@contextmanager
+def timed(name: str, **labels):
+    """Time a block; an `outcome` label of "ok", "cancelled" or "error" is added unless one is given."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield labels
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        labels.setdefault("outcome", outcome)
+        observe(name, time.perf_counter() - started, **labels)
+
+
+# LiveKit pipeline metrics type -> [(attribute, histogram)]
+_PIPELINE_METRICS = {
+    "eou_metrics": [("transcription_delay", "stt_final_latency_seconds"), ("end_of_utterance_delay", "end_of_turn_delay_seconds")],
+    "llm_metrics": [("ttft", "llm_ttft_seconds"), ("duration", "llm_duration_seconds")],
+    "tts_metrics": [("ttfb", "tts_first_audio_seconds")],
+}
+
+
+def record_pipeline_metrics(metrics):
+    """Feed a `metrics_collected` event's metrics into the histograms."""
+    for attribute, name in _PIPELINE_METRICS.get(getattr(metrics, "type", None), ()):
+        value = getattr(metrics, attribute, None)
+        if value is not None:
+            observe(name, value)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _job_snapshots():
+    """(pid, snapshot) of every job process that wrote one, this process excluded."""
+    for path in glob.glob(os.path.join(Config.METRICS_DIR, "*.json")):
+        try:
+            pid = int(os.path.basename(path)[:-len(".json")])
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if pid != os.getpid():
+            yield pid, path, snapshot
+
+
+def render_metrics() -> str:
+    """This process's histograms plus the snapshots of the job processes in METRICS_DIR.
+
+    Jobs that have exited are folded into this process's histograms and their
+    files removed, so their counts outlive them and the directory stays small.
+    """
+    if not Config.METRICS_DIR:
+        return "\n".join(h.render() for h in HISTOGRAMS.values()) + "\n"
+
+    live = []
+    for pid, path, snapshot in _job_snapshots():
+        if _process_alive(pid):
+            live.append(snapshot)
+            continue
+        for name, series in snapshot.items():
+            if name in HISTOGRAMS:
+                HISTOGRAMS[name].merge(series)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    merged = {name: h.copy() for name, h in HISTOGRAMS.items()}
+    for snapshot in live:
+        for name, series in snapshot.items():
+            if name in merged:
+                merged[name].merge(series)
+    return "\n".join(h.render() for h in merged.values()) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server() -> Optional[int]:
+    """Serve /metrics for the whole worker from its main process. Returns the port.
+
+    LiveKit runs each job in its own process, which exits with the job, so job
+    processes only write snapshots to METRICS_DIR (a fresh temporary directory
+    unless set); this server merges them. Call before the worker starts its
+    job processes, so they inherit METRICS_DIR.
+    """
+    global _server
+    if _server is not None:
+        return _server.server_address[1]
+    if not Config.METRICS_PORT:
+        return None
+    if not Config.METRICS_DIR:
+        Config.METRICS_DIR = tempfile.mkdtemp(prefix="agent-metrics-")
+    os.makedirs(Config.METRICS_DIR, exist_ok=True)
+    os.environ["METRICS_DIR"] = Config.METRICS_DIR
+    try:
+        _server = ThreadingHTTPServer((Config.METRICS_HOST, Config.METRICS_PORT), _MetricsHandler)
+    except OSError as e:
+        logging.warning(f"⚠️ Metrics endpoint not started on port {Config.METRICS_PORT}: {e}")
+        return None
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    logging.info(f"📈 Metrics at http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics")
+    return Config.METRICS_PORT
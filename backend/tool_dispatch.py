@@ -0,0 +1,196 @@
+import json
+import keyword
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# JSON schema scalar types -> Python annotations for the LiveKit function signature
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+}
+
+# Coercion for object fields, which are exposed to the LLM as a JSON string
+_JSON = "json"
+_DATETIME = "datetime"
+
+_TRUE_STRINGS = {"true", "yes", "1"}
+_FALSE_STRINGS = {"false", "no", "0"}
+
+
+def _json_type(field_schema: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """The field's non-null JSON type and the schema that declares it."""
+    json_type = field_schema.get("type")
+    if json_type is None:
+        # Optional fields are usually rendered as anyOf [<type>, null]
+        for option in field_schema.get("anyOf", []):
+            if option.get("type") not in (None, "null"):
+                return option["type"], option
+    if isinstance(json_type, list):
+        json_type = next((t for t in json_type if t != "null"), "string")
+    return json_type, field_schema
+
+
+def _field_type(field_schema: Dict[str, Any]):
+    """Annotation for a field: scalars map directly, arrays keep their item type.
+
+    Objects and arrays of non-scalars are exposed as JSON strings (`_JSON`, decoded
+    again in `apply()`): a bare `dict` renders without properties, which strict
+    providers such as Gemini reject.
+    """
+    json_type, declared = _json_type(field_schema)
+    if json_type == "array":
+        item_type, _ = _json_type(declared.get("items") or {})
+        if item_type is None:
+            return List[str]
+        return List[_JSON_TYPES[item_type]] if item_type in _JSON_TYPES else _JSON
+    if json_type == "object":
+        return _JSON
+    return _JSON_TYPES.get(json_type, str)
+
+
+def _is_datetime_field(name: str, field_schema: Dict[str, Any]) -> bool:
+    return field_schema.get("format") == "date-time" or name.endswith("datetime")
+
+
+def _safe_param_name(name: str) -> str:
+    """Python-identifier alias for a schema field (e.g. 'from' -> 'from_', 'user-id' -> 'user_id').
+
+    Never starts with an underscore, which LiveKit's pydantic argument model rejects.
+    """
+    safe = "".join(c if c.isalnum() or c == "_" else "_" for c in name).lstrip("_")
+    if not safe or safe[0].isdigit():
+        safe = f"arg_{safe}"
+    if keyword.iskeyword(safe):
+        safe = f"{safe}_"
+    return safe
+
+
+def _unique_param_names(field_names) -> Dict[str, str]:
+    """Schema field -> parameter name, unique within the tool.
+
+    Fields that are already valid names keep them; other aliases get a numeric
+    suffix when they collide (e.g. 'user_id' and 'user-id' -> 'user_id', 'user_id_2').
+    """
+    taken = {name for name in field_names if _safe_param_name(name) == name}
+    param_names = {}
+    for name in field_names:
+        param_name = _safe_param_name(name)
+        if param_name != name:
+            base, suffix = param_name, 2
+            while param_name in taken:
+                param_name, suffix = f"{base}_{suffix}", suffix + 1
+            taken.add(param_name)
+        param_names[name] = param_name
+    return param_names
+
+
+def _to_utc(value: str) -> str:
+    return datetime.fromisoformat(value).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _coerce(value, param_type):
+    """Undo the usual LLM type slips (numbers and booleans sent as strings), and decode JSON fields."""
+    if not isinstance(value, str):
+        return value
+    try:
+        if param_type is _JSON:
+            return json.loads(value)
+        if param_type is int:
+            return int(value)
+        if param_type is float:
+            return float(value)
+        if param_type is bool:
+            lowered = value.strip().lower()
+            if lowered in _TRUE_STRINGS:
+                return True
+            if lowered in _FALSE_STRINGS:
+                return False
+    except ValueError:
+        pass
+    return value
+
+
+class ToolCallPlan:
+    """Argument handling for one MCP tool, compiled once from its `args_schema`.
+
+    `parameters` drives the LiveKit function signature; `apply()` turns the
+    LLM's keyword arguments into the MCP call arguments in a single pass.
+    """
+
+    __slots__ = ("tool_name", "parameters", "renames", "datetime_fields", "coercions", "_steps")
+
+    def __init__(self, tool_name: str, parameters, renames, datetime_fields, coercions):
+        self.tool_name = tool_name
+        self.parameters: List[Tuple[str, type, bool]] = parameters    # (name, type, required)
+        self.renames: Dict[str, str] = renames                        # exposed name -> schema name
+        self.datetime_fields = frozenset(datetime_fields)             # exposed names
+        self.coercions: Dict[str, Any] = coercions                    # exposed name -> type or _JSON
+
+        # Only arguments that need work get a step: (schema name, coercion type, _DATETIME or None)
+        self._steps = {}
+        for name, _, _ in parameters:
+            convert = self.coercions.get(name) or (_DATETIME if name in self.datetime_fields else None)
+            if convert is not None or name in renames:
+                self._steps[name] = (renames.get(name, name), convert)
+
+    @property
+    def json_fields(self) -> List[str]:
+        """Exposed names of object fields the LLM sends as JSON strings."""
+        return [name for name, convert in self.coercions.items() if convert is _JSON]
+
+    def _convert_datetime(self, value: str):
+        try:
+            return _to_utc(value)
+        except ValueError:
+            logging.warning(f"[{self.tool_name}] Could not parse datetime string: {value}")
+            return value
+
+    def apply(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        steps = self._steps
+        if not steps:
+            return {name: value for name, value in kwargs.items() if value is not None}
+        final_args = {}
+        for name, value in kwargs.items():
+            if value is None:
+                continue
+            step = steps.get(name)
+            if step is None:
+                final_args[name] = value
+                continue
+            target, convert = step
+            if convert is not None and isinstance(value, str):
+                value = self._convert_datetime(value) if convert is _DATETIME else _coerce(value, convert)
+            final_args[target] = value
+        return final_args
+
+
+def compile_tool_plan(tool_name: str, args_schema: Optional[Dict[str, Any]]) -> ToolCallPlan:
+    """Build the dispatch plan for a tool from its JSON schema.
+
+    Tools without a usable schema take a single free-form `input` argument,
+    passed through unchanged.
+    """
+    properties = (args_schema or {}).get("properties") or {}
+    if not properties:
+        return ToolCallPlan(tool_name, [("input", str, False)], {}, (), {})
+
+    required = set((args_schema or {}).get("required") or [])
+    parameters, renames, datetime_fields, coercions = [], {}, [], {}
+    param_names = _unique_param_names(list(properties))
+    for field_name, field_schema in properties.items():
+        param_name = param_names[field_name]
+        if param_name != field_name:
+            renames[param_name] = field_name
+        param_type = _field_type(field_schema or {})
+        if param_type is _JSON:
+            coercions[param_name], param_type = _JSON, str
+        elif param_type in (int, float, bool):
+            coercions[param_name] = param_type
+        elif param_type is str and _is_datetime_field(field_name, field_schema or {}):
+            datetime_fields.append(param_name)
+        parameters.append((param_name, param_type, field_name in required))
+
+    return ToolCallPlan(tool_name, parameters, renames, datetime_fields, coercions)
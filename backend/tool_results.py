@@ -0,0 +1,122 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from .config import Config
+
+# Well-known Composio payloads: (tool name prefix, list key, fields kept per item).
+# Everything else in each item (raw HTML, MIME payloads, attachment blobs...) is dropped.
+PROJECTIONS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("GMAIL_FETCH", "messages", (
+        "messageId", "threadId", "sender", "to", "subject", "messageTimestamp", "labelIds", "preview", "messageText",
+    )),
+    ("GMAIL_LIST_THREADS", "threads", ("id", "snippet", "historyId")),
+    ("GOOGLECALENDAR", "items", ("id", "summary", "start", "end", "location", "attendees", "status", "htmlLink")),
+    ("COMPOSIO_SEARCH", "results", ("title", "url", "link", "content", "snippet", "published_date", "date")),
+    ("TAVILY", "results", ("title", "url", "content", "published_date")),
+)
+
+# Keys that never help the LLM answer and can be very large
+HEAVY_KEYS = frozenset({"raw_content", "payload", "attachmentList", "html", "htmlBody", "raw", "images"})
+
+
+def _budget_for(tool_name: str) -> int:
+    for prefix, budget in Config.TOOL_RESULT_BUDGETS.items():
+        if tool_name.startswith(prefix):
+            return budget
+    return Config.TOOL_RESULT_MAX_CHARS
+
+
+def _projection_for(tool_name: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    for prefix, list_key, fields in PROJECTIONS:
+        if tool_name.startswith(prefix):
+            return list_key, fields
+    return None
+
+
+def _find_list(obj, key: str, depth: int = 3) -> Optional[Dict[str, Any]]:
+    """Return the dict holding `key` as a list, looking a few levels into wrappers like {"data": ...}."""
+    if not isinstance(obj, dict) or depth < 0:
+        return None
+    if isinstance(obj.get(key), list):
+        return obj
+    for value in obj.values():
+        found = _find_list(value, key, depth - 1)
+        if found is not None:
+            return found
+    return None
+
+
+def _slim(obj, max_field_chars: int):
+    """Drop heavy keys and null values and shorten long strings, recursively.
+
+    Empty strings and containers are kept: "no attendees" or "no messages" is an answer.
+    """
+    if isinstance(obj, dict):
+        return {k: _slim(v, max_field_chars) for k, v in obj.items() if k not in HEAVY_KEYS and v is not None}
+    if isinstance(obj, (list, tuple)):
+        return [_slim(v, max_field_chars) for v in obj]
+    if isinstance(obj, str) and len(obj) > max_field_chars:
+        return obj[:max_field_chars] + "…"
+    return obj
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def format_tool_result(tool_name: str, result: Any) -> str:
+    """Turn a raw MCP tool result into compact text that fits the tool's character budget.
+
+    JSON results are projected to the useful fields of well-known payloads,
+    stripped of heavy keys, serialized without whitespace, and trimmed item by
+    item from the end of their main list before any hard truncation.
+    """
+    if isinstance(result, str):
+        stripped = result.strip()
+        if not stripped.startswith(("{", "[")):
+            return _truncate(result, _budget_for(tool_name))
+        try:
+            result = json.loads(stripped)
+        except ValueError:
+            return _truncate(result, _budget_for(tool_name))
+
+    budget = _budget_for(tool_name)
+    data = _slim(result, Config.TOOL_RESULT_MAX_FIELD_CHARS)
+
+    items_holder, list_key = None, None
+    projection = _projection_for(tool_name)
+    if projection is not None:
+        list_key, fields = projection
+        items_holder = _find_list(data, list_key)
+        if items_holder is not None:
+            items_holder[list_key] = [
+                {f: item[f] for f in fields if f in item} if isinstance(item, dict) else item
+                for item in items_holder[list_key]
+            ]
+
+    text = _dumps(data)
+    if len(text) > budget and items_holder is not None:
+        items = items_holder[list_key]
+        total = len(items)
+        # Jump close to the right size first, then drop the remaining overflow one item at a time
+        del items[max(1, total * budget // len(text)):]
+        items_holder[list_key] = items + [f"… {total - len(items)} more omitted"]
+        text = _dumps(data)
+        while len(text) > budget and len(items) > 1:
+            items.pop()
+            items_holder[list_key] = items + [f"… {total - len(items)} more omitted"]
+            text = _dumps(data)
+    return _truncate(text, budget)
+
+
+def _truncate(text: str, budget: int) -> str:
+    if len(text) <= budget:
+        return text
+    return f"{text[:budget]}… [truncated {len(text) - budget} chars]"
+
+
+def log_preview(text: Any) -> str:
+    """Bounded rendering of a value for log lines."""
+    text = text if isinstance(text, str) else str(text)
+    limit = Config.TOOL_RESULT_LOG_CHARS
+    return text if len(text) <= limit else f"{text[:limit]}… ({len(text)} chars)"
@@ -0,0 +1,110 @@
+import math
+import re
+import logging
+from collections import Counter, OrderedDict
+from typing import Dict, List
+
+from .config import Config
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Spoken words -> words that appear in Composio tool names and descriptions
+SYNONYMS: Dict[str, tuple] = {
+    "email": ("gmail", "mail", "message"),
+    "emails": ("gmail", "mail", "message"),
+    "mail": ("gmail", "email"),
+    "inbox": ("gmail", "fetch", "emails"),
+    "reply": ("gmail", "reply", "thread"),
+    "meeting": ("calendar", "event"),
+    "meetings": ("calendar", "event", "events"),
+    "schedule": ("calendar", "event", "create"),
+    "appointment": ("calendar", "event"),
+    "reminder": ("calendar", "event"),
+    "cancel": ("delete", "event"),
+    "reschedule": ("update", "event", "calendar"),
+    "weather": ("search", "web"),
+    "news": ("search", "news"),
+    "price": ("search", "web"),
+    "stock": ("search", "finance"),
+    "look": ("search",),
+    "find": ("search", "find"),
+    "website": ("scrape", "crawl", "url"),
+    "page": ("scrape", "url"),
+}
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower().replace("_", " "))
+
+
+class ToolSearchIndex:
+    """Static keyword index over tool names and descriptions, built once per tool catalog.
+
+    Scores are a BM25-style sum of inverse document frequencies, so words shared
+    by many tools (e.g. 'gmail') count for less than distinctive ones.
+    """
+
+    def __init__(self, tools):
+        self.tools = list(tools)
+        self.names = [tool.__name__ for tool in self.tools]
+        self._postings: Dict[str, Dict[int, float]] = {}
+
+        documents = [Counter(_tokens(f"{tool.__name__} {tool.__name__} {tool.__doc__ or ''}")) for tool in self.tools]
+        doc_freq = Counter(token for doc in documents for token in doc)
+        average_length = sum(sum(doc.values()) for doc in documents) / max(len(documents), 1)
+        for i, doc in enumerate(documents):
+            length = sum(doc.values())
+            for token, tf in doc.items():
+                idf = math.log(1 + (len(documents) - doc_freq[token] + 0.5) / (doc_freq[token] + 0.5))
+                weight = idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * length / max(average_length, 1)))
+                self._postings.setdefault(token, {})[i] = weight
+
+    def search(self, text: str, top_k: int) -> List[int]:
+        """Indices of the tools that best match `text`, best first."""
+        query = set()
+        for token in _tokens(text):
+            query.add(token)
+            query.update(SYNONYMS.get(token, ()))
+
+        scores: Dict[int, float] = {}
+        for token in query:
+            for i, weight in self._postings.get(token, {}).items():
+                scores[i] = scores.get(i, 0.0) + weight
+        return sorted(scores, key=scores.get, reverse=True)[:top_k]
+
+
+class ToolRouter:
+    """Chooses the tools attached to each LLM request for one session.
+
+    A core set (TOOL_ROUTER_CORE_TOOLS) is always attached. Each user turn adds
+    the best keyword matches from the index; tools picked on recent turns stay
+    attached until newer picks push them out, so follow-up turns keep the tools
+    the conversation is using.
+    """
+
+    def __init__(self, index: ToolSearchIndex):
+        self.index = index
+        self.core = [
+            i for i, name in enumerate(index.names)
+            if name.startswith(tuple(prefix.lower() for prefix in Config.TOOL_ROUTER_CORE_TOOLS))
+        ]
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+
+    def current_tools(self):
+        selected = self.core + [i for i in reversed(self._recent) if i not in self.core]
+        return [self.index.tools[i] for i in selected]
+
+    def route(self, user_text: str):
+        """Update the selection for a new user turn. Returns the tools, or None if unchanged."""
+        before = list(self._recent)
+        for i in reversed(self.index.search(user_text, Config.TOOL_ROUTER_TOP_K)):
+            self._recent.pop(i, None)
+            self._recent[i] = None
+        while len(self._recent) > Config.TOOL_ROUTER_MAX_DYNAMIC:
+            self._recent.popitem(last=False)
+
+        if list(self._recent) == before:
+            return None
+        tools = self.current_tools()
+        logging.info(f"🧭 Routed {len(tools)} of {len(self.index.tools)} tools for this turn")
+        return tools
@@ -0,0 +1,151 @@
+import re
+import time
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+from .config import Config
+
+_WORD_RE = re.compile(r"[a-z']+")
+_HASH_COLS, _HASH_ROWS = 9, 8   # 9x8 luma grid -> 64-bit difference hash
+_CELL_SAMPLES = 3               # luma samples per cell side
+
+
+def luma_dhash(luma, width: int, height: int, stride: int = None) -> int:
+    """64-bit difference hash of an 8-bit luma plane (e.g. the Y plane of an I420 frame).
+
+    The plane is point-sampled onto a coarse grid instead of fully decoded or
+    resized, so the cost is a few hundred byte reads regardless of resolution.
+    """
+    stride = stride or width
+    grid_w, grid_h = _HASH_COLS * _CELL_SAMPLES, _HASH_ROWS * _CELL_SAMPLES
+    xs = [int((x + 0.5) * width / grid_w) for x in range(grid_w)]
+
+    cells = [[0] * _HASH_COLS for _ in range(_HASH_ROWS)]
+    for gy in range(grid_h):
+        offset = int((gy + 0.5) * height / grid_h) * stride
+        row = cells[gy // _CELL_SAMPLES]
+        for gx, x in enumerate(xs):
+            row[gx // _CELL_SAMPLES] += luma[offset + x]
+
+    bits = 0
+    for row in cells:
+        for left, right in zip(row, row[1:]):
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def fit_within(width: int, height: int, max_size: int) -> Tuple[int, int]:
+    """Scale (width, height) down so the longer side is at most max_size, keeping the aspect ratio."""
+    scale = min(1.0, max_size / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def is_visual_request(text: str) -> bool:
+    return bool(set(_WORD_RE.findall(text.lower())) & Config.VISION_TRIGGER_WORDS)
+
+
+class FrameSelector:
+    """Decides which camera frames are worth sending to the LLM.
+
+    Frames are sampled at VISION_SAMPLE_FPS and hashed. At the end of a user turn
+    the latest sample is attached only if the scene changed since the last frame
+    sent (hash distance above VISION_HASH_THRESHOLD) or the request is visual.
+    The assistant keeps the last frame sent in the history, so turns that skip
+    one still have it.
+    """
+
+    def __init__(self, sample_fps: float = None, hash_threshold: int = None):
+        self.sample_interval = 1.0 / (Config.VISION_SAMPLE_FPS if sample_fps is None else sample_fps)
+        self.hash_threshold = Config.VISION_HASH_THRESHOLD if hash_threshold is None else hash_threshold
+        self._last_sample_at = float("-inf")
+        self._latest = None
+        self._latest_hash: Optional[int] = None
+        self._sent_hash: Optional[int] = None
+        self.stats = {"frames_seen": 0, "frames_sampled": 0, "turns": 0, "attached": 0, "skipped_duplicate": 0}
+
+    def should_sample(self, now: float) -> bool:
+        self.stats["frames_seen"] += 1
+        if now - self._last_sample_at < self.sample_interval:
+            return False
+        self._last_sample_at = now
+        return True
+
+    def add_sample(self, frame, frame_hash: int):
+        self.stats["frames_sampled"] += 1
+        self._latest, self._latest_hash = frame, frame_hash
+
+    def select(self, user_text: str):
+        """The frame to attach to this turn, or None."""
+        self.stats["turns"] += 1
+        if self._latest is None:
+            return None
+        changed = self._sent_hash is None or hamming(self._latest_hash, self._sent_hash) > self.hash_threshold
+        if not changed and not is_visual_request(user_text):
+            self.stats["skipped_duplicate"] += 1
+            return None
+        self._sent_hash = self._latest_hash
+        self.stats["attached"] += 1
+        return self._latest
+
+    def summary(self) -> str:
+        return (
+            f"{self.stats['frames_sampled']}/{self.stats['frames_seen']} frames sampled, "
+            f"{self.stats['attached']} attached over {self.stats['turns']} turns, "
+            f"{self.stats['skipped_duplicate']} unchanged frames skipped"
+        )
+
+
+class CameraSampler:
+    """Reads the user's camera track and feeds sampled frames to a FrameSelector."""
+
+    def __init__(self, selector: FrameSelector):
+        self.selector = selector
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(self, track):
+        from livekit import rtc
+
+        if self._task is not None:
+            self._task.cancel()
+        self._task = asyncio.create_task(self._read(rtc.VideoStream(track)))
+
+    async def _read(self, stream):
+        from livekit import rtc
+
+        try:
+            async for event in stream:
+                if not self.selector.should_sample(time.monotonic()):
+                    continue
+                frame = event.frame
+                i420 = frame.convert(rtc.VideoBufferType.I420)
+                self.selector.add_sample(frame, luma_dhash(i420.data, i420.width, i420.height))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"⚠️ Camera sampling stopped: {e}")
+        finally:
+            await stream.aclose()
+
+    def image_content(self, user_text: str):
+        """ImageContent for this turn's frame (downscaled to VISION_MAX_SIZE at encode time), or None."""
+        from livekit.agents.llm import ImageContent
+
+        frame = self.selector.select(user_text)
+        if frame is None:
+            return None
+        width, height = fit_within(frame.width, frame.height, Config.VISION_MAX_SIZE)
+        return ImageContent(
+            image=frame,
+            inference_width=width,
+            inference_height=height,
+            inference_detail=Config.VISION_DETAIL,
+        )
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,84 @@
+"""Prompt tokens per turn over a simulated long session, with and without chat context compaction.
+
+The summarizer is a local stand-in that returns a fixed-size summary. Tokens are
+estimated at ~4 characters per token.
+
+Usage: python -m benchmarks.bench_context_compaction [--turns 200] [--tool-every 3]
+"""
+import argparse
+import asyncio
+
+from livekit.agents import ChatContext
+from livekit.agents.llm import FunctionCall, FunctionCallOutput
+
+from backend.context_compaction import ChatCompactor
+
+INSTRUCTIONS = "You are an intelligent AI voice assistant. " * 60
+TOOL_OUTPUT = '{"results":[' + ",".join('{"title":"Result","content":"' + "x" * 200 + '"}' for _ in range(12)) + "]}"
+
+
+class SimulatedAgent:
+    def __init__(self):
+        self._chat_ctx = ChatContext()
+        self._chat_ctx.add_message(role="system", content=INSTRUCTIONS)
+
+    @property
+    def chat_ctx(self):
+        return self._chat_ctx
+
+    async def update_chat_ctx(self, chat_ctx):
+        self._chat_ctx = chat_ctx.copy()
+
+
+async def fake_summarize(transcript):
+    return "The user asked about weather, stocks and their calendar; the assistant answered each. " * 4
+
+
+def prompt_tokens(chat_ctx):
+    chars = 0
+    for item in chat_ctx.items:
+        if item.type == "message":
+            chars += len(item.text_content or "")
+        elif item.type == "function_call":
+            chars += len(item.name) + len(item.arguments)
+        elif item.type == "function_call_output":
+            chars += len(item.output)
+    return chars // 4
+
+
+def add_turn(chat_ctx, turn, tool_every):
+    chat_ctx.add_message(role="user", content=f"Turn {turn}: what's the latest on topic number {turn}?")
+    if turn % tool_every == 0:
+        call_id = f"call_{turn}"
+        chat_ctx.items.append(FunctionCall(call_id=call_id, name="composio_search_tavily_search_0", arguments='{"query":"topic"}'))
+        chat_ctx.items.append(FunctionCallOutput(call_id=call_id, name="composio_search_tavily_search_0", output=TOOL_OUTPUT, is_error=False))
+    chat_ctx.add_message(role="assistant", content=f"Here is what I found about topic {turn}. " * 3)
+
+
+async def main(turns, tool_every):
+    baseline = SimulatedAgent()
+    compacted = SimulatedAgent()
+    compactor = ChatCompactor(compacted, summarize=fake_summarize)
+
+    checkpoints = {10, 25, 50, 100, 150, turns}
+    total_baseline = total_compacted = 0
+    print(f"{'turn':>5} {'no compaction':>15} {'compacted':>11}")
+    for turn in range(1, turns + 1):
+        add_turn(baseline.chat_ctx, turn, tool_every)
+        add_turn(compacted.chat_ctx, turn, tool_every)
+        await compactor._compact()
+
+        before, after = prompt_tokens(baseline.chat_ctx), prompt_tokens(compacted.chat_ctx)
+        total_baseline += before
+        total_compacted += after
+        if turn in checkpoints:
+            print(f"{turn:>5} {before:>15} {after:>11}")
+    print(f"total prompt tokens over {turns} turns: {total_baseline} -> {total_compacted}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--tool-every", type=int, default=3, help="a tool call every N turns")
+    opts = parser.parse_args()
+    asyncio.run(main(opts.turns, opts.tool_every))
@@ -0,0 +1,89 @@
+"""Import time and RSS of a worker process, eager plugin imports vs config-driven lazy imports.
+
+Each scenario runs in a fresh interpreter under `python -X importtime`. Import time
+is the sum of the per-module self times, grouped by top-level package. RSS is the
+child's peak resident set size after the imports.
+
+Scenarios:
+- eager: every LiveKit plugin plus mem0 and the LangChain MCP adapters at module
+  load (the old backend.main)
+- supervisor: `import backend.main` only, which is what the worker's main process pays
+- job: backend.main plus what the first job loads (the configured plugins, mem0 and the MCP adapters)
+
+Usage: python -m benchmarks.bench_import_time [--repeat 3] [--top 8]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+RSS_PROBE = "import json, resource; print(json.dumps({'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))"
+SCENARIOS = {
+    "eager": (
+        "from livekit.plugins import deepgram, silero, groq, elevenlabs, noise_cancellation, cartesia, openai, tavus\n"
+        "import mem0, langchain_mcp_adapters.client, langchain_mcp_adapters.tools\n"
+        "import backend.main"
+    ),
+    "supervisor": "import backend.main",
+    "job": (
+        "import backend.main\n"
+        "from backend import providers\n"
+        "providers.import_configured_plugins()\n"
+        "import mem0, langchain_mcp_adapters.client, langchain_mcp_adapters.tools"
+    ),
+}
+
+
+def parse_importtime(stderr: str):
+    """Total self time (ms) and self time per top-level package from `-X importtime` output."""
+    per_package = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_field, _, name = line.split("|")
+            self_us = int(self_field.split(":")[1])
+        except ValueError:
+            continue
+        per_package[name.strip().split(".")[0]] += self_us / 1000
+    return sum(per_package.values()), dict(per_package)
+
+
+def run_scenario(code: str):
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{code}\n{RSS_PROBE}"],
+        capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+        raise RuntimeError(error)
+    total_ms, per_package = parse_importtime(proc.stderr)
+    rss_mb = json.loads(proc.stdout.strip().splitlines()[-1])["rss_kb"] / 1024
+    return {"wall_ms": wall_ms, "import_ms": total_ms, "rss_mb": rss_mb, "packages": per_package}
+
+
+def main(repeat, top):
+    print(f"{'scenario':<12} {'import':>10} {'process':>10} {'RSS':>9}")
+    for name, code in SCENARIOS.items():
+        try:
+            runs = [run_scenario(code) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"{name:<12} failed: {e}")
+            continue
+        median = lambda key: statistics.median(run[key] for run in runs)
+        print(f"{name:<12} {median('import_ms'):>8.0f}ms {median('wall_ms'):>8.0f}ms {median('rss_mb'):>7.0f}MB")
+        heaviest = sorted(runs[-1]["packages"].items(), key=lambda item: item[1], reverse=True)[:top]
+        print("             " + ", ".join(f"{package} {ms:.0f}ms" for package, ms in heaviest))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="heaviest packages listed per scenario")
+    opts = parser.parse_args()
+    main(opts.repeat, opts.top)
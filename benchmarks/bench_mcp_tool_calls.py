@@ -0,0 +1,60 @@
+"""Per-call latency of MCP tool invocations: reconnect-and-relist vs pooled sessions.
+
+Usage: python -m benchmarks.bench_mcp_tool_calls [--calls 50] [--latency 0.0]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+from backend import mcp_handler
+from backend.config import Config
+from benchmarks.stub_mcp_server import StubMCPServer
+
+TOOL_NAME = "COMPOSIO_SEARCH_TAVILY_SEARCH"
+
+
+async def call_reconnect_and_relist(args):
+    """The pre-pool code path: new session, list tools, linear scan, invoke."""
+    async with mcp_handler.mcp_client.session("composio") as session:
+        tools = await load_mcp_tools(session)
+        tool = next(t for t in tools if t.name == TOOL_NAME)
+        return await tool.ainvoke(args)
+
+
+async def call_pooled(args):
+    return await mcp_handler.mcp_session_pools["composio"].call_tool(TOOL_NAME, args)
+
+
+async def measure(label, fn, calls):
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await fn({"query": f"mumbai weather {i}"})
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    print(
+        f"{label:<24} p50={statistics.median(samples):7.2f}ms "
+        f"p95={samples[int(len(samples) * 0.95) - 1]:7.2f}ms mean={statistics.fmean(samples):7.2f}ms"
+    )
+
+
+async def main(calls, latency):
+    with StubMCPServer(latency=latency) as server:
+        Config.COMPOSIO_MCP_URL = server.url
+        await mcp_handler.initialize_mcp_client()
+        try:
+            await measure("reconnect + relist", call_reconnect_and_relist, calls)
+            await measure("pooled session", call_pooled, calls)
+        finally:
+            await mcp_handler.close_mcp_session_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated server-side latency per call (s)")
+    opts = parser.parse_args()
+    asyncio.run(main(opts.calls, opts.latency))
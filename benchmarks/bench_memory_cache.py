@@ -0,0 +1,57 @@
+"""Memory load latency on connect vs reconnect with the local SQLite memory cache.
+
+Usage: python -m benchmarks.bench_memory_cache [--memories 1000] [--latency 0.15] [--reconnects 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from backend import memory_cache, memory_handler
+from backend.config import Config
+from backend.memory_handler import load_memories
+from benchmarks.fakes import FakeMemoryClient
+
+
+async def timed_load():
+    start = time.perf_counter()
+    await load_memories()
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(memories, latency, reconnects):
+    fake = FakeMemoryClient(latency=latency).seed(Config.DEFAULT_USER, memories)
+    memory_handler._memory_client = fake
+    Config.MEM0_API_KEY = Config.MEM0_API_KEY or "bench"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.MEMORY_CACHE_PATH = ""
+        uncached = [await timed_load() for _ in range(reconnects)]
+
+        Config.MEMORY_CACHE_PATH = os.path.join(tmp, "memory_cache.sqlite3")
+        memory_cache._memory_cache = None
+        cold = await timed_load()
+        warm = [await timed_load() for _ in range(reconnects)]
+
+        cache = memory_cache.get_memory_cache()
+        cache.ttl = 0
+        stale = [await timed_load() for _ in range(reconnects)]
+        await asyncio.gather(*cache._refreshes.values())
+
+    print(f"{memories} memories, {latency * 1000:.0f}ms simulated Mem0 latency")
+    print(f"  no cache        median={statistics.median(uncached):8.2f}ms")
+    print(f"  cold (miss)            {cold:8.2f}ms")
+    print(f"  reconnect (hit) median={statistics.median(warm):8.2f}ms")
+    print(f"  stale + refresh median={statistics.median(stale):8.2f}ms")
+    print(f"  cache stats {cache.stats}, mem0 calls {fake.calls}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--memories", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--reconnects", type=int, default=20)
+    opts = parser.parse_args()
+    asyncio.run(main(opts.memories, opts.latency, opts.reconnects))
@@ -0,0 +1,53 @@
+"""Prompt size and load latency of the memory context: dump-everything vs budgeted retrieval.
+
+LLM prefill latency is estimated from the memory message size at --prefill-tps tokens/s.
+
+Usage: python -m benchmarks.bench_memory_retrieval [--prefill-tps 2000]
+"""
+import argparse
+import asyncio
+import time
+
+from backend import memory_handler
+from backend.config import Config
+from backend.memory_handler import MemoryRetriever, estimate_tokens, load_memories
+from benchmarks.fakes import FakeMemoryClient
+
+MEMORY_COUNTS = (10, 1_000, 10_000)
+
+
+async def run(count, mode, prefill_tps):
+    fake = FakeMemoryClient().seed(Config.DEFAULT_USER, count)
+    memory_handler._memory_client = fake
+    Config.MEMORY_RETRIEVAL_MODE = mode
+
+    start = time.perf_counter()
+    mem0, initial_ctx, memory_str, user_name = await load_memories()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    tokens = sum(estimate_tokens(item.text_content or "") for item in initial_ctx.items)
+    turn_tokens = 0
+    if mode == "budgeted":
+        retriever = MemoryRetriever(mem0, user_name, memory_str)
+        context = await retriever.retrieve("any good hiking near paris this weekend")
+        turn_tokens = estimate_tokens(context) if context else 0
+
+    print(
+        f"{count:>6} memories  {mode:<8}  load={load_ms:8.2f}ms  prompt_tokens={tokens:>8}  "
+        f"+turn={turn_tokens:>4}  est_prefill={tokens / prefill_tps * 1000:9.1f}ms"
+    )
+
+
+async def main(prefill_tps):
+    Config.MEM0_API_KEY = Config.MEM0_API_KEY or "bench"
+    Config.MEMORY_CACHE_PATH = ""
+    for count in MEMORY_COUNTS:
+        for mode in ("all", "budgeted"):
+            await run(count, mode, prefill_tps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prefill-tps", type=float, default=2000.0, help="assumed LLM prefill throughput")
+    opts = parser.parse_args()
+    asyncio.run(main(opts.prefill_tps))
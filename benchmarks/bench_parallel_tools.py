@@ -0,0 +1,88 @@
+"""Load test: latency of a tool round (several calls from one LLM turn), sequential vs concurrent.
+
+Runs against the local stub MCP server with simulated per-call latency, through
+the same LiveKit tool wrappers the agent uses.
+
+Usage: python -m benchmarks.bench_parallel_tools [--latency 0.3] [--calls-per-turn 3] [--sessions 20]
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+from backend import mcp_handler
+from backend.config import Config
+from backend.mcp_handler import load_and_convert_mcp_tools
+from benchmarks.stub_mcp_server import StubMCPServer
+
+_unique = itertools.count()
+
+
+def find_tool(tools, prefix):
+    return next(t for t in tools if t.__name__.startswith(prefix))
+
+
+def turn_calls(tools, count):
+    """Independent calls the LLM might emit in one turn; unique queries keep the result cache out of it."""
+    search = find_tool(tools, "composio_search_tavily_search")
+    emails = find_tool(tools, "gmail_fetch_emails")
+    calls = []
+    for i in range(count):
+        if i % 2:
+            calls.append(lambda: emails(max_results=next(_unique) % 50 + 1))
+        else:
+            calls.append(lambda: search(query=f"query {next(_unique)}"))
+    return calls
+
+
+async def sequential_round(calls):
+    for call in calls:
+        await call()
+
+
+async def concurrent_round(calls):
+    await asyncio.gather(*(call() for call in calls))
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(latency, calls_per_turn, sessions):
+    Config.TOOL_CACHE_TTLS = {}
+    with StubMCPServer(latency=latency) as server:
+        Config.COMPOSIO_MCP_URL = server.url
+        Config.MCP_CATALOG_CACHE_PATH = ""
+        tools = await load_and_convert_mcp_tools()
+        try:
+            seq = [await timed(sequential_round(turn_calls(tools, calls_per_turn))) for _ in range(5)]
+            par = [await timed(concurrent_round(turn_calls(tools, calls_per_turn))) for _ in range(5)]
+            print(f"one turn, {calls_per_turn} calls, {latency * 1000:.0f}ms each")
+            print(f"  sequential  median={statistics.median(seq):8.1f}ms")
+            print(f"  concurrent  median={statistics.median(par):8.1f}ms")
+
+            start = time.perf_counter()
+            rounds = await asyncio.gather(*(
+                timed(concurrent_round(turn_calls(tools, calls_per_turn))) for _ in range(sessions)
+            ))
+            wall = time.perf_counter() - start
+            rounds.sort()
+            print(f"{sessions} sessions at once, pool of {Config.MCP_POOL_MAX_SESSIONS} sessions")
+            print(
+                f"  round p50={rounds[len(rounds) // 2]:8.1f}ms p95={rounds[int(len(rounds) * 0.95) - 1]:8.1f}ms "
+                f"throughput={sessions * calls_per_turn / wall:6.1f} calls/s"
+            )
+        finally:
+            await mcp_handler.close_mcp_session_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--calls-per-turn", type=int, default=3)
+    parser.add_argument("--sessions", type=int, default=20)
+    opts = parser.parse_args()
+    asyncio.run(main(opts.latency, opts.calls_per_turn, opts.sessions))
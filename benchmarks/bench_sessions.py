@@ -0,0 +1,267 @@
+"""Offline load test: many concurrent agent sessions against local stand-ins for every service.
+
+Each simulated session runs the entrypoint's own wiring (`backend.main.setup_session`):
+- the tool catalog and the user's memories load as timed startup stages
+- the assistant greets, then the user speaks --turns utterances through a fake
+  streaming STT; replies go through LiveKit's default TTS path into a fake TTS
+- the session's shutdown callbacks run, flushing the conversation to Mem0
+
+The MCP server (streamable HTTP), the OpenAI-compatible LLM (HTTP, streamed),
+Mem0, STT and TTS (in-process) are fakes with configurable latency. Only the
+room, VAD and avatar are left out. Turn latency runs from the end of the
+user's speech to the end of the reply's playout, so it includes LiveKit's endpointing delay.
+
+Reports startup stage and turn latency percentiles, throughput and RSS per concurrent session.
+Exits non-zero if a session fails, if the tool calls or the user turns saved to Mem0 differ
+from what the turns should produce, or if --max-turn-p95-ms is exceeded, so it can gate regressions.
+
+Usage: python -m benchmarks.bench_sessions [--sessions 50] [--concurrency 20] [--turns 4]
+       [--llm-ttft 0.2] [--tool-latency 0.2] [--memory-latency 0.05] [--stt-latency 0.1] [--tts-ttfb 0.15]
+       [--max-turn-p95-ms 0] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from backend import mcp_handler, memory_handler
+from backend.config import REQUIRED_KEYS, STT_API_KEYS, Config
+from backend.main import GREETING_INSTRUCTIONS, StartupTimings, _create_llm_client, setup_session
+from benchmarks.fake_llm_server import TOOL_TRIGGERS, FakeLLMServer
+from benchmarks.fakes import FakeAudioOutput, FakeMemoryClient, FakeSTT, FakeTTS
+from benchmarks.stub_mcp_server import StubMCPServer
+
+TURNS = [
+    "what's the weather in mumbai today",
+    "thanks, and can you tell me a bit about yourself",
+    "check my inbox for anything new",
+    "any news about the monsoon",
+    "great, that's all for now",
+]
+TURN_TIMEOUT = 30.0
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def needs_tool(text):
+    """Whether the fake LLM answers this turn with a tool call."""
+    return any(set(text.lower().split()) & set(triggers) for triggers, _, _ in TOOL_TRIGGERS)
+
+
+class BenchJobContext:
+    """The parts of a JobContext that `setup_session` uses, for a user joining straight away."""
+
+    def __init__(self, user_id, opts):
+        self.proc = SimpleNamespace(userdata={
+            "stt": FakeSTT(latency=opts.stt_latency),
+            "tts": FakeTTS(ttfb=opts.tts_ttfb),
+            "vad": None,
+            "llm_client": _create_llm_client(),
+        })
+        self.room = None
+        self.participant = SimpleNamespace(identity=user_id, metadata="", attributes={})
+        self.shutdown_callbacks = []
+
+    async def connect(self):
+        pass
+
+    async def wait_for_participant(self):
+        return self.participant
+
+    def add_shutdown_callback(self, callback):
+        self.shutdown_callbacks.append(callback)
+
+    async def shutdown(self):
+        for callback in self.shutdown_callbacks:
+            await callback()
+
+
+async def run_session(index, turns, mem0, opts, timings, counts):
+    user_id = f"user_{index}"
+    ctx = BenchJobContext(user_id, opts)
+    startup = StartupTimings()
+    session, assistant, load_tasks = setup_session(ctx, startup)
+
+    def on_metrics_collected(ev):
+        if getattr(ev.metrics, "type", None) == "llm_metrics":
+            timings["llm_ttft_ms"].append(ev.metrics.ttft * 1000)
+
+    def on_function_tools_executed(ev):
+        counts["tool_calls"] += len(ev.function_calls)
+
+    session.on("metrics_collected", on_metrics_collected)
+    session.on("function_tools_executed", on_function_tools_executed)
+
+    session.output.audio = FakeAudioOutput()
+    await session.start(agent=assistant)
+    try:
+        await asyncio.wait_for(session.generate_reply(instructions=GREETING_INSTRUCTIONS), TURN_TIMEOUT)
+        await asyncio.gather(*load_tasks, return_exceptions=True)
+        # From here on, every generated reply answers a user turn; fillers are "say" speeches
+        replies = asyncio.Queue()
+        session.on("speech_created", lambda ev: replies.put_nowait(ev.speech_handle) if ev.source == "generate_reply" else None)
+        for stage, seconds in startup.stages.items():
+            timings[f"{stage}_ms"].append(seconds * 1000)
+
+        said = set()
+        for turn in range(turns):
+            text = TURNS[(index + turn) % len(TURNS)]
+            said.add(text)
+            counts["expected_tool_calls"] += needs_tool(text)
+            started = time.perf_counter()
+            ctx.proc.userdata["stt"].say(text)
+            reply = await asyncio.wait_for(replies.get(), TURN_TIMEOUT)
+            await asyncio.wait_for(reply.wait_for_playout(), TURN_TIMEOUT)
+            timings["turn_ms"].append((time.perf_counter() - started) * 1000)
+    finally:
+        await session.aclose()
+        started = time.perf_counter()
+        await ctx.shutdown()
+        timings["shutdown_ms"].append((time.perf_counter() - started) * 1000)
+
+    # Every distinct user utterance reaches Mem0 exactly once
+    saved = {m["memory"] for m in mem0.memories.get(user_id, [])}
+    counts["expected_saved_turns"] += len(said)
+    counts["saved_turns"] += len(said & saved)
+    timings["session_ms"].append((time.perf_counter() - startup.job_start) * 1000)
+
+
+async def sample_rss(peak):
+    while True:
+        peak[0] = max(peak[0], rss_mb())
+        await asyncio.sleep(0.1)
+
+
+async def main(opts):
+    mem0 = FakeMemoryClient(latency=opts.memory_latency)
+    for index in range(opts.sessions):
+        mem0.seed(f"user_{index}", opts.memories, seed=index)
+
+    timings = defaultdict(list)
+    counts = defaultdict(int)
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp, \
+            StubMCPServer(latency=opts.tool_latency) as mcp_server, \
+            FakeLLMServer(ttft=opts.llm_ttft) as llm_server:
+        Config.COMPOSIO_MCP_URL = mcp_server.url
+        Config.MCP_CATALOG_CACHE_PATH = ""
+        Config.OPENROUTER_BASE_URL = llm_server.base_url
+        Config.OPENROUTER_API_KEY = "fake"
+        Config.MEM0_API_KEY = "fake"
+        Config.MEMORY_CACHE_PATH = os.path.join(tmp, "memory_cache.sqlite3")
+        Config.METRICS_PORT = 0
+        Config.VISION_ENABLED = False   # no room, so no camera track
+        memory_handler._memory_client = mem0
+        # setup_session checks the environment before it starts loading anything
+        os.environ.update({key: getattr(Config, key, None) or "fake" for key in REQUIRED_KEYS + list(STT_API_KEYS.values())})
+
+        baseline_rss = rss_mb()
+        peak = [baseline_rss]
+        sampler = asyncio.create_task(sample_rss(peak))
+        limit = asyncio.Semaphore(opts.concurrency)
+
+        async def bounded(index):
+            nonlocal failures
+            async with limit:
+                try:
+                    await run_session(index, opts.turns, mem0, opts, timings, counts)
+                except Exception as e:
+                    failures += 1
+                    print(f"session {index} failed: {e!r}", file=sys.stderr)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(bounded(i) for i in range(opts.sessions)))
+        wall = time.perf_counter() - wall_start
+        sampler.cancel()
+        await mcp_handler.close_mcp_session_pools()
+        llm_requests = llm_server.requests
+
+    report = {
+        "sessions": opts.sessions,
+        "concurrency": opts.concurrency,
+        "failures": failures,
+        "wall_s": round(wall, 2),
+        "sessions_per_s": round(opts.sessions / wall, 2),
+        "turns_per_s": round(len(timings["turn_ms"]) / wall, 2),
+        "llm_requests": llm_requests,
+        "mem0_calls": dict(mem0.calls),
+        "tool_calls": counts["tool_calls"],
+        "expected_tool_calls": counts["expected_tool_calls"],
+        "saved_user_turns": counts["saved_turns"],
+        "expected_saved_user_turns": counts["expected_saved_turns"],
+        "rss_baseline_mb": round(baseline_rss, 1),
+        "rss_peak_mb": round(peak[0], 1),
+        "rss_per_concurrent_session_mb": round((peak[0] - baseline_rss) / max(1, min(opts.concurrency, opts.sessions)), 2),
+        "latency_ms": {
+            stage: {f"p{int(p * 100)}": round(percentile(values, p), 1) for p in (0.5, 0.95, 0.99)}
+            for stage, values in timings.items()
+        },
+    }
+
+    print(f"{opts.sessions} sessions x {opts.turns} turns, {opts.concurrency} at once: {failures} failed in {wall:.1f}s")
+    print(f"throughput: {report['sessions_per_s']} sessions/s, {report['turns_per_s']} turns/s, {llm_requests} LLM requests")
+    print(
+        f"tool calls: {counts['tool_calls']}/{counts['expected_tool_calls']} expected, "
+        f"user turns saved to Mem0: {counts['saved_turns']}/{counts['expected_saved_turns']}, mem0 calls {dict(mem0.calls)}"
+    )
+    print(f"{'stage':<16} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for stage, values in report["latency_ms"].items():
+        print(f"{stage:<16} {values['p50']:>8.1f}ms {values['p95']:>8.1f}ms {values['p99']:>8.1f}ms")
+    print(f"RSS: {baseline_rss:.0f}MB -> peak {peak[0]:.0f}MB, ~{report['rss_per_concurrent_session_mb']}MB per concurrent session")
+
+    if opts.json:
+        with open(opts.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    problems = []
+    if failures:
+        problems.append(f"{failures} sessions failed")
+    if counts["tool_calls"] != counts["expected_tool_calls"]:
+        problems.append(f"{counts['tool_calls']} tool calls, expected {counts['expected_tool_calls']}")
+    if counts["saved_turns"] != counts["expected_saved_turns"] or (counts["expected_saved_turns"] and not mem0.calls["add"]):
+        problems.append(
+            f"{counts['saved_turns']} user turns saved in {mem0.calls['add']} Mem0 add calls, "
+            f"expected {counts['expected_saved_turns']}"
+        )
+    turn_p95 = report["latency_ms"].get("turn_ms", {}).get("p95", 0.0)
+    if opts.max_turn_p95_ms and turn_p95 > opts.max_turn_p95_ms:
+        problems.append(f"turn p95 {turn_p95:.1f}ms over the {opts.max_turn_p95_ms:.0f}ms limit")
+    if problems:
+        print(f"FAIL: {'; '.join(problems)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--memories", type=int, default=200, help="memories seeded per user")
+    parser.add_argument("--llm-ttft", type=float, default=0.2)
+    parser.add_argument("--tool-latency", type=float, default=0.2)
+    parser.add_argument("--memory-latency", type=float, default=0.05)
+    parser.add_argument("--stt-latency", type=float, default=0.1, help="seconds from end of speech to final transcript")
+    parser.add_argument("--tts-ttfb", type=float, default=0.15)
+    parser.add_argument("--max-turn-p95-ms", type=float, default=0, help="fail if the turn p95 exceeds this")
+    parser.add_argument("--json", help="write the report to this file")
+    sys.exit(asyncio.run(main(parser.parse_args())))
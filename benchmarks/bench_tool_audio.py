@@ -0,0 +1,130 @@
+"""Time to first audio on tool turns: LiveKit's default streaming TTS path, with and without a spoken filler.
+
+Simulates one turn that needs a tool: the LLM emits the tool call after --llm-ttft,
+the tool takes the given latency, then the LLM streams the answer. The answer goes
+through LiveKit's own `Agent.default.tts_node`, which pushes tokens into one
+`tts.stream()` and lets the TTS split sentences, backed by a local fake TTS with
+--tts-ttfb to first frame. The filler goes through the same scheduling code the
+tool wrappers use. Also checks that a barge-in closes the TTS stream.
+
+Usage: python -m benchmarks.bench_tool_audio [--llm-ttft 0.4] [--tts-ttfb 0.15] [--token-interval 0.02]
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, Agent
+
+from backend.config import Config
+from backend.speech import schedule_filler
+from benchmarks.fakes import FakeTTS
+
+ANSWER = (
+    "Right now in Mumbai it's 31 degrees and humid, with scattered clouds over the coast. "
+    "There's a good chance of light rain this evening, so you might want an umbrella. "
+    "Tomorrow looks similar, with highs around 32 and a stronger breeze in the afternoon."
+)
+TOOL_LATENCIES = (0.1, 0.5, 1.5, 3.0)
+_speech_ids = itertools.count()
+
+
+async def answer_tokens(ttft, token_interval):
+    await asyncio.sleep(ttft)
+    for word in ANSWER.split(" "):
+        yield word + " "
+        await asyncio.sleep(token_interval)
+
+
+async def single(text):
+    yield text
+
+
+def default_tts_node(tts, text):
+    """LiveKit's default tts_node, given just enough of an agent to find the TTS."""
+    activity = SimpleNamespace(tts=tts, session=SimpleNamespace(conn_options=SimpleNamespace(tts_conn_options=DEFAULT_API_CONNECT_OPTIONS)))
+    agent = SimpleNamespace(_get_activity_or_raise=lambda: activity)
+    return Agent.default.tts_node(agent, text, None)
+
+
+async def first_frame(frames, start):
+    async for _ in frames:
+        return time.perf_counter() - start
+    return None
+
+
+class FillerSession:
+    """Just enough of an AgentSession for schedule_filler: say() speaks through the default tts_node."""
+
+    def __init__(self, tts, start):
+        self.tts, self.start, self.first_audio, self._tasks = tts, start, None, []
+
+    def say(self, text, **kwargs):
+        async def speak():
+            frames = default_tts_node(self.tts, single(text))
+            self.first_audio = await first_frame(frames, self.start)
+            await frames.aclose()
+        self._tasks.append(asyncio.create_task(speak()))
+
+    async def wait(self):
+        await asyncio.gather(*self._tasks)
+
+
+async def tool_turn(with_filler, tool_latency, opts):
+    tts = FakeTTS(ttfb=opts.tts_ttfb)
+    start = time.perf_counter()
+    await asyncio.sleep(opts.llm_ttft)   # LLM decides to call the tool
+
+    session = FillerSession(tts, start)
+    filler = None
+    if with_filler:
+        context = SimpleNamespace(session=session, speech_handle=SimpleNamespace(id=f"speech_{next(_speech_ids)}", interrupted=False))
+        filler = schedule_filler(context, "COMPOSIO_SEARCH_TAVILY_SEARCH")
+    await asyncio.sleep(tool_latency)
+    if filler is not None:
+        filler.cancel()
+
+    frames = default_tts_node(tts, answer_tokens(opts.llm_ttft, opts.token_interval))
+    answer_audio = await first_frame(frames, start)
+    await frames.aclose()
+    await session.wait()
+    first_audio = min(t for t in (session.first_audio, answer_audio) if t is not None)
+    return first_audio, answer_audio, session.first_audio is not None
+
+
+async def barge_in(opts):
+    """Interrupt after the first answer frame and count TTS streams still open."""
+    tts = FakeTTS(ttfb=opts.tts_ttfb, frame_interval=0.05)
+    frames = default_tts_node(tts, answer_tokens(0.0, opts.token_interval))
+    await first_frame(frames, time.perf_counter())
+    await asyncio.sleep(0.3)   # the user talks over the reply
+    open_before = tts.in_flight
+    await frames.aclose()
+    return tts.requests, open_before, tts.in_flight
+
+
+async def main(opts):
+    policies = (("default stream", False), ("stream + filler", True))
+    print(f"LLM TTFT {opts.llm_ttft * 1000:.0f}ms, TTS first frame {opts.tts_ttfb * 1000:.0f}ms, filler after {Config.FILLER_DELAY * 1000:.0f}ms")
+    print(f"{'tool latency':>12}  " + "  ".join(f"{name:>16}" for name, _ in policies) + "  answer audio")
+    for tool_latency in TOOL_LATENCIES:
+        row, answer = [], None
+        for _, with_filler in policies:
+            first_audio, answer_audio, filler_spoken = await tool_turn(with_filler, tool_latency, opts)
+            row.append(f"{first_audio * 1000:>14.0f}ms" + ("*" if filler_spoken else " "))
+            if not with_filler:
+                answer = answer_audio
+        print(f"{tool_latency * 1000:>10.0f}ms  " + "  ".join(row) + f"  {answer * 1000:>10.0f}ms")
+    print("* first audio was the filler")
+
+    streams, open_before, open_after = await barge_in(opts)
+    print(f"barge-in: {streams} TTS stream opened, {open_before} open when interrupted, {open_after} left after")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm-ttft", type=float, default=0.4)
+    parser.add_argument("--tts-ttfb", type=float, default=0.15)
+    parser.add_argument("--token-interval", type=float, default=0.02, help="seconds between streamed words")
+    asyncio.run(main(parser.parse_args()))
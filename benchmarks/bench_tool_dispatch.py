@@ -0,0 +1,111 @@
+"""Per-call argument handling: legacy name-matching remap vs the precompiled dispatch plan.
+
+The plan is there for correctness (schema field names, type coercion, every
+calendar tool's datetimes); this checks it costs about the same per call as the
+remap it replaced, not that it is faster.
+
+Usage: python -m benchmarks.bench_tool_dispatch [--tools 200] [--calls 20000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+
+from backend.tool_dispatch import compile_tool_plan
+
+# name -> (schema properties, arguments under the compiled plan, the same call under the legacy guessed names)
+SCHEMAS = {
+    "COMPOSIO_SEARCH_TAVILY_SEARCH": (
+        {"query": {"type": "string"}, "max_results": {"type": "integer"}},
+        {"query": "mumbai weather now", "max_results": 5},
+        {"query": "mumbai weather now"},
+    ),
+    "GMAIL_SEND_EMAIL": (
+        {"recipient_email": {"type": "string"}, "subject": {"type": "string"}, "body": {"type": "string"},
+         "is_html": {"type": "boolean"}},
+        {"recipient_email": "john@example.com", "subject": "Update", "body": "Hi John", "is_html": None},
+        {"to": "john@example.com", "subject": "Update", "body": "Hi John"},
+    ),
+    "GOOGLECALENDAR_CREATE_EVENT": (
+        {"summary": {"type": "string"}, "start_datetime": {"type": "string"}, "end_datetime": {"type": "string"},
+         "attendees": {"type": "array"}},
+        {"summary": "Sync", "start_datetime": "2025-06-02T15:00:00+05:30", "end_datetime": "2025-06-02T16:00:00+05:30"},
+        {"summary": "Sync", "start_time": "2025-06-02T15:00:00+05:30", "end_time": "2025-06-02T16:00:00+05:30"},
+    ),
+    "GMAIL_FETCH_EMAILS": (
+        {"from": {"type": "string"}, "max_results": {"type": "integer"}, "include_spam_trash": {"type": "boolean"}},
+        {"from_": "boss@example.com", "max_results": 10},
+        {"input": "boss@example.com"},
+    ),
+}
+
+
+def legacy_remap(original_tool_name, kwargs):
+    """The per-call logic the wrapper used before plans were compiled."""
+    filtered_args = {k: v for k, v in kwargs.items() if v is not None}
+    tool_name_lower_check = original_tool_name.lower()
+    if 'calendar' in tool_name_lower_check:
+        for key in ['start_time', 'end_time']:
+            if key in filtered_args and isinstance(filtered_args[key], str):
+                try:
+                    dt_obj = datetime.fromisoformat(filtered_args[key])
+                    filtered_args[key] = dt_obj.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+                except ValueError:
+                    pass
+    remapped_args = filtered_args.copy()
+    if ('search' in tool_name_lower_check or 'crawl' in tool_name_lower_check) and 'input' in remapped_args and 'query' not in remapped_args:
+        remapped_args['query'] = remapped_args.pop('input')
+    if 'calendar' in tool_name_lower_check:
+        if 'start_time' in remapped_args and 'start_datetime' not in remapped_args:
+            remapped_args['start_datetime'] = remapped_args.pop('start_time')
+        if 'end_time' in remapped_args and 'end_datetime' not in remapped_args:
+            remapped_args['end_datetime'] = remapped_args.pop('end_time')
+        if ('update_event' in tool_name_lower_check or 'delete_event' in tool_name_lower_check) and 'id' in remapped_args and 'event_id' not in remapped_args:
+            remapped_args['event_id'] = remapped_args.pop('id')
+    if 'send' in tool_name_lower_check and 'gmail' in tool_name_lower_check and 'to' in remapped_args and 'recipient_email' not in remapped_args:
+        remapped_args['recipient_email'] = remapped_args.pop('to')
+    return remapped_args
+
+
+def build_catalog(size):
+    """`size` tools cycling through the sample schemas, as a large Composio catalog would."""
+    names = list(SCHEMAS)
+    catalog = []
+    for i in range(size):
+        base = names[i % len(names)]
+        properties, plan_args, legacy_args = SCHEMAS[base]
+        catalog.append((f"{base}_{i}", {"type": "object", "properties": properties}, plan_args, legacy_args))
+    return catalog
+
+
+def main(tools, calls):
+    catalog = build_catalog(tools)
+
+    start = time.perf_counter()
+    plans = {name: compile_tool_plan(name, schema) for name, schema, _, _ in catalog}
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(0)
+    workload = [rng.choice(catalog) for _ in range(calls)]
+
+    start = time.perf_counter()
+    for name, _, _, legacy_args in workload:
+        legacy_remap(name, legacy_args)
+    legacy_us = (time.perf_counter() - start) / calls * 1e6
+
+    start = time.perf_counter()
+    for name, _, plan_args, _ in workload:
+        plans[name].apply(plan_args)
+    plan_us = (time.perf_counter() - start) / calls * 1e6
+
+    print(f"{tools} tools: compiled plans in {compile_ms:.2f}ms ({compile_ms / tools * 1000:.1f}us/tool)")
+    print(f"  legacy remap   {legacy_us:6.2f}us/call")
+    print(f"  compiled plan  {plan_us:6.2f}us/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tools", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=20000)
+    opts = parser.parse_args()
+    main(opts.tools, opts.calls)
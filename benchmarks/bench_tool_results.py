@@ -0,0 +1,90 @@
+"""Size and serialization time of tool results: pretty-printed JSON vs the compact, budgeted formatter.
+
+Token counts are estimated at ~4 characters per token.
+
+Usage: python -m benchmarks.bench_tool_results [--emails 25] [--hits 10] [--repeat 200]
+"""
+import argparse
+import json
+import time
+
+from backend.tool_results import format_tool_result
+
+LOREM = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt. "
+
+
+def gmail_payload(count):
+    return {
+        "successful": True,
+        "error": None,
+        "data": {
+            "messages": [
+                {
+                    "messageId": f"18f{i:05x}",
+                    "threadId": f"18e{i:05x}",
+                    "sender": f"Sender {i} <sender{i}@example.com>",
+                    "to": "me@example.com",
+                    "subject": f"Quarterly update #{i}",
+                    "messageTimestamp": "2025-06-02T09:30:00Z",
+                    "labelIds": ["INBOX", "UNREAD"],
+                    "preview": {"subject": f"Quarterly update #{i}", "body": LOREM[:80]},
+                    "messageText": LOREM * 20,
+                    "payload": {"mimeType": "text/html", "body": {"data": "<div>" + LOREM * 40 + "</div>"}},
+                    "attachmentList": [{"filename": "report.pdf", "attachmentId": "A" * 200}],
+                }
+                for i in range(count)
+            ],
+            "nextPageToken": "abc123",
+        },
+    }
+
+
+def search_payload(count):
+    return {
+        "successful": True,
+        "data": {
+            "answer": "Mumbai is 31°C and humid with light showers expected.",
+            "results": [
+                {
+                    "title": f"Mumbai weather result {i}",
+                    "url": f"https://example.com/weather/{i}",
+                    "content": LOREM * 3,
+                    "score": 0.9 - i / 100,
+                    "raw_content": LOREM * 200,
+                }
+                for i in range(count)
+            ],
+        },
+    }
+
+
+def measure(label, tool_name, payload, repeat):
+    raw = json.dumps(payload)   # what the MCP server hands back, as text
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        before = json.dumps(json.loads(raw), indent=2)
+    before_us = (time.perf_counter() - start) / repeat * 1e6
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        after = format_tool_result(tool_name, raw)
+    after_us = (time.perf_counter() - start) / repeat * 1e6
+
+    print(f"{label}")
+    print(f"  indent=2   {len(before):>8} chars  ~{len(before) // 4:>6} tokens  {before_us:9.1f}us")
+    print(f"  formatted  {len(after):>8} chars  ~{len(after) // 4:>6} tokens  {after_us:9.1f}us")
+
+
+def main(emails, hits, repeat):
+    measure(f"GMAIL_FETCH_EMAILS ({emails} emails)", "GMAIL_FETCH_EMAILS", gmail_payload(emails), repeat)
+    measure(f"COMPOSIO_SEARCH_TAVILY_SEARCH ({hits} hits)", "COMPOSIO_SEARCH_TAVILY_SEARCH", search_payload(hits), repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=25)
+    parser.add_argument("--hits", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    opts = parser.parse_args()
+    main(opts.emails, opts.hits, opts.repeat)
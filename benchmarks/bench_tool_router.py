@@ -0,0 +1,91 @@
+"""Tool schema payload per LLM request and routing cost, all tools vs the per-turn tool router.
+
+Prefill latency is estimated from payload tokens (~4 characters per token) at --prefill-tps.
+
+Usage: python -m benchmarks.bench_tool_router [--prefill-tps 2000]
+"""
+import argparse
+import json
+import random
+import time
+
+from backend.config import Config
+from backend.tool_router import ToolRouter, ToolSearchIndex
+
+CATALOG_SIZES = (20, 100, 300, 1000)
+TOOLKITS = {
+    "GMAIL": ["SEND_EMAIL", "FETCH_EMAILS", "REPLY_TO_THREAD", "CREATE_EMAIL_DRAFT", "LIST_THREADS", "ADD_LABEL"],
+    "GOOGLECALENDAR": ["CREATE_EVENT", "UPDATE_EVENT", "DELETE_EVENT", "FIND_EVENT", "FIND_FREE_SLOTS"],
+    "COMPOSIO_SEARCH": ["TAVILY_SEARCH", "NEWS_SEARCH", "FINANCE_SEARCH", "SHOPPING_SEARCH"],
+    "FIRECRAWL": ["SCRAPE", "CRAWL_URLS"],
+    "SLACK": ["SEND_MESSAGE", "LIST_CHANNELS", "SEARCH_MESSAGES"],
+    "NOTION": ["CREATE_PAGE", "SEARCH_PAGES", "UPDATE_BLOCK"],
+    "GITHUB": ["CREATE_ISSUE", "LIST_PULL_REQUESTS", "SEARCH_REPOSITORIES"],
+    "HUBSPOT": ["CREATE_CONTACT", "SEARCH_DEALS", "UPDATE_COMPANY"],
+}
+TURNS = [
+    "what's the weather in mumbai right now",
+    "check my inbox for anything from sarah",
+    "schedule a meeting with the design team tomorrow at 3",
+    "what is tesla's stock price today",
+    "reply to that email and say I'll be there",
+    "find news about the monsoon",
+]
+
+
+def fake_tool(index, rng):
+    toolkit = rng.choice(list(TOOLKITS))
+    action = rng.choice(TOOLKITS[toolkit])
+    name = f"{toolkit}_{action}".lower() + f"_{index}"
+    properties = {
+        f"param_{p}": {"type": rng.choice(["string", "integer", "boolean"]), "description": f"The {p} parameter of {action.lower()}."}
+        for p in range(rng.randint(2, 8))
+    }
+
+    def tool(**kwargs):
+        return ""
+
+    tool.__name__ = name
+    tool.__doc__ = f"{action.replace('_', ' ').title()} using {toolkit.title()}. " + "Detailed usage notes. " * rng.randint(2, 10)
+    tool.schema = {
+        "type": "function",
+        "function": {"name": name, "description": tool.__doc__, "parameters": {"type": "object", "properties": properties}},
+    }
+    return tool
+
+
+def payload_chars(tools):
+    return len(json.dumps([tool.schema for tool in tools]))
+
+
+def main(prefill_tps):
+    rng = random.Random(0)
+    for size in CATALOG_SIZES:
+        tools = [fake_tool(i, rng) for i in range(size)]
+        start = time.perf_counter()
+        index = ToolSearchIndex(tools)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        router = ToolRouter(index)
+        routed_sizes, route_us = [], []
+        for turn in TURNS:
+            start = time.perf_counter()
+            router.route(turn)
+            route_us.append((time.perf_counter() - start) * 1e6)
+            routed_sizes.append(payload_chars(router.current_tools()))
+
+        full = payload_chars(tools)
+        routed = sum(routed_sizes) / len(routed_sizes)
+        print(
+            f"{size:>5} tools  index={build_ms:7.2f}ms  route={sum(route_us) / len(route_us):7.1f}us/turn  "
+            f"all={full // 4:>7} tok (~{full / 4 / prefill_tps * 1000:7.1f}ms)  "
+            f"routed={routed / 4:>6.0f} tok (~{routed / 4 / prefill_tps * 1000:6.1f}ms)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prefill-tps", type=float, default=2000.0, help="assumed LLM prefill throughput")
+    opts = parser.parse_args()
+    Config.TOOL_ROUTER_CORE_TOOLS = ("COMPOSIO_SEARCH_TAVILY_SEARCH", "GMAIL_SEND_EMAIL", "GMAIL_FETCH_EMAILS")
+    main(opts.prefill_tps)
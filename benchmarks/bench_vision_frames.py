@@ -0,0 +1,145 @@
+"""Camera frames sent to the LLM and CPU spent choosing them, every-turn native frames vs the frame selector.
+
+Frame sequences are either synthetic (a still scene with sensor noise and exposure
+flicker, a slow pan, and periodic scene cuts) or a recording given as a Y4M file,
+e.g. `ffmpeg -i clip.mp4 -pix_fmt yuv420p clip.y4m`. A user turn ends every
+--turn-every seconds, alternating visual and non-visual requests. Upload size is
+estimated at ~1.5 bits per pixel of JPEG, image tokens with the 512px tile rule.
+Both are per request: with the selector, the last frame sent is in every later one.
+
+Usage: python -m benchmarks.bench_vision_frames [--seconds 120] [--fps 30] [--turn-every 6] [--recording clip.y4m]
+"""
+import argparse
+import math
+import random
+import time
+
+from backend.config import Config
+from backend.vision import FrameSelector, fit_within, luma_dhash
+
+WIDTH, HEIGHT = 1280, 720
+TURNS = ["what am I holding right now", "what's the weather in mumbai", "what colour is this label", "tell me a joke"]
+
+
+class Frame:
+    def __init__(self, luma, width, height):
+        self.luma, self.width, self.height = luma, width, height
+
+
+def _scene(rng, width, height):
+    """A blocky luma image with a gradient, built row by row."""
+    blocks = [[rng.randrange(256) for _ in range(16)] for _ in range(9)]
+    rows = []
+    for y in range(height):
+        block_row = blocks[y * 9 // height]
+        row = bytes(min(255, (block_row[x * 16 // width] + x * 64 // width)) for x in range(0, width, 8))
+        rows.append(bytes(b for b in row for _ in range(8))[:width])
+    return b"".join(rows)
+
+
+def _jitter(luma, delta):
+    table = bytes(max(0, min(255, v + delta)) for v in range(256))
+    return luma.translate(table)
+
+
+def _pan(luma, width, offset):
+    offset %= width
+    return b"".join(luma[y:y + width][offset:] + luma[y:y + width][:offset] for y in range(0, len(luma), width))
+
+
+def synthetic_frames(seconds, fps, seed=7):
+    """Still (noise only) for 20s, panning for 10s, then a cut to a new scene, repeated."""
+    rng = random.Random(seed)
+    scene = _scene(rng, WIDTH, HEIGHT)
+    for i in range(int(seconds * fps)):
+        t = i / fps
+        phase = t % 30
+        if i and phase < 1 / fps:
+            scene = _scene(rng, WIDTH, HEIGHT)
+        luma = _pan(scene, WIDTH, int((phase - 20) * 40)) if phase >= 20 else scene
+        yield t, Frame(_jitter(luma, rng.randint(-3, 3)), WIDTH, HEIGHT)
+
+
+def y4m_frames(path):
+    with open(path, "rb") as f:
+        header = f.readline().split()
+        params = {p[:1]: p[1:] for p in header[1:]}
+        width, height = int(params[b"W"]), int(params[b"H"])
+        num, _, den = params.get(b"F", b"30:1").partition(b":")
+        fps = int(num) / int(den or 1)
+        chroma = 2 * ((width + 1) // 2) * ((height + 1) // 2)
+        i = 0
+        while f.readline().startswith(b"FRAME"):
+            luma = f.read(width * height)
+            f.seek(chroma, 1)
+            yield i / fps, Frame(luma, width, height)
+            i += 1
+
+
+def image_tokens(width, height):
+    width, height = fit_within(width, height, 2048)
+    scale = min(1.0, 768 / min(width, height))
+    tiles = math.ceil(width * scale / 512) * math.ceil(height * scale / 512)
+    return 85 + 170 * tiles
+
+
+def upload_kb(width, height):
+    return width * height * 1.5 / 8 / 1024
+
+
+def run(frames, turn_every):
+    selector = FrameSelector()
+    hash_seconds = 0.0
+    baseline = {"frames": 0, "kb": 0.0, "tokens": 0}
+    selected = {"frames": 0, "kb": 0.0, "tokens": 0}
+    latest, kept = None, None
+    next_turn, turn = turn_every, 0
+
+    for t, frame in frames:
+        latest = frame
+        if selector.should_sample(t):
+            start = time.perf_counter()
+            frame_hash = luma_dhash(frame.luma, frame.width, frame.height)
+            hash_seconds += time.perf_counter() - start
+            selector.add_sample(frame, frame_hash)
+        if t < next_turn:
+            continue
+
+        next_turn += turn_every
+        text = TURNS[turn % len(TURNS)]
+        turn += 1
+        baseline["frames"] += 1
+        baseline["kb"] += upload_kb(latest.width, latest.height)
+        baseline["tokens"] += image_tokens(latest.width, latest.height)
+        chosen = selector.select(text)
+        if chosen is not None:
+            width, height = fit_within(chosen.width, chosen.height, Config.VISION_MAX_SIZE)
+            selected["frames"] += 1
+            kept = (upload_kb(width, height), 85 if Config.VISION_DETAIL == "low" else image_tokens(width, height))
+        # The last frame sent stays in the history, so every later request carries it again
+        if kept is not None:
+            selected["kb"] += kept[0]
+            selected["tokens"] += kept[1]
+    return selector, hash_seconds, baseline, selected, turn
+
+
+def main(seconds, fps, turn_every, recording):
+    frames = y4m_frames(recording) if recording else synthetic_frames(seconds, fps)
+    selector, hash_seconds, baseline, selected, turns = run(frames, turn_every)
+
+    sampled = selector.stats["frames_sampled"]
+    print(f"{selector.stats['frames_seen']} frames, {sampled} sampled at {Config.VISION_SAMPLE_FPS} fps, {turns} turns")
+    print(f"hashing: {hash_seconds * 1e6 / max(sampled, 1):.0f} µs/sampled frame, {hash_seconds * 1e3:.1f} ms total")
+    print(f"{'policy':<28} {'frames':>7} {'upload KB':>10} {'image tokens':>13}")
+    print(f"{'native frame every turn':<28} {baseline['frames']:>7} {baseline['kb']:>10.0f} {baseline['tokens']:>13}")
+    print(f"{'selector':<28} {selected['frames']:>7} {selected['kb']:>10.0f} {selected['tokens']:>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--turn-every", type=float, default=6, help="seconds between user turns")
+    parser.add_argument("--recording", help="Y4M file to replay instead of synthetic frames")
+    opts = parser.parse_args()
+    main(opts.seconds, opts.fps, opts.turn_every, opts.recording)
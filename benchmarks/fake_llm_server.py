@@ -0,0 +1,134 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint (OpenRouter), served over HTTP.
+
+Streams replies as server-sent events after a simulated time to first token.
+Lookups ("weather", "news", "inbox", ...) are answered with a tool call to the
+matching stub MCP tool first, and with text once the tool result is in the
+conversation, so a turn exercises the same round trips as the real agent.
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from benchmarks.stub_mcp_server import _free_port
+
+# Words in the user's turn -> (tool name prefix, arguments builder)
+TOOL_TRIGGERS = (
+    (("weather", "news", "price", "search", "stock"), "composio_search_tavily_search", lambda text: {"query": text}),
+    (("inbox", "email", "emails"), "gmail_fetch_emails", lambda text: {"max_results": 5}),
+)
+REPLY = "Here is what I found for you, based on the latest information available right now."
+
+
+def _last_user_text(messages):
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            content = message.get("content")
+            if isinstance(content, list):
+                content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+            return content or ""
+    return ""
+
+
+def _choose_tool_call(body):
+    messages = body.get("messages", [])
+    if not messages or messages[-1].get("role") == "tool":
+        return None
+    words = set(_last_user_text(messages).lower().split())
+    names = [tool["function"]["name"] for tool in body.get("tools") or []]
+    for triggers, prefix, arguments in TOOL_TRIGGERS:
+        if words & set(triggers):
+            name = next((n for n in names if n.startswith(prefix)), None)
+            if name:
+                return name, arguments(_last_user_text(messages))
+    return None
+
+
+def _chunk(completion_id, model, delta=None, finish_reason=None, usage=None):
+    choices = [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    payload = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model, "choices": choices}
+    if usage is not None:
+        payload["usage"] = usage
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def build_fake_llm_app(ttft: float = 0.2, token_delay: float = 0.01) -> Starlette:
+    stats = {"requests": 0}
+
+    async def completions(request):
+        body = await request.json()
+        stats["requests"] += 1
+        model = body.get("model", "fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        tool_call = _choose_tool_call(body)
+
+        async def stream():
+            await asyncio.sleep(ttft)
+            yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+            if tool_call is not None:
+                name, arguments = tool_call
+                yield _chunk(completion_id, model, {"tool_calls": [{
+                    "index": 0, "id": f"call_{uuid.uuid4().hex[:8]}", "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)},
+                }]})
+                finish_reason, completion_tokens = "tool_calls", 20
+            else:
+                words = REPLY.split(" ")
+                for word in words:
+                    await asyncio.sleep(token_delay)
+                    yield _chunk(completion_id, model, {"content": word + " "})
+                finish_reason, completion_tokens = "stop", len(words)
+            yield _chunk(completion_id, model, {}, finish_reason=finish_reason)
+            yield _chunk(completion_id, model, usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            })
+            yield "data: [DONE]\n\n"
+
+        if body.get("stream"):
+            return StreamingResponse(stream(), media_type="text/event-stream")
+        await asyncio.sleep(ttft)
+        return JSONResponse({
+            "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+        })
+
+    app = Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+    app.state.stats = stats
+    return app
+
+
+class FakeLLMServer:
+    """Runs the fake chat completions endpoint with uvicorn in a background thread."""
+
+    def __init__(self, ttft: float = 0.2, token_delay: float = 0.01):
+        self.port = _free_port()
+        self.app = build_fake_llm_app(ttft, token_delay)
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    @property
+    def requests(self) -> int:
+        return self.app.state.stats["requests"]
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
@@ -0,0 +1,197 @@
+"""In-process fakes of external services, for benchmarks that must run offline."""
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, stt, tokenize, tts, utils
+from livekit.agents.voice.io import AudioOutput, AudioOutputCapabilities
+
+WORDS = (
+    "coffee mumbai tesla meeting flight dentist python guitar marathon sister birthday "
+    "vegetarian allergy project deadline budget weather hiking paris invoice gym"
+).split()
+
+
+class FakeMemoryClient:
+    """Stands in for `mem0.AsyncMemoryClient` with the subset of the API the backend uses."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.memories = {}
+        self.calls = {"get_all": 0, "search": 0, "add": 0}
+
+    def seed(self, user_id: str, count: int, seed: int = 0):
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        self.memories[user_id] = [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "memory": f"User mentioned {' '.join(rng.sample(WORDS, 4))} (note {i})",
+                "updated_at": (now - timedelta(days=rng.uniform(0, 365))).isoformat(),
+            }
+            for i in range(count)
+        ]
+        return self
+
+    async def get_all(self, user_id: str, **kwargs):
+        self.calls["get_all"] += 1
+        await asyncio.sleep(self.latency)
+        return {"results": list(self.memories.get(user_id, []))}
+
+    async def search(self, query: str, user_id: str, top_k: int = 10, **kwargs):
+        self.calls["search"] += 1
+        await asyncio.sleep(self.latency)
+        terms = set(query.lower().split())
+        scored = []
+        for memory in self.memories.get(user_id, []):
+            overlap = len(terms & set(memory["memory"].lower().split()))
+            if overlap:
+                scored.append({**memory, "score": overlap / len(terms)})
+        scored.sort(key=lambda m: m["score"], reverse=True)
+        return {"results": scored[:top_k]}
+
+    async def add(self, messages, user_id: str, **kwargs):
+        self.calls["add"] += 1
+        await asyncio.sleep(self.latency)
+        now = datetime.now(timezone.utc).isoformat()
+        added = [
+            {"id": str(uuid.uuid4()), "memory": m["content"], "updated_at": now}
+            for m in messages if m.get("role") == "user"
+        ]
+        self.memories.setdefault(user_id, []).extend(added)
+        return {"results": [{"id": m["id"], "memory": m["memory"], "event": "ADD"} for m in added]}
+
+
+SAMPLE_RATE = 24000
+CHUNK_SECONDS = 0.1
+_SILENCE_CHUNK = bytes(int(SAMPLE_RATE * CHUNK_SECONDS) * 2)   # 16-bit mono PCM
+
+
+class _FakeRecognizeStream(stt.RecognizeStream):
+    """Ignores the audio pushed into it and emits each utterance given to `FakeSTT.say()` as a final transcript."""
+
+    async def _run(self):
+        while True:
+            text = await self._stt.utterances.get()
+            await asyncio.sleep(self._stt.latency)
+            self._event_ch.send_nowait(stt.SpeechEvent(
+                type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+                alternatives=[stt.SpeechData(language="en", text=text, confidence=1.0)],
+            ))
+
+
+class FakeSTT(stt.STT):
+    """Stands in for a streaming LiveKit STT: `say(text)` is transcribed `latency` later, as if the user spoke it."""
+
+    def __init__(self, latency: float = 0.1):
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=False))
+        self.latency = latency
+        self.utterances = asyncio.Queue()
+
+    def say(self, text: str):
+        self.utterances.put_nowait(text)
+
+    async def _recognize_impl(self, buffer, *, language=NOT_GIVEN, conn_options=DEFAULT_API_CONNECT_OPTIONS):
+        raise NotImplementedError("FakeSTT only streams")
+
+    def stream(self, *, language=NOT_GIVEN, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        return _FakeRecognizeStream(stt=self, conn_options=conn_options)
+
+
+class _FakeSynthesizeStream(tts.SynthesizeStream):
+    """One streaming connection: pushed text is split into sentences as it arrives and voiced in order."""
+
+    def __init__(self, *, tts: "FakeTTS", conn_options: APIConnectOptions):
+        super().__init__(tts=tts, conn_options=conn_options)
+        tts.requests += 1
+        tts.in_flight += 1
+        self._open = True
+
+    async def aclose(self):
+        await super().aclose()
+        if self._open:
+            self._open = False
+            self._tts.in_flight -= 1
+
+    async def _run(self, output_emitter: tts.AudioEmitter):
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id=utils.shortuuid())
+        sentences = tokenize.blingfire.SentenceTokenizer().stream()
+
+        async def forward_input():
+            async for data in self._input_ch:
+                if isinstance(data, self._FlushSentinel):
+                    sentences.flush()
+                else:
+                    sentences.push_text(data)
+            sentences.end_input()
+
+        input_task = asyncio.create_task(forward_input())
+        try:
+            async for sentence in sentences:
+                self._mark_started()
+                # A sentence's first audio arrives ttfb after the tokenizer hands it over
+                await asyncio.sleep(self._tts.ttfb)
+                # ~15 characters of speech per second, delivered in 100ms chunks
+                for i in range(max(1, int(len(sentence.token) / 15 / CHUNK_SECONDS))):
+                    if i:
+                        await asyncio.sleep(self._tts.frame_interval)
+                    output_emitter.push(_SILENCE_CHUNK)
+        finally:
+            await sentences.aclose()
+            await utils.aio.cancel_and_wait(input_task)
+
+
+class FakeTTS(tts.TTS):
+    """Stands in for a streaming LiveKit TTS such as Cartesia's: `stream()` tokenizes sentences like the plugin does.
+
+    Each sentence's first audio comes `ttfb` after the sentence is complete, then a 100ms chunk per `frame_interval`.
+    """
+
+    def __init__(self, ttfb: float = 0.15, frame_interval: float = 0.005):
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=True), sample_rate=SAMPLE_RATE, num_channels=1)
+        self.ttfb = ttfb
+        self.frame_interval = frame_interval
+        self.requests = 0
+        self.in_flight = 0
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        raise NotImplementedError("FakeTTS only streams")
+
+    def stream(self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        return _FakeSynthesizeStream(tts=self, conn_options=conn_options)
+
+
+class FakeAudioOutput(AudioOutput):
+    """A speaker that plays every segment instantly, so sessions can run without a room."""
+
+    def __init__(self):
+        super().__init__(label="FakeAudioOutput", capabilities=AudioOutputCapabilities(pause=True))
+        self._pushed = 0.0
+        self._playing = False
+
+    async def capture_frame(self, frame):
+        await super().capture_frame(frame)
+        self._pushed += frame.duration
+        self._playing = True
+
+    def flush(self):
+        super().flush()
+        if self._playing:
+            self._finish(interrupted=False)
+
+    def clear_buffer(self):
+        if self._playing:
+            self._finish(interrupted=True)
+
+    def _finish(self, interrupted: bool):
+        self._playing = False
+        played, self._pushed = self._pushed, 0.0
+        self.on_playback_finished(playback_position=played, interrupted=interrupted)
@@ -0,0 +1,68 @@
+"""Local stand-in for the Composio MCP server, served over streamable HTTP.
+
+Exposes a handful of tools with the same names and argument shapes as the
+Composio toolkits the agent uses, each sleeping for a configurable latency.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+
+def build_stub_server(latency: float = 0.0) -> FastMCP:
+    server = FastMCP("composio-stub")
+
+    @server.tool(name="COMPOSIO_SEARCH_TAVILY_SEARCH", description="Search the web for a query.")
+    async def search(query: str) -> str:
+        await asyncio.sleep(latency)
+        return f'{{"results": [{{"title": "Result for {query}", "url": "https://example.com"}}]}}'
+
+    @server.tool(name="GMAIL_FETCH_EMAILS", description="Fetch recent emails from the inbox.")
+    async def fetch_emails(max_results: int = 5) -> str:
+        await asyncio.sleep(latency)
+        return '{"messages": []}'
+
+    @server.tool(name="GMAIL_SEND_EMAIL", description="Send an email.")
+    async def send_email(recipient_email: str, subject: str, body: str) -> str:
+        await asyncio.sleep(latency)
+        return '{"status": "sent"}'
+
+    @server.tool(name="GOOGLECALENDAR_CREATE_EVENT", description="Create a calendar event.")
+    async def create_event(summary: str, start_datetime: str, end_datetime: str = "") -> str:
+        await asyncio.sleep(latency)
+        return '{"id": "evt_1"}'
+
+    return server
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubMCPServer:
+    """Runs the stub server with uvicorn in a background thread."""
+
+    def __init__(self, latency: float = 0.0):
+        self.port = _free_port()
+        app = build_stub_server(latency).streamable_http_app()
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/mcp"
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
@@ -0,0 +1,45 @@
+import asyncio
+
+from livekit.agents import ChatContext
+from livekit.agents.llm import ChatMessage, ImageContent
+
+from backend.agent import MCPAssistant
+
+
+class FakeCamera:
+    def image_content(self, user_text):
+        return ImageContent(image="data:image/jpeg;base64,AAAA")
+
+
+def test_camera_frame_is_a_message_of_its_own():
+    assistant = MCPAssistant([], chat_ctx=ChatContext(), camera=FakeCamera())
+    turn_ctx = ChatContext()
+    new_message = ChatMessage(role="user", content=["what am I holding"])
+
+    asyncio.run(assistant.on_user_turn_completed(turn_ctx, new_message))
+
+    # The message saved to the history stays text-only
+    assert new_message.content == ["what am I holding"]
+    images = [c for item in turn_ctx.items for c in item.content if isinstance(c, ImageContent)]
+    assert len(images) == 1
+
+
+def test_history_keeps_only_the_last_frame_sent():
+    assistant = MCPAssistant([], chat_ctx=ChatContext(), camera=FakeCamera())
+
+    async def scenario():
+        for text in ("what am I holding", "how much is it"):
+            turn_ctx = assistant.chat_ctx.copy()
+            new_message = ChatMessage(role="user", content=[text])
+            await assistant.on_user_turn_completed(turn_ctx, new_message)
+            # What LiveKit does after the hook: the user's message joins the history
+            chat_ctx = assistant.chat_ctx.copy()
+            chat_ctx.insert(new_message)
+            await assistant.update_chat_ctx(chat_ctx)
+        return turn_ctx
+
+    turn_ctx = asyncio.run(scenario())
+    for ctx in (turn_ctx, assistant.chat_ctx):
+        images = [c for item in ctx.items for c in item.content if isinstance(c, ImageContent)]
+        assert len(images) == 1
+    assert [item.text_content for item in assistant.chat_ctx.items] == ["what am I holding", None, "how much is it"]
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from livekit.agents import ChatContext
+from livekit.agents.llm import FunctionCall, FunctionCallOutput
+
+from backend.config import Config
+from backend.context_compaction import ChatCompactor
+
+LONG_OUTPUT = "x" * 2000
+
+
+class FakeAgent:
+    def __init__(self):
+        self._chat_ctx = ChatContext()
+        self._chat_ctx.add_message(role="system", content="instructions")
+
+    @property
+    def chat_ctx(self):
+        return self._chat_ctx
+
+    async def update_chat_ctx(self, chat_ctx):
+        self._chat_ctx = chat_ctx.copy()
+
+
+def add_turn(chat_ctx, turn):
+    chat_ctx.add_message(role="user", content=f"question {turn}")
+    call_id = f"call_{turn}"
+    chat_ctx.items.append(FunctionCall(call_id=call_id, name="search", arguments="{}"))
+    chat_ctx.items.append(FunctionCallOutput(call_id=call_id, name="search", output=LONG_OUTPUT, is_error=False))
+    chat_ctx.add_message(role="assistant", content=f"answer {turn}")
+
+
+@pytest.fixture(autouse=True)
+def small_windows(monkeypatch):
+    monkeypatch.setattr(Config, "CONTEXT_KEEP_TURNS", 2)
+    monkeypatch.setattr(Config, "CONTEXT_SUMMARIZE_BATCH", 3)
+    monkeypatch.setattr(Config, "CONTEXT_SUMMARY_TIMEOUT", 0.05)
+
+
+def user_texts(agent):
+    return [item.text_content for item in agent.chat_ctx.items if item.type == "message" and item.role == "user"]
+
+
+def outputs(agent):
+    return [item.output for item in agent.chat_ctx.items if item.type == "function_call_output"]
+
+
+@pytest.mark.parametrize("summary", ["", None], ids=["empty summary", "timeout"])
+def test_failed_summary_stubs_the_live_context(summary):
+    agent = FakeAgent()
+    for turn in range(6):
+        add_turn(agent.chat_ctx, turn)
+    calls = []
+
+    async def summarize(transcript):
+        calls.append(transcript)
+        add_turn(agent.chat_ctx, 6)   # a turn arrives while the summary is pending
+        if summary is None:
+            await asyncio.sleep(1)
+        return summary
+
+    async def scenario():
+        compactor = ChatCompactor(agent, summarize=summarize)
+        await compactor._compact()
+        await compactor._compact()   # retried only after the backoff
+
+    asyncio.run(scenario())
+    assert user_texts(agent) == [f"question {turn}" for turn in range(7)]
+    assert len(calls) == 1
+    # Everything before the last CONTEXT_KEEP_TURNS user turns is stubbed, the rest is verbatim
+    assert outputs(agent)[-2:] == [LONG_OUTPUT, LONG_OUTPUT]
+    assert all(output.startswith("[2000 chars") for output in outputs(agent)[:-2])
+
+
+def test_summary_keeps_turns_added_while_summarizing():
+    agent = FakeAgent()
+    for turn in range(6):
+        add_turn(agent.chat_ctx, turn)
+
+    async def summarize(transcript):
+        add_turn(agent.chat_ctx, 6)
+        return "the user asked several questions"
+
+    asyncio.run(ChatCompactor(agent, summarize=summarize)._compact())
+    assert user_texts(agent) == ["question 4", "question 5", "question 6"]
+    assert agent.chat_ctx.items[1].text_content.startswith("Summary of the earlier conversation")
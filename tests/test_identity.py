@@ -0,0 +1,27 @@
+import json
+from types import SimpleNamespace
+
+from backend.config import Config
+from backend.identity import resolve_user_id
+
+
+def participant(identity="", metadata="", attributes=None):
+    return SimpleNamespace(identity=identity, metadata=metadata, attributes=attributes or {})
+
+
+def test_safe_ids_are_kept_as_they_are():
+    assert resolve_user_id(participant("alice_smith")) == "alice_smith"
+    assert resolve_user_id(participant("guest", metadata=json.dumps({"user_id": "u-42"}))) == "u-42"
+
+
+def test_sanitized_ids_do_not_collide():
+    raw = ["alice smith", "alice/smith", "alice_smith", "x" * 200, "x" * 200 + "y"]
+    ids = [resolve_user_id(participant(value)) for value in raw]
+    assert len(set(ids)) == len(raw)
+    assert ids[0].startswith("alice_smith~")
+    assert all(len(user_id) <= Config.USER_ID_MAX_LENGTH for user_id in ids)
+    assert resolve_user_id(participant("alice smith")) == ids[0]   # stable across sessions
+
+
+def test_no_usable_identity_is_none():
+    assert resolve_user_id(participant("  ", metadata="not json")) is None
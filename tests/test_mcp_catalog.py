@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+import pytest
+
+from backend import mcp_handler
+from backend.config import Config
+from benchmarks.stub_mcp_server import StubMCPServer
+
+
+@pytest.fixture
+def catalog_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.json")
+    monkeypatch.setattr(Config, "MCP_CATALOG_CACHE_PATH", path)
+    mcp_handler.mcp_tools_cache.clear()
+    yield path
+    mcp_handler.mcp_tools_cache.clear()
+
+
+def load_tools():
+    async def scenario():
+        try:
+            return await mcp_handler.load_and_convert_mcp_tools()
+        finally:
+            await mcp_handler.close_mcp_session_pools()
+
+    return asyncio.run(scenario())
+
+
+def test_prewarm_fetches_and_saves_the_catalog(catalog_path, monkeypatch):
+    with StubMCPServer() as server:
+        monkeypatch.setattr(Config, "COMPOSIO_MCP_URL", server.url)
+        mcp_handler.prewarm_mcp_tool_catalog()
+        assert len(mcp_handler.mcp_tools_cache[server.url]["livekit_tools"]) == 4
+        assert os.path.exists(catalog_path)
+        # The prewarm loop's sessions are closed; the job opens its own on its loop
+        assert mcp_handler.mcp_session_pools == {}
+        assert len(load_tools()) == 4
+
+    # The next process starts from the disk copy, without reaching the server
+    mcp_handler.mcp_tools_cache.clear()
+    mcp_handler.prewarm_mcp_tool_catalog()
+    assert len(mcp_handler.mcp_tools_cache[server.url]["livekit_tools"]) == 4
+
+
+def test_prewarm_survives_an_unreachable_server(catalog_path, monkeypatch):
+    monkeypatch.setattr(Config, "COMPOSIO_MCP_URL", "http://127.0.0.1:9/mcp")
+    monkeypatch.setattr(Config, "MCP_PREWARM_TIMEOUT", 0.5)
+    mcp_handler.prewarm_mcp_tool_catalog()
+    assert mcp_handler.mcp_tools_cache == {}
+    assert not os.path.exists(catalog_path)
@@ -0,0 +1,159 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend import memory_cache
+from backend.memory_cache import MemoryCache
+from benchmarks.fakes import FakeMemoryClient
+
+TTL, MAX_STALENESS = 60.0, 3600.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(memory_cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return MemoryCache(str(tmp_path / "memories.sqlite3"), ttl=TTL, max_staleness=MAX_STALENESS, max_users=3)
+
+
+@pytest.fixture
+def mem0():
+    return FakeMemoryClient().seed("alice", 5).seed("bob", 3, seed=1)
+
+
+def get_all(cache, mem0, user_id):
+    return cache.get_all(user_id, lambda: mem0.get_all(user_id=user_id))
+
+
+def memories(result):
+    return sorted(m["memory"] for m in result["results"])
+
+
+def test_fresh_entry_is_served_without_fetching(cache, mem0, clock):
+    async def scenario():
+        first = await get_all(cache, mem0, "alice")
+        clock.now += TTL / 2
+        second = await get_all(cache, mem0, "alice")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert memories(second) == memories(first)
+    assert mem0.calls["get_all"] == 1
+    assert cache.stats == {"hits": 1, "stale_hits": 0, "misses": 1, "refreshes": 0}
+
+
+def test_stale_entry_is_served_then_refreshed_in_the_background(cache, mem0, clock):
+    async def scenario():
+        await get_all(cache, mem0, "alice")
+        before = memories(await get_all(cache, mem0, "alice"))
+        mem0.memories["alice"].append({"id": "new", "memory": "User moved to Paris", "updated_at": "2025-01-01T00:00:00+00:00"})
+        clock.now += TTL + 1
+        stale = await get_all(cache, mem0, "alice")
+        await asyncio.gather(*cache._refreshes.values())
+        refreshed = await get_all(cache, mem0, "alice")
+        return before, stale, refreshed
+
+    before, stale, refreshed = asyncio.run(scenario())
+    assert memories(stale) == before   # served immediately from the cache
+    assert "User moved to Paris" in memories(refreshed)
+    assert mem0.calls["get_all"] == 2
+    assert cache.stats["stale_hits"] == 1 and cache.stats["refreshes"] == 1
+
+
+def test_entry_past_max_staleness_is_fetched_before_use(cache, mem0, clock):
+    async def scenario():
+        await get_all(cache, mem0, "alice")
+        mem0.memories["alice"] = [{"id": "only", "memory": "User is vegetarian", "updated_at": None}]
+        clock.now += MAX_STALENESS + 1
+        return await get_all(cache, mem0, "alice")
+
+    result = asyncio.run(scenario())
+    assert memories(result) == ["User is vegetarian"]
+    assert mem0.calls["get_all"] == 2
+    assert cache.stats["misses"] == 2 and cache.stats["stale_hits"] == 0
+    assert cache._refreshes == {}
+
+
+def test_version_bumps_only_when_content_changes(cache, mem0):
+    results = mem0.memories["alice"]
+    assert cache._write("alice", results, 0.0) == 1
+    assert cache._write("alice", list(results), 10.0) == 1
+    assert cache._read("alice")["fetched_at"] == 10.0
+    assert cache._write("alice", results[:-1], 20.0) == 2
+
+
+def test_least_recently_used_users_are_evicted(cache, mem0, clock):
+    for user_id in ("u1", "u2", "u3"):
+        cache._write(user_id, [], clock.now)
+        clock.now += 1
+    cache._read("u1")   # u2 is now the least recently used
+    clock.now += 1
+    cache._write("u4", [], clock.now)
+
+    assert cache._read("u2") is None
+    assert all(cache._read(user_id) is not None for user_id in ("u1", "u3", "u4"))
+
+
+def test_add_events_are_written_through(cache, mem0):
+    async def scenario():
+        await get_all(cache, mem0, "bob")
+        existing = mem0.memories["bob"]
+        await cache.apply_add_result("bob", {"results": [
+            {"id": "m_new", "memory": "User plays guitar", "event": "ADD"},
+            {"id": existing[0]["id"], "memory": "User plays bass, not guitar", "event": "UPDATE"},
+            {"id": existing[1]["id"], "event": "DELETE"},
+        ]})
+        return existing, await asyncio.to_thread(cache._read, "bob")
+
+    existing, entry = asyncio.run(scenario())
+    by_id = {m["id"]: m["memory"] for m in entry["results"]}
+    assert by_id["m_new"] == "User plays guitar"
+    assert by_id[existing[0]["id"]] == "User plays bass, not guitar"
+    assert existing[1]["id"] not in by_id
+    assert by_id[existing[2]["id"]] == existing[2]["memory"]
+    assert entry["version"] == 2
+    assert mem0.calls["get_all"] == 1
+
+
+@pytest.mark.parametrize("add_result", [{"results": []}, {"message": "queued for processing"}, None])
+def test_add_without_events_marks_the_entry_stale(cache, mem0, clock, add_result):
+    async def scenario():
+        await get_all(cache, mem0, "bob")
+        await cache.apply_add_result("bob", add_result)
+        mem0.memories["bob"].append({"id": "new", "memory": "User is learning Spanish", "updated_at": None})
+        stale = await get_all(cache, mem0, "bob")
+        await asyncio.gather(*cache._refreshes.values())
+        refreshed = await get_all(cache, mem0, "bob")
+        return stale, refreshed
+
+    stale, refreshed = asyncio.run(scenario())
+    # Served from the cache straight away, then revalidated in the background
+    assert "User is learning Spanish" not in memories(stale)
+    assert "User is learning Spanish" in memories(refreshed)
+    assert mem0.calls["get_all"] == 2
+    assert cache.stats == {"hits": 1, "stale_hits": 1, "misses": 1, "refreshes": 1}
+
+
+def test_client_add_result_reaches_the_cache(cache, mem0):
+    async def scenario():
+        await get_all(cache, mem0, "bob")
+        result = await mem0.add([{"role": "user", "content": "I'm allergic to peanuts"}], user_id="bob")
+        await cache.apply_add_result("bob", result)
+        return await get_all(cache, mem0, "bob")
+
+    assert "I'm allergic to peanuts" in memories(asyncio.run(scenario()))
+    assert mem0.calls["get_all"] == 1
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from livekit.agents import ChatContext
+from livekit.agents.llm import ChatMessage
+
+from backend.agent import MCPAssistant
+from backend.config import Config
+from backend.memory_handler import MemoryRetriever
+from benchmarks.fakes import FakeMemoryClient
+
+QUESTION = "any good hiking near paris"
+
+
+@pytest.fixture
+def mem0():
+    mem0 = FakeMemoryClient()
+    mem0.memories["alice"] = [{
+        "id": "m1", "memory": "User loves hiking near paris", "updated_at": datetime.now(timezone.utc).isoformat(),
+    }]
+    return mem0
+
+
+def user_turn(assistant, text):
+    """Run the turn hook the way LiveKit does, then insert the user's message by creation time."""
+    turn_ctx = ChatContext()
+    turn_ctx.add_message(role="assistant", content="Hi! How can I help?", created_at=time.time() - 1)
+    new_message = ChatMessage(role="user", content=[text])
+    asyncio.run(assistant.on_user_turn_completed(turn_ctx, new_message))
+    turn_ctx.insert(new_message)
+    return turn_ctx
+
+
+def test_memories_go_before_the_user_message_on_every_turn(mem0):
+    assistant = MCPAssistant([], chat_ctx=ChatContext(), memory_retriever=MemoryRetriever(mem0, "alice"))
+    for _ in range(2):
+        # Turn context is discarded after each turn, so the memory is added again when relevant
+        roles = [item.role for item in user_turn(assistant, QUESTION).items]
+        assert roles == ["assistant", "system", "user"]
+
+
+def test_search_starts_from_the_transcript(mem0, monkeypatch):
+    monkeypatch.setattr(Config, "MEMORY_SEARCH_WAIT", 0.05)
+    mem0.latency = 0.2
+
+    async def turn(transcribed):
+        retriever = MemoryRetriever(mem0, "alice")
+        if transcribed:
+            retriever.on_transcript(QUESTION, is_final=True)
+            await asyncio.sleep(0.3)   # LiveKit's endpointing delay
+        started = time.perf_counter()
+        context = await retriever.retrieve(QUESTION)
+        return context, time.perf_counter() - started
+
+    context, waited = asyncio.run(turn(transcribed=True))
+    assert "hiking near paris" in context and waited < 0.05
+    # Without a transcript the search starts at end of turn and misses the wait
+    context, waited = asyncio.run(turn(transcribed=False))
+    assert context == "" and waited < 0.1
+    assert mem0.calls["search"] == 2
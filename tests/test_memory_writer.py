@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.config import Config
+from backend.memory_handler import MemoryWriter
+from benchmarks.fakes import FakeMemoryClient
+
+
+@pytest.fixture(autouse=True)
+def no_memory_cache(monkeypatch):
+    monkeypatch.setattr(Config, "MEMORY_CACHE_PATH", "")
+
+
+def message(role, text):
+    return SimpleNamespace(role=role, content=[text])
+
+
+def test_short_session_is_saved_on_close():
+    """A batch still waiting to fill up when the session ends is flushed, not dropped."""
+    async def scenario():
+        mem0 = FakeMemoryClient()
+        writer = MemoryWriter()
+        writer.start(mem0, "alice")
+        writer.add_message(message("user", "I'm vegetarian"))
+        writer.add_message(message("assistant", "Noted, no meat then."))
+        await asyncio.sleep(0.05)   # the writer has pulled both into its batch and is waiting for more
+        await writer.close()
+        return mem0, writer
+
+    mem0, writer = asyncio.run(scenario())
+    assert mem0.calls["add"] >= 1
+    assert writer.saved_count == 2
+    assert [m["memory"] for m in mem0.memories["alice"]] == ["I'm vegetarian"]
+
+
+def test_full_batch_is_sent_during_the_session(monkeypatch):
+    monkeypatch.setattr(Config, "MEMORY_WRITE_BATCH_SIZE", 2)
+
+    async def scenario():
+        mem0 = FakeMemoryClient()
+        writer = MemoryWriter()
+        writer.start(mem0, "alice")
+        writer.add_message(message("user", "My sister's birthday is in May"))
+        writer.add_message(message("assistant", "I'll remember that."))
+        await asyncio.sleep(0.05)
+        sent_before_close = mem0.calls["add"]
+        await writer.close()
+        return mem0, sent_before_close
+
+    mem0, sent_before_close = asyncio.run(scenario())
+    assert sent_before_close == 1
+    assert mem0.calls["add"] == 1   # nothing left over for the final flush
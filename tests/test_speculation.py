@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from livekit.agents.llm import FunctionCall, FunctionCallOutput
+
+from backend import mcp_handler
+from backend.config import Config
+from backend.identity import bind_user_scope
+from backend.speculation import SpeculativePrefetcher
+from benchmarks.stub_mcp_server import StubMCPServer
+
+QUESTION = "what's the weather in mumbai today"
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    with StubMCPServer(latency=0.1) as server:
+        monkeypatch.setattr(Config, "COMPOSIO_MCP_URL", server.url)
+        monkeypatch.setattr(Config, "MCP_CATALOG_CACHE_PATH", "")
+        monkeypatch.setattr(mcp_handler, "tool_result_cache", mcp_handler.ToolResultCache())
+        yield server
+    mcp_handler.mcp_tools_cache.clear()
+
+
+def run_turn(transcript):
+    async def scenario():
+        bind_user_scope().user_id = "alice"
+        tools = await mcp_handler.load_and_convert_mcp_tools()
+        prefetcher = SpeculativePrefetcher()
+        try:
+            prefetcher.on_transcript(transcript, is_final=True)
+            items = await prefetcher.claim(transcript)
+            search = next(t for t in tools if t.__name__.startswith("composio_search_tavily_search"))
+            misses = mcp_handler.tool_result_cache.stats["misses"]
+            await search(query=transcript)   # the LLM making the same lookup itself
+            return items, prefetcher.stats, mcp_handler.tool_result_cache.stats["misses"] - misses
+        finally:
+            await prefetcher.aclose()
+            await mcp_handler.close_mcp_session_pools()
+
+    return asyncio.run(scenario())
+
+
+def test_claimed_prefetch_is_a_tool_call_and_output(stub_server):
+    items, stats, llm_misses = run_turn(QUESTION)
+    call, output = items
+    assert isinstance(call, FunctionCall) and isinstance(output, FunctionCallOutput)
+    assert call.call_id == output.call_id and call.name.startswith("composio_search_tavily_search")
+    assert "Result for" in output.output and not output.is_error
+    assert stats["reused"] == 1
+    assert llm_misses == 0   # the LLM's identical call is served from the cache
+
+
+def test_failed_prefetch_is_a_miss(stub_server, monkeypatch):
+    monkeypatch.setattr(Config, "TOOL_CALL_TIMEOUT", 0.01)
+    items, stats, _ = run_turn(QUESTION)
+    assert items is None
+    assert (stats["reused"], stats["wasted"]) == (0, 1)
+
+
+def test_discarded_prefetch_counts_the_whole_fetch(stub_server):
+    async def scenario():
+        bind_user_scope().user_id = "alice"
+        await mcp_handler.load_and_convert_mcp_tools()
+        prefetcher = SpeculativePrefetcher()
+        try:
+            prefetcher.on_transcript(QUESTION, is_final=True)
+            assert await prefetcher.claim("what's the weather in pune today") is None
+            # The cache shields the fetch, so it runs to the end after the discard
+            while prefetcher.stats["wasted_seconds"] == 0.0:
+                await asyncio.sleep(0.01)
+            return prefetcher.stats, len(mcp_handler.tool_result_cache._entries)
+        finally:
+            await prefetcher.aclose()
+            await mcp_handler.close_mcp_session_pools()
+
+    stats, cached = asyncio.run(scenario())
+    assert stats["wasted"] == 1 and stats["wasted_seconds"] >= 0.1   # the stub server's latency
+    assert cached == 1
+
+
+def test_small_talk_is_not_a_lookup():
+    for transcript in ("how are you doing today", "who are you exactly", "thank you very much"):
+        assert not SpeculativePrefetcher._is_lookup(transcript)
+    assert SpeculativePrefetcher._is_lookup(QUESTION)
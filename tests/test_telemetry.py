@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from backend import telemetry
+from backend.config import Config
+
+JOB = """
+from backend.telemetry import observe, flush_metrics
+observe("tool_call_seconds", 0.2, tool="GMAIL_FETCH_EMAILS", server="composio", outcome="ok")
+observe("tool_call_seconds", 0.4, tool="GMAIL_FETCH_EMAILS", server="composio", outcome="ok")
+flush_metrics()
+"""
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(telemetry, "HISTOGRAMS", {
+        name: telemetry.Histogram(name, h.help_text) for name, h in telemetry.HISTOGRAMS.items()
+    })
+    return tmp_path
+
+
+def count(rendered, name):
+    return sum(int(line.rsplit(" ", 1)[1]) for line in rendered.splitlines() if line.startswith(f"{name}_count"))
+
+
+def test_exited_job_processes_are_kept_in_the_worker_metrics(metrics_dir):
+    env = {**os.environ, "METRICS_DIR": str(metrics_dir)}
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", JOB], env=env, check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    # A job still running: merged into the output, its snapshot left in place
+    live = telemetry.Histogram("tool_call_seconds", "")
+    live.observe(1.0, {"tool": "GMAIL_FETCH_EMAILS", "server": "composio", "outcome": "ok"})
+    (metrics_dir / f"{os.getppid()}.json").write_text(json.dumps({"tool_call_seconds": live.snapshot()}))
+
+    assert count(telemetry.render_metrics(), "tool_call_seconds") == 5
+    assert sorted(os.listdir(metrics_dir)) == [f"{os.getppid()}.json"]
+    # The exited jobs' counts stay after their snapshots are gone
+    assert count(telemetry.render_metrics(), "tool_call_seconds") == 5
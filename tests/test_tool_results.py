@@ -0,0 +1,9 @@
+import json
+
+from backend.tool_results import format_tool_result
+
+
+def test_empty_values_survive_and_heavy_keys_do_not():
+    result = {"data": {"items": [], "nextPageToken": "", "summary": None, "raw": "<html>" * 100, "attendees": {}}}
+    formatted = json.loads(format_tool_result("GOOGLECALENDAR_LIST_EVENTS", json.dumps(result)))
+    assert formatted == {"data": {"items": [], "nextPageToken": "", "attendees": {}}}
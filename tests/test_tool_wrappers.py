@@ -0,0 +1,122 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from livekit.agents.llm.utils import build_legacy_openai_schema, prepare_function_arguments
+
+from backend import mcp_handler
+
+
+class FakePool:
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, tool_name, arguments):
+        self.calls.append((tool_name, arguments))
+        return '{"ok": true}'
+
+
+def make_tool(monkeypatch, name, properties, required=()):
+    schema = {"type": "object", "properties": properties, "required": list(required)}
+    mcp_tool = SimpleNamespace(name=name, description=f"{name} tool", args_schema=schema)
+    pool = FakePool()
+    monkeypatch.setitem(mcp_handler.mcp_session_pools, "stub", pool)
+    monkeypatch.setitem(mcp_handler.mcp_tool_index, "stub", {name: mcp_tool})
+    return mcp_handler.create_mcp_tool_wrapper(mcp_tool, 0, "stub"), pool
+
+
+def call(tool, arguments, run_context=None):
+    args, kwargs = prepare_function_arguments(fnc=tool, json_arguments=json.dumps(arguments), call_ctx=run_context)
+    return asyncio.run(tool(*args, **kwargs))
+
+
+def test_schema_field_named_context(monkeypatch):
+    tool, pool = make_tool(
+        monkeypatch,
+        "NOTES_ADD",
+        {"context": {"type": "string"}, "run_context": {"type": "string"}, "text": {"type": "string"}},
+        required=["text"],
+    )
+    parameters = build_legacy_openai_schema(tool)["function"]["parameters"]["properties"]
+    assert set(parameters) == {"context", "run_context", "text"}
+
+    run_context = SimpleNamespace(session=None, speech_handle=None)
+    assert call(tool, {"context": "work", "run_context": "x", "text": "call Bob"}, run_context) == '{"ok":true}'
+    assert pool.calls == [("NOTES_ADD", {"context": "work", "run_context": "x", "text": "call Bob"})]
+
+
+def test_colliding_field_aliases(monkeypatch):
+    tool, pool = make_tool(
+        monkeypatch,
+        "CRM_UPDATE",
+        {
+            "user-id": {"type": "string"},
+            "user_id": {"type": "string"},
+            "user.id": {"type": "string"},
+            "_internal": {"type": "boolean"},
+            "2fa": {"type": "string"},
+            "from": {"type": "string"},
+        },
+    )
+    parameters = build_legacy_openai_schema(tool)["function"]["parameters"]["properties"]
+    assert set(parameters) == {"user_id", "user_id_2", "user_id_3", "internal", "arg_2fa", "from_"}
+
+    call(tool, {"user_id": "a", "user_id_2": "b", "user_id_3": "c", "internal": "true", "arg_2fa": "123456", "from_": "me"})
+    assert pool.calls == [("CRM_UPDATE", {
+        "user_id": "a", "user-id": "b", "user.id": "c", "_internal": True, "2fa": "123456", "from": "me",
+    })]
+
+
+def test_array_and_object_fields(monkeypatch):
+    tool, pool = make_tool(
+        monkeypatch,
+        "GOOGLECALENDAR_CREATE_EVENT",
+        {
+            "attendees": {"type": "array", "items": {"type": "string"}},
+            "reminders": {"anyOf": [{"type": "array", "items": {"type": "integer"}}, {"type": "null"}]},
+            "tags": {"type": "array"},
+            "recurrence": {"type": "array", "items": {"type": "object"}},
+            "metadata": {"type": "object", "properties": {"color": {"type": "string"}}},
+        },
+    )
+    parameters = build_legacy_openai_schema(tool)["function"]["parameters"]["properties"]
+    rendered = {name: field["anyOf"][0] for name, field in parameters.items()}   # all optional
+    assert rendered["attendees"] == {"type": "array", "items": {"type": "string"}}
+    assert rendered["reminders"] == {"type": "array", "items": {"type": "integer"}}
+    assert rendered["tags"] == {"type": "array", "items": {"type": "string"}}
+    # No bare objects in the rendered schema: those go over as JSON strings
+    assert rendered["recurrence"] == {"type": "string"}
+    assert rendered["metadata"] == {"type": "string"}
+    assert "JSON" in parameters["metadata"]["description"]
+
+    call(tool, {
+        "attendees": ["a@example.com"], "reminders": [10], "tags": ["work"],
+        "recurrence": '[{"freq": "WEEKLY"}]', "metadata": '{"color": "blue"}',
+    })
+    assert pool.calls == [("GOOGLECALENDAR_CREATE_EVENT", {
+        "attendees": ["a@example.com"], "reminders": [10], "tags": ["work"],
+        "recurrence": [{"freq": "WEEKLY"}], "metadata": {"color": "blue"},
+    })]
+
+
+def test_write_drops_cached_reads_of_the_same_toolkit(monkeypatch):
+    pool = FakePool()
+    tools = {
+        name: SimpleNamespace(name=name, description=name, args_schema={"type": "object", "properties": {}})
+        for name in ("GOOGLECALENDAR_LIST_EVENTS", "GOOGLECALENDAR_CREATE_EVENT", "GMAIL_FETCH_EMAILS")
+    }
+    monkeypatch.setitem(mcp_handler.mcp_session_pools, "stub", pool)
+    monkeypatch.setitem(mcp_handler.mcp_tool_index, "stub", tools)
+    monkeypatch.setattr(mcp_handler, "tool_result_cache", mcp_handler.ToolResultCache())
+    monkeypatch.setattr(mcp_handler, "current_user_id", lambda: "alice")
+    list_events, create_event, fetch_emails = (
+        mcp_handler.create_mcp_tool_wrapper(tool, i, "stub") for i, tool in enumerate(tools.values())
+    )
+
+    for tool in (list_events, fetch_emails, list_events, create_event, list_events, fetch_emails):
+        call(tool, {})
+    assert [name for name, _ in pool.calls] == [
+        "GOOGLECALENDAR_LIST_EVENTS", "GMAIL_FETCH_EMAILS",   # then a cache hit
+        "GOOGLECALENDAR_CREATE_EVENT",
+        "GOOGLECALENDAR_LIST_EVENTS",                          # re-fetched after the write; Gmail still cached
+    ]